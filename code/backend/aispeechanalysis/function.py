@@ -1,16 +1,19 @@
 import json
 import logging
+import re
+from urllib.parse import unquote
 
 import azure.functions as func
 import azurefunctions.extensions.bindings.blob as blob
-from aispeechanalysis.llm import LlmClient
+from aispeechanalysis.llm import llm_client_registry
 from aispeechanalysis.utils import (
-    get_locale,
     get_timestamps_for_sections,
-    get_transcript,
+    get_timestamps_for_sentence_sections,
+    read_stt_result,
 )
+from shared.auth import token_cache
 from shared.config import settings
-from shared.utils import load_blob, upload_string
+from shared.utils import iter_blob_chunks, iter_decompressed_chunks, upload_string
 
 bp = func.Blueprint()
 
@@ -28,38 +31,55 @@ async def ai_speech_analysis(client: blob.BlobClient) -> func.HttpResponse:
     # Initialize
     logging.info("Initialize")
     ai_speech_analysis_guid = str.split(client.blob_name, sep="/")[0]
+    ai_speech_analysis_file_name = str.split(client.blob_name, sep="/")[-1]
 
-    # Download blob file content and convert to json
-    logging.info("Download blob file content and convert to json.")
-    result_load_blob = await load_blob(
-        storage_domain_name=f"{client.account_name}.blob.core.windows.net",
-        storage_container_name=client.container_name,
-        storage_blob_name=client.blob_name,
-        encoding="utf-8",
-        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
-    )
-    result_load_blob_json = json.loads(result_load_blob)
-    logging.debug(f"Loaded blob content as json: '{result_load_blob_json}'")
+    # Only process transcription files and skip analysis results in the same container
+    if not re.fullmatch(r"speech\d+\.json", ai_speech_analysis_file_name):
+        logging.info(f"Skipping file '{client.blob_name}' as it is no transcription.")
+        return
 
-    # Get transcript and locale
-    logging.info("Get transcript and locale from Azure AI Speech content.")
-    result_get_transcript = get_transcript(result_stt=result_load_blob_json)
-    result_get_locale = get_locale(result_stt=result_load_blob_json)
+    # Stream blob file content and read transcript, locale and words
+    logging.info("Stream blob file content and read transcript, locale and words.")
+    result_get_transcript, result_get_locale, word_table = await read_stt_result(
+        chunks=iter_decompressed_chunks(
+            chunks=iter_blob_chunks(
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=client.container_name,
+                storage_blob_name=unquote(client.blob_name),
+                chunk_size=settings.STORAGE_DOWNLOAD_CHUNK_SIZE,
+                max_concurrency=settings.STORAGE_DOWNLOAD_MAX_CONCURRENCY,
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+        )
+    )
+    logging.info(
+        f"Read transcript with {len(word_table)} words in {word_table.get_sentence_count()} sentences and locale '{result_get_locale}'."
+    )
 
     # Use Open AI to generate scenes
     logging.info("Use Open AI to generate scenes.")
-    llm_client = LlmClient(
+    llm_client = llm_client_registry.get_llm_client(
         azure_open_ai_base_url=settings.AZURE_OPEN_AI_BASE_URL,
         azure_open_ai_api_version=settings.AZURE_OPEN_AI_API_VERSION,
         azure_open_ai_deployment_name=settings.AZURE_OPEN_AI_DEPLOYMENT_NAME,
         azure_open_ai_temperature=settings.AZURE_OPEN_AI_TEMPERATURE,
+        requests_per_second=settings.AZURE_OPEN_AI_REQUESTS_PER_SECOND,
+        max_concurrency=settings.AZURE_OPEN_AI_MAX_CONCURRENCY,
+        section_mode=settings.LLM_SECTION_MODE,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
-    result_invoke_llm_chain = llm_client.invoke_llm_chain(
-        news_content=result_get_transcript,
+    result_invoke_llm_chain = await llm_client.invoke_llm_chain(
+        news_content=(
+            word_table.get_numbered_transcript()
+            if settings.LLM_SECTION_MODE == "sentence_id"
+            else result_get_transcript
+        ),
         news_show_details="This is a news show covering different news content.",
         language=result_get_locale,
     )
+    logging.info(
+        f"Invoked LLM with rate limits {llm_client.get_rate_governor_metrics()}, client {llm_client.get_metrics()}, client registry {llm_client_registry.get_metrics()} and token cache {token_cache.get_metrics()}."
+    )
 
     # Save llm result
     logging.info("Saving LLM result.")
@@ -68,15 +88,25 @@ async def ai_speech_analysis(client: blob.BlobClient) -> func.HttpResponse:
         storage_domain_name=f"{client.account_name}.blob.core.windows.net",
         storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_ANALYSIS_SPEECH_NAME,
         storage_blob_name=f"{ai_speech_analysis_guid}/llm.json",
+        content_encoding=settings.STORAGE_ARTIFACT_COMPRESSION,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
 
     # Get timestamps for news sections
     logging.info("Get timestamps for news sections")
-    result_get_timestamps_for_sections = get_timestamps_for_sections(
-        result_stt=result_load_blob_json,
-        result_llm=result_invoke_llm_chain.model_dump(),
-    )
+    if settings.LLM_SECTION_MODE == "sentence_id":
+        result_get_timestamps_for_sections = get_timestamps_for_sentence_sections(
+            word_table=word_table,
+            result_llm=result_invoke_llm_chain.model_dump(),
+        )
+    else:
+        result_get_timestamps_for_sections = get_timestamps_for_sections(
+            result_stt=None,
+            result_llm=result_invoke_llm_chain.model_dump(),
+            word_table=word_table,
+            alignment_mode=settings.SECTION_ALIGNMENT_MODE,
+            min_confidence=settings.SECTION_ALIGNMENT_MIN_CONFIDENCE,
+        )
 
     # Save results
     logging.info("Save results")
@@ -85,5 +115,6 @@ async def ai_speech_analysis(client: blob.BlobClient) -> func.HttpResponse:
         storage_domain_name=f"{client.account_name}.blob.core.windows.net",
         storage_container_name=settings.STORAGE_CONTAINER_RESULTS_NAME,
         storage_blob_name=f"{ai_speech_analysis_guid}/timestamps.json",
+        content_encoding=settings.STORAGE_ARTIFACT_COMPRESSION,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
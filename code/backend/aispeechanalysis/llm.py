@@ -1,17 +1,57 @@
 import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Literal, Tuple, Union
 
-from aispeechanalysis.models import InvokeLlmResponse
-from azure.identity import DefaultAzureCredential
+import httpx
+from aispeechanalysis.models import (
+    InvokeLlmResponse,
+    InvokeLlmSentenceResponse,
+    LlmClientMetrics,
+    LlmClientRegistryMetrics,
+    LlmUsage,
+)
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import SystemMessage
 from langchain_core.output_parsers import PydanticOutputParser  # , JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import AzureChatOpenAI
+from shared.auth import token_cache
 from shared.config import settings
+from shared.models import RateGovernorMetrics
+from shared.ratelimit import RateGovernedAsyncTransport, rate_governor_registry
+
+AZURE_OPEN_AI_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Usage of the current invocation, which collects the token fetch durations of the invocation
+llm_usage_context: ContextVar[LlmUsage] = ContextVar("llm_usage_context", default=None)
 
 
 class LlmMessages:
     SYSTEM_MESSAGE: str = settings.SYSTEM_PROMPT
     USER_MESSAGE: str = settings.USER_PROMPT
+    SYSTEM_MESSAGE_SENTENCE_ID: str = settings.SYSTEM_PROMPT_SENTENCE_ID
+    USER_MESSAGE_SENTENCE_ID: str = settings.USER_PROMPT_SENTENCE_ID
+
+
+class LlmUsageCallbackHandler(BaseCallbackHandler):
+    def __init__(self) -> None:
+        """Initializes the callback handler that sums up the token usage of all llm calls of a chain, including retries.
+
+        RETURNS (None): No return values.
+        """
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.__lock = threading.Lock()
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        with self.__lock:
+            self.prompt_tokens += token_usage.get("prompt_tokens", 0)
+            self.completion_tokens += token_usage.get("completion_tokens", 0)
+            self.total_tokens += token_usage.get("total_tokens", 0)
 
 
 class LlmClient:
@@ -21,6 +61,9 @@ def __init__(
         azure_open_ai_api_version: str,
         azure_open_ai_deployment_name: str,
         azure_open_ai_temperature: float,
+        requests_per_second: float = 1.0,
+        max_concurrency: int = 4,
+        section_mode: Literal["text", "sentence_id"] = "text",
         managed_identity_client_id: str = None,
     ) -> None:
         """Initializes the llm client.
@@ -29,17 +72,60 @@ def __init__(
         azure_open_ai_api_version (str): Specifies the api version used for the azure open ai service.
         azure_open_ai_deployment_name (str): Specifies the deployment name used within azure open ai service.
         azure_open_ai_temperature (float): Specifies the temparature used for the model.
+        requests_per_second (float): Specifies the request rate of all clients of the deployment within the worker.
+        max_concurrency (int): Specifies the maximum number of concurrent requests of all clients of the deployment within the worker.
+        section_mode (Literal["text", "sentence_id"]): Specifies whether sections reference the text or the ids of their first and last sentences.
         managed_identity_client_id (str): Specifies the managed identity client id used for auth.
         RETURNS (None): No return values.
         """
+        start_time = time.perf_counter()
+        self.section_mode = section_mode
+        self.__managed_identity_client_id = managed_identity_client_id
+        self.__last_usage: LlmUsage = None
+        self.__lock = threading.Lock()
+        self.__invocations = 0
+        self.__token_requests = 0
+        self.__token_duration_in_seconds = 0.0
+
+        # Get shared rate governor of the deployment
+        self.__rate_governor = rate_governor_registry.get_rate_governor(
+            name=f"{azure_open_ai_base_url.rstrip('/')}/openai/deployments/{azure_open_ai_deployment_name}",
+            requests_per_second=requests_per_second,
+            max_concurrency=max_concurrency,
+        )
+
         # Create llm chain
         self.__create_llm_chain(
             azure_open_ai_base_url=azure_open_ai_base_url,
             azure_open_ai_api_version=azure_open_ai_api_version,
             azure_open_ai_deployment_name=azure_open_ai_deployment_name,
             azure_open_ai_temperature=azure_open_ai_temperature,
-            managed_identity_client_id=managed_identity_client_id,
         )
+        self.__construction_duration_in_seconds = time.perf_counter() - start_time
+        logging.info(
+            f"Created LLM client for deployment '{azure_open_ai_deployment_name}' in '{section_mode}' mode in {self.__construction_duration_in_seconds:.3f}s."
+        )
+
+    async def __get_token(self) -> str:
+        # Get shared access token of the worker, which is only refreshed before expiry
+        start_time = time.perf_counter()
+        token = await token_cache.get_token(
+            scope=AZURE_OPEN_AI_SCOPE,
+            managed_identity_client_id=self.__managed_identity_client_id,
+        )
+        duration = time.perf_counter() - start_time
+        with self.__lock:
+            self.__token_requests += 1
+            self.__token_duration_in_seconds += duration
+        llm_usage = llm_usage_context.get()
+        if llm_usage is not None:
+            llm_usage.token_duration_in_seconds += duration
+        return token.token
+
+    def __get_token_sync(self) -> str:
+        message = "The llm client only supports async invocations."
+        logging.error(message)
+        raise RuntimeError(message)
 
     def __create_llm_chain(
         self,
@@ -47,14 +133,19 @@ def __create_llm_chain(
         azure_open_ai_api_version: str,
         azure_open_ai_deployment_name: str,
         azure_open_ai_temperature: float,
-        managed_identity_client_id: str,
     ) -> None:
         # Create chat prompt template
         logging.debug("Creating chat prompt template")
+        if self.section_mode == "sentence_id":
+            system_message = LlmMessages.SYSTEM_MESSAGE_SENTENCE_ID
+            user_message = LlmMessages.USER_MESSAGE_SENTENCE_ID
+        else:
+            system_message = LlmMessages.SYSTEM_MESSAGE
+            user_message = LlmMessages.USER_MESSAGE
         prompt = ChatPromptTemplate.from_messages(
             [
-                SystemMessage(content=LlmMessages.SYSTEM_MESSAGE, type="system"),
-                ("user", LlmMessages.USER_MESSAGE),
+                SystemMessage(content=system_message, type="system"),
+                ("user", user_message),
             ],
         )
         prompt.input_variables = [
@@ -67,28 +158,29 @@ def __create_llm_chain(
         # Create the llm
         logging.debug("Creating the llm")
 
-        def entra_id_token_provider():
-            credential = DefaultAzureCredential(
-                managed_identity_client_id=managed_identity_client_id,
-            )
-            token = credential.get_token(
-                "https://cognitiveservices.azure.com/.default"
-            ).token
-            return token
-
         llm = AzureChatOpenAI(
             azure_endpoint=azure_open_ai_base_url,
             api_version=azure_open_ai_api_version,
             deployment_name=azure_open_ai_deployment_name,
-            azure_ad_token_provider=entra_id_token_provider,
+            azure_ad_token_provider=self.__get_token_sync,
+            azure_ad_async_token_provider=self.__get_token,
             temperature=azure_open_ai_temperature,
             model_kwargs={"response_format": {"type": "json_object"}},
+            http_async_client=httpx.AsyncClient(
+                transport=RateGovernedAsyncTransport(rate_governor=self.__rate_governor)
+            ),
         )
 
         # Create the output parser
         logging.debug("Creating the output parser")
         # output_parser = JsonOutputParser(pydantic_object=InvokeLlmResponse)
-        output_parser = PydanticOutputParser(pydantic_object=InvokeLlmResponse)
+        output_parser = PydanticOutputParser(
+            pydantic_object=(
+                InvokeLlmSentenceResponse
+                if self.section_mode == "sentence_id"
+                else InvokeLlmResponse
+            )
+        )
 
         # Insert partial into prompt
         prompt_partial = prompt.partial(
@@ -101,17 +193,142 @@ def entra_id_token_provider():
         llm_chain = prompt_partial | llm | output_parser
         self.__llm_chain = llm_chain.with_retry()
 
-    def invoke_llm_chain(
+    async def invoke_llm_chain(
         self,
         news_content: str,
         news_show_details: str,
         language: str,
-    ) -> InvokeLlmResponse:
-        result: InvokeLlmResponse = self.__llm_chain.invoke(
-            {
-                "news_content": news_content,
-                "news_show_details": news_show_details,
-                "language": language,
-            },
+    ) -> Union[InvokeLlmResponse, InvokeLlmSentenceResponse]:
+        # Invoke llm chain and measure token usage and latency
+        llm_usage = LlmUsage(section_mode=self.section_mode)
+        llm_usage_context_token = llm_usage_context.set(llm_usage)
+        usage_callback_handler = LlmUsageCallbackHandler()
+        start_time = time.perf_counter()
+        try:
+            result: Union[InvokeLlmResponse, InvokeLlmSentenceResponse] = (
+                await self.__llm_chain.ainvoke(
+                    {
+                        "news_content": news_content,
+                        "news_show_details": news_show_details,
+                        "language": language,
+                    },
+                    config={"callbacks": [usage_callback_handler]},
+                )
+            )
+        finally:
+            llm_usage_context.reset(llm_usage_context_token)
+        llm_usage.prompt_tokens = usage_callback_handler.prompt_tokens
+        llm_usage.completion_tokens = usage_callback_handler.completion_tokens
+        llm_usage.total_tokens = usage_callback_handler.total_tokens
+        llm_usage.duration_in_seconds = time.perf_counter() - start_time
+        with self.__lock:
+            self.__invocations += 1
+            self.__last_usage = llm_usage
+        logging.info(
+            f"Invoked LLM in '{self.section_mode}' mode with {llm_usage.prompt_tokens} prompt tokens and {llm_usage.completion_tokens} completion tokens in {llm_usage.duration_in_seconds:.2f}s, of which {llm_usage.token_duration_in_seconds:.3f}s were spent on access tokens."
         )
         return result
+
+    def get_last_usage(self) -> LlmUsage:
+        """Returns the token usage and latency of the last invocation of the llm chain.
+
+        RETURNS (LlmUsage): Returns the prompt and completion tokens and the duration or `None` if the chain was not invoked.
+        """
+        return self.__last_usage
+
+    def get_rate_governor_metrics(self) -> RateGovernorMetrics:
+        """Returns the current limits and throttling counts of requests to the deployment.
+
+        RETURNS (RateGovernorMetrics): Returns the request rate, concurrency limit and throttle counts.
+        """
+        return self.__rate_governor.get_metrics()
+
+    def get_metrics(self) -> LlmClientMetrics:
+        """Returns the construction and token fetch timings of the client.
+
+        RETURNS (LlmClientMetrics): Returns the construction duration, the number of invocations and the number and duration of token requests.
+        """
+        with self.__lock:
+            return LlmClientMetrics(
+                construction_duration_in_seconds=self.__construction_duration_in_seconds,
+                invocations=self.__invocations,
+                token_requests=self.__token_requests,
+                token_duration_in_seconds=self.__token_duration_in_seconds,
+            )
+
+
+class LlmClientRegistry:
+    def __init__(self) -> None:
+        """Initializes the worker-wide registry of llm clients, so that prompts, parsers and http clients are built once per worker.
+
+        RETURNS (None): No return values.
+        """
+        self.__llm_clients: Dict[Tuple, LlmClient] = {}
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get_llm_client(
+        self,
+        azure_open_ai_base_url: str,
+        azure_open_ai_api_version: str,
+        azure_open_ai_deployment_name: str,
+        azure_open_ai_temperature: float,
+        requests_per_second: float = 1.0,
+        max_concurrency: int = 4,
+        section_mode: Literal["text", "sentence_id"] = "text",
+        managed_identity_client_id: str = None,
+    ) -> LlmClient:
+        """Returns the llm client of a deployment and creates it on first use.
+
+        azure_open_ai_base_url (str): Specifies the base url of the azure open ai service.
+        azure_open_ai_api_version (str): Specifies the api version used for the azure open ai service.
+        azure_open_ai_deployment_name (str): Specifies the deployment name used within azure open ai service.
+        azure_open_ai_temperature (float): Specifies the temparature used for the model.
+        requests_per_second (float): Specifies the request rate of all clients of the deployment within the worker.
+        max_concurrency (int): Specifies the maximum number of concurrent requests of all clients of the deployment within the worker.
+        section_mode (Literal["text", "sentence_id"]): Specifies whether sections reference the text or the ids of their first and last sentences.
+        managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+        RETURNS (LlmClient): Returns the llm client.
+        """
+        key = (
+            azure_open_ai_base_url,
+            azure_open_ai_api_version,
+            azure_open_ai_deployment_name,
+            azure_open_ai_temperature,
+            section_mode,
+            managed_identity_client_id,
+        )
+        with self.__lock:
+            llm_client = self.__llm_clients.get(key)
+            if llm_client is None:
+                self.__misses += 1
+                llm_client = LlmClient(
+                    azure_open_ai_base_url=azure_open_ai_base_url,
+                    azure_open_ai_api_version=azure_open_ai_api_version,
+                    azure_open_ai_deployment_name=azure_open_ai_deployment_name,
+                    azure_open_ai_temperature=azure_open_ai_temperature,
+                    requests_per_second=requests_per_second,
+                    max_concurrency=max_concurrency,
+                    section_mode=section_mode,
+                    managed_identity_client_id=managed_identity_client_id,
+                )
+                self.__llm_clients[key] = llm_client
+            else:
+                self.__hits += 1
+            return llm_client
+
+    def get_metrics(self) -> LlmClientRegistryMetrics:
+        """Returns the usage metrics of the registry.
+
+        RETURNS (LlmClientRegistryMetrics): Returns the number of reused and created clients.
+        """
+        with self.__lock:
+            return LlmClientRegistryMetrics(
+                hits=self.__hits,
+                misses=self.__misses,
+                clients=len(self.__llm_clients),
+            )
+
+
+llm_client_registry = LlmClientRegistry()
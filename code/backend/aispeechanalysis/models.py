@@ -44,3 +44,56 @@ def to_json(obj) -> str:
     @staticmethod
     def from_json(data: str):
         return InvokeLlmResponse.model_validate_json(data)
+
+
+class LlmSentenceResponseItem(BaseModel):
+    id: int = Field(description="id of the subsection")
+    title: str = Field(description="title of the subsection")
+    category: str = Field(description="category of the subsection")
+    tags: List[str] = Field(description="tags of the subsection")
+    score: int = Field(description="score of the subsection")
+    start_sentence_id: int = Field(
+        description="id of the first sentence of the subsection",
+        validation_alias=AliasChoices("start_sentence_id", "start_id", "start"),
+    )
+    end_sentence_id: int = Field(
+        description="id of the last sentence of the subsection",
+        validation_alias=AliasChoices("end_sentence_id", "end_id", "end"),
+    )
+
+
+class InvokeLlmSentenceResponse(BaseModel):
+    sections: List[LlmSentenceResponseItem] = Field(
+        description="list of items describing the subsections",
+        validation_alias=AliasChoices("sections", "news_sections", "root"),
+    )
+
+    @staticmethod
+    def to_json(obj) -> str:
+        return obj.model_dump_json()
+
+    @staticmethod
+    def from_json(data: str):
+        return InvokeLlmSentenceResponse.model_validate_json(data)
+
+
+class LlmUsage(BaseModel):
+    section_mode: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    duration_in_seconds: float = 0.0
+    token_duration_in_seconds: float = 0.0
+
+
+class LlmClientMetrics(BaseModel):
+    construction_duration_in_seconds: float
+    invocations: int
+    token_requests: int
+    token_duration_in_seconds: float
+
+
+class LlmClientRegistryMetrics(BaseModel):
+    hits: int
+    misses: int
+    clients: int
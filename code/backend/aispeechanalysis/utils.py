@@ -1,8 +1,19 @@
+import bisect
 import copy
 import logging
 import string
-from datetime import datetime, timedelta
-from typing import Any, List, Tuple
+import sys
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, List, Literal, Tuple
+
+import ijson
+import numpy as np
+from shared.duration import get_ticks, parse_duration
+
+PUNCTUATION_TRANSLATION_TABLE = str.maketrans("", "", f"{string.punctuation}¿¡")
+SENTENCE_TERMINATORS = (".", "!", "?", "…", "。", "！", "？")
+SENTENCE_CLOSING_CHARACTERS = "\"')]»“”’"
 
 
 def remove_punctuation(text: str) -> str:
@@ -11,7 +22,7 @@ def remove_punctuation(text: str) -> str:
     text (str): Specifies the text that should be altered.
     RETURNS (str): The altered text.
     """
-    return text.translate(str.maketrans("", "", f"{string.punctuation}¿¡"))
+    return text.translate(PUNCTUATION_TRANSLATION_TABLE)
 
 
 def get_normalized_text(text: str) -> str:
@@ -55,8 +66,8 @@ def get_word_details(result_stt: Any, normalize_text: bool) -> List[Any]:
     """Returns all word details from a speech to text batch analysis process.
 
     result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
-    normalize_text (bool): Specifies whether the text should be normalized.
-    RETURNS (str): The altered text.
+    normalize_text (bool): Specifies whether the text should be normalized. Normalized words are returned as copies, so the STT result is not altered.
+    RETURNS (List[Any]): The word details of the best recognition of every phrase.
     """
     word_details = []
     recognized_phrases = result_stt.get("recognizedPhrases", [])
@@ -69,10 +80,14 @@ def get_word_details(result_stt: Any, normalize_text: bool) -> List[Any]:
 
         if normalize_text:
             for display_word in recognized_phrase_best_display_words:
-                display_word["displayText"] = get_normalized_text(
-                    text=display_word["displayText"]
+                word_details.append(
+                    display_word
+                    | {
+                        "displayText": get_normalized_text(
+                            text=display_word["displayText"]
+                        )
+                    }
                 )
-                word_details.append(display_word)
         else:
             # Append word details
             word_details.extend(recognized_phrase_best_display_words)
@@ -80,117 +95,672 @@ def get_word_details(result_stt: Any, normalize_text: bool) -> List[Any]:
     return word_details
 
 
+def ticks_to_timedelta(ticks: int) -> timedelta:
+    """Converts ticks of 100 nanoseconds to a timedelta object.
+
+    ticks (int): Specifies the ticks.
+    RETURNS (timedelta): The timedelta object.
+    """
+    return timedelta(microseconds=int(ticks) // 10)
+
+
 def offset_and_duration_to_timedelta(timedelta_str: str) -> Tuple[str, timedelta]:
     """Parses offset and duration notations to a timedelta object.
 
     timedelta_str (Any): Specifies the string notation of the offset or duration (e.g. 'PT24.01S', 'PT1M38.32S').
-    RETURNS (Tuple[str, timedelta]): The transcript extracted from the JSON file and the format string.
+    RETURNS (Tuple[str, timedelta]): The format string of the notation and the timedelta object.
     """
-    # Initialize
-    format_options = [
-        "PT%S.%fS",
-        "PT%SS",
-        "PT%MM%S.%fS",
-        "PT%MM%SS",
-        "PT%HH%MM%S.%fS",
-        "PT%HH%MM%SS",
-    ]
-    td = None
-    format = None
-
-    # Parse timdelta
-    for format_option in format_options:
-        try:
-            t = datetime.strptime(timedelta_str, format_option)
-            td = timedelta(
-                hours=t.hour,
-                minutes=t.minute,
-                seconds=t.second,
-                microseconds=t.microsecond,
+    td = ticks_to_timedelta(ticks=parse_duration(duration=timedelta_str))
+    format = (
+        "PT"
+        + ("%HH" if "H" in timedelta_str else "")
+        + ("%MM" if "M" in timedelta_str else "")
+        + ("%S.%fS" if "." in timedelta_str else "%SS")
+    )
+    return (format, td)
+
+
+class WordTable:
+    def __init__(
+        self,
+        tokens: List[str],
+        offsets_in_ticks: np.ndarray,
+        durations_in_ticks: np.ndarray,
+        display_texts: List[str] = None,
+        sentence_starts: np.ndarray = None,
+    ) -> None:
+        """Initializes the columnar table of the recognized words of a transcript.
+
+        tokens (List[str]): Specifies the interned normalized words.
+        offsets_in_ticks (np.ndarray): Specifies the offsets of the words in ticks of 100 nanoseconds.
+        durations_in_ticks (np.ndarray): Specifies the durations of the words in ticks of 100 nanoseconds.
+        display_texts (List[str]): Specifies the interned display texts of the words.
+        sentence_starts (np.ndarray): Specifies the ascending positions of the first words of the sentences.
+        RETURNS (None): No return values.
+        """
+        self.tokens = tokens
+        self.offsets_in_ticks = offsets_in_ticks
+        self.durations_in_ticks = durations_in_ticks
+        self.display_texts = display_texts or []
+        self.sentence_starts = (
+            np.zeros(0, dtype=np.int64) if sentence_starts is None else sentence_starts
+        )
+        self.__word_index: Dict[str, List[int]] = None
+        self.__vocabulary: Dict[str, int] = None
+        self.__word_positions: Dict[str, np.ndarray] = None
+        self.__token_ids: np.ndarray = None
+
+    @classmethod
+    def from_stt_result(cls, result_stt: Any) -> "WordTable":
+        """Builds the word table from the best recognition of every phrase of a transcript.
+
+        result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+        RETURNS (WordTable): The word table.
+        """
+        word_table_builder = WordTableBuilder()
+        for recognized_phrase in result_stt.get("recognizedPhrases", []):
+            recognized_phrase_best = recognized_phrase.get("nBest", [])[0]
+            for display_word in recognized_phrase_best.get("displayWords", []):
+                word_table_builder.add_word(display_word=display_word)
+            word_table_builder.end_phrase()
+        return word_table_builder.build()
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def get_word_index(self) -> Dict[str, List[int]]:
+        """Returns the positions of every word of the table, which are computed once.
+
+        RETURNS (Dict[str, List[int]]): The ascending positions of every word.
+        """
+        if self.__word_index is None:
+            self.__word_index = get_word_index(words=self.tokens)
+        return self.__word_index
+
+    def get_word_positions(self) -> Dict[str, np.ndarray]:
+        """Returns the positions of every word of the table as arrays, which are computed once.
+
+        RETURNS (Dict[str, np.ndarray]): The ascending positions of every word.
+        """
+        if self.__word_positions is None:
+            self.__word_positions = {
+                token: np.asarray(positions, dtype=np.int64)
+                for token, positions in self.get_word_index().items()
+            }
+        return self.__word_positions
+
+    def get_vocabulary(self) -> Dict[str, int]:
+        """Returns the integer id of every distinct word of the table, which is computed once.
+
+        RETURNS (Dict[str, int]): The id of every distinct word.
+        """
+        if self.__vocabulary is None:
+            self.__vocabulary = {
+                token: token_id for token_id, token in enumerate(self.get_word_index())
+            }
+        return self.__vocabulary
+
+    def get_token_ids(self) -> np.ndarray:
+        """Returns the words of the table as integer ids, which are computed once.
+
+        RETURNS (np.ndarray): The id of every word of the table.
+        """
+        if self.__token_ids is None:
+            vocabulary = self.get_vocabulary()
+            self.__token_ids = np.fromiter(
+                (vocabulary[token] for token in self.tokens),
+                dtype=np.int32,
+                count=len(self.tokens),
             )
-            format = format_option
+        return self.__token_ids
+
+    def get_sentence_count(self) -> int:
+        """Returns the number of sentences of the table.
+
+        RETURNS (int): The number of sentences.
+        """
+        return len(self.sentence_starts)
+
+    def get_sentence_span(self, sentence_id: int) -> Tuple[int, int]:
+        """Returns the positions of the words of a sentence.
+
+        sentence_id (int): Specifies the id of the sentence, starting at 1.
+        RETURNS (Tuple[int, int]): The position of the first word and the position after the last word of the sentence.
+        """
+        if not 1 <= sentence_id <= len(self.sentence_starts):
+            message = f"Sentence id '{sentence_id}' is not between 1 and {len(self.sentence_starts)}."
+            logging.error(message)
+            raise ValueError(message)
+        start = int(self.sentence_starts[sentence_id - 1])
+        end = (
+            int(self.sentence_starts[sentence_id])
+            if sentence_id < len(self.sentence_starts)
+            else len(self.tokens)
+        )
+        return start, end
+
+    def get_sentence_text(self, sentence_id: int) -> str:
+        """Returns the display text of a sentence.
+
+        sentence_id (int): Specifies the id of the sentence, starting at 1.
+        RETURNS (str): The display text of the sentence.
+        """
+        start, end = self.get_sentence_span(sentence_id=sentence_id)
+        return " ".join(self.display_texts[start:end])
+
+    def get_numbered_transcript(self) -> str:
+        """Returns the transcript with one numbered sentence per line, like `[1] Good evening.`.
+
+        RETURNS (str): The numbered transcript.
+        """
+        return "\n".join(
+            f"[{sentence_id}] {self.get_sentence_text(sentence_id=sentence_id)}"
+            for sentence_id in range(1, len(self.sentence_starts) + 1)
+        )
+
+    def get_start_time(self, position: int) -> timedelta:
+        """Returns the start time of a word.
+
+        position (int): Specifies the position of the word.
+        RETURNS (timedelta): The start time of the word.
+        """
+        return ticks_to_timedelta(ticks=self.offsets_in_ticks[position])
+
+    def get_end_time(self, position: int) -> timedelta:
+        """Returns the end time of a word.
+
+        position (int): Specifies the position of the word.
+        RETURNS (timedelta): The end time of the word.
+        """
+        return ticks_to_timedelta(
+            ticks=self.offsets_in_ticks[position] + self.durations_in_ticks[position]
+        )
+
+
+class WordTableBuilder:
+    def __init__(self) -> None:
+        """Initializes the incremental builder of a word table.
+
+        RETURNS (None): No return values.
+        """
+        self.__tokens: List[str] = []
+        self.__offsets_in_ticks: List[float] = []
+        self.__durations_in_ticks: List[float] = []
+        self.__display_texts: List[str] = []
+        self.__sentence_starts: List[int] = []
+        self.__sentence_ended = True
+        self.__normalized_tokens: Dict[str, str] = {}
+
+    def add_word(self, display_word: Dict[str, Any]) -> None:
+        """Adds a recognized word to the table.
+
+        display_word (Dict[str, Any]): Specifies the display word of the best recognition of a phrase.
+        RETURNS (None): No return values.
+        """
+        # Start a new sentence after the end of the previous one
+        if self.__sentence_ended:
+            self.__sentence_starts.append(len(self.__tokens))
+            self.__sentence_ended = False
+
+        # Normalize every distinct word only once
+        display_text = sys.intern(display_word["displayText"])
+        token = self.__normalized_tokens.get(display_text)
+        if token is None:
+            token = sys.intern(get_normalized_text(text=display_text))
+            self.__normalized_tokens[display_text] = token
+        self.__tokens.append(token)
+        self.__display_texts.append(display_text)
+        if display_text.rstrip(SENTENCE_CLOSING_CHARACTERS).endswith(
+            SENTENCE_TERMINATORS
+        ):
+            self.__sentence_ended = True
+
+        # Use the tick notation of the service if available
+        offset_in_ticks = display_word.get("offsetInTicks")
+        duration_in_ticks = display_word.get("durationInTicks")
+        self.__offsets_in_ticks.append(
+            get_ticks(item=display_word, key="offset")
+            if offset_in_ticks is None
+            else offset_in_ticks
+        )
+        self.__durations_in_ticks.append(
+            get_ticks(item=display_word, key="duration")
+            if duration_in_ticks is None
+            else duration_in_ticks
+        )
+
+    def end_phrase(self) -> None:
+        """Ends the current sentence at the end of a recognized phrase.
+
+        RETURNS (None): No return values.
+        """
+        self.__sentence_ended = True
+
+    def build(self) -> WordTable:
+        """Returns the word table of all added words.
+
+        RETURNS (WordTable): The word table.
+        """
+        return WordTable(
+            tokens=self.__tokens,
+            offsets_in_ticks=np.rint(self.__offsets_in_ticks).astype(np.int64),
+            durations_in_ticks=np.rint(self.__durations_in_ticks).astype(np.int64),
+            display_texts=self.__display_texts,
+            sentence_starts=np.asarray(self.__sentence_starts, dtype=np.int64),
+        )
+
+
+async def read_stt_result(
+    chunks: AsyncIterator[bytes], parse_size: int = 64 * 1024
+) -> Tuple[str, str, WordTable]:
+    """Reads the content required for the analysis from a stream of an Azure AI Speech STT batch transcription.
+
+    The JSON document is parsed incrementally, so that only the combined transcript, the locale and
+    the display words of the best recognition of every phrase are kept in memory instead of the
+    whole document. Recognized phrases are materialized one at a time and discarded once their words
+    are added to the word table.
+
+    chunks (AsyncIterator[bytes]): Specifies the chunks of the uncompressed JSON content.
+    parse_size (int): Specifies the number of bytes passed to the parser at once, which bounds the number of pending phrases.
+    RETURNS (Tuple[str, str, WordTable]): The transcript, the locale and the word table of the transcription.
+    """
+    transcript = None
+    locale = None
+    word_table_builder = WordTableBuilder()
+
+    # Parse combined transcript and recognized phrases in a single pass over the stream
+    combined_displays = ijson.sendable_list()
+    combined_display_parser = ijson.items_coro(
+        combined_displays, "combinedRecognizedPhrases.item.display"
+    )
+    recognized_phrases = ijson.sendable_list()
+    recognized_phrase_parser = ijson.items_coro(
+        recognized_phrases, "recognizedPhrases.item", use_float=True
+    )
+
+    def process_items() -> None:
+        nonlocal transcript, locale
+        if transcript is None and combined_displays:
+            transcript = combined_displays[0]
+        for recognized_phrase in recognized_phrases:
+            if locale is None:
+                locale = recognized_phrase.get("locale", "Unknown")
+            recognized_phrase_best = recognized_phrase.get("nBest", [])[0]
+            for display_word in recognized_phrase_best.get("displayWords", []):
+                word_table_builder.add_word(display_word=display_word)
+            word_table_builder.end_phrase()
+        del recognized_phrases[:]
+
+    async for chunk in chunks:
+        for index in range(0, len(chunk), parse_size):
+            data = chunk[index : index + parse_size]
+            # Combined phrases precede the recognized phrases, so the second parser stops early
+            if transcript is None:
+                combined_display_parser.send(data)
+            recognized_phrase_parser.send(data)
+            process_items()
+    if transcript is None:
+        combined_display_parser.close()
+    recognized_phrase_parser.close()
+    process_items()
+
+    return transcript, locale or "Unknown", word_table_builder.build()
+
+
+def get_word_index(words: List[str]) -> Dict[str, List[int]]:
+    """Builds an index of the positions of every word in a transcript.
+
+    words (List[str]): Specifies the normalized words of the transcript.
+    RETURNS (Dict[str, List[int]]): The ascending positions of every word.
+    """
+    word_index = defaultdict(list)
+    for position, word in enumerate(words):
+        word_index[word].append(position)
+    return dict(word_index)
+
+
+def find_phrase(
+    words: List[str],
+    word_index: Dict[str, List[int]],
+    phrase_words: List[str],
+    start_position: int = 0,
+) -> int:
+    """Returns the first position of a phrase in a transcript at or after a start position.
+
+    The candidates are the positions of the rarest word of the phrase, so that only a few positions
+    have to be compared with the full phrase.
+
+    words (List[str]): Specifies the normalized words of the transcript.
+    word_index (Dict[str, List[int]]): Specifies the positions of every word of the transcript.
+    phrase_words (List[str]): Specifies the normalized words of the phrase.
+    start_position (int): Specifies the first position of the transcript that is searched.
+    RETURNS (int): The position of the first word of the phrase or -1 if the phrase is not found.
+    """
+    if not phrase_words:
+        return -1
+
+    # Use the rarest word of the phrase as anchor
+    anchor_index = min(
+        range(len(phrase_words)),
+        key=lambda index: len(word_index.get(phrase_words[index], [])),
+    )
+    anchor_positions = word_index.get(phrase_words[anchor_index], [])
+    for anchor_position in anchor_positions[
+        bisect.bisect_left(anchor_positions, start_position + anchor_index) :
+    ]:
+        position = anchor_position - anchor_index
+        if position + len(phrase_words) > len(words):
             break
-        except ValueError as e:
-            logging.warning(
-                f"Parsing offset unsuccesful with string format '{format_option}'.",
-            )
+        if words[position : position + len(phrase_words)] == phrase_words:
+            return position
+    return -1
 
-    if td is None:
-        message = f"Unable to parse offset '{timedelta_str}' with format options '{format_options}'"
-        logging.error(message)
-        raise ValueError(message)
-    return (format, td)
 
+def get_edit_distances(
+    phrase_ids: np.ndarray, window_ids: np.ndarray, free_start: bool = False
+) -> np.ndarray:
+    """Computes the word-level edit distances of a phrase to the spans of a window that end at every position.
+
+    Every row of the dynamic program is computed at once: substitutions and deletions only depend on
+    the previous row, while insertions are resolved with a cumulative minimum over the current row.
+
+    phrase_ids (np.ndarray): Specifies the word ids of the phrase.
+    window_ids (np.ndarray): Specifies the word ids of the window of the transcript.
+    free_start (bool): Specifies whether spans may start anywhere in the window instead of at its first word.
+    RETURNS (np.ndarray): The edit distance of the phrase to the best span that ends before the `j`-th word of the window for every `j`.
+    """
+    columns = np.arange(len(window_ids) + 1)
+    distances = np.zeros_like(columns) if free_start else columns.copy()
+    for row, phrase_id in enumerate(phrase_ids, start=1):
+        candidates = np.empty_like(distances)
+        candidates[0] = row
+        np.minimum(
+            distances[:-1] + (window_ids != phrase_id),
+            distances[1:] + 1,
+            out=candidates[1:],
+        )
+        distances = np.minimum.accumulate(candidates - columns) + columns
+    return distances
+
+
+def find_phrase_approximate(
+    word_table: WordTable,
+    phrase_words: List[str],
+    start_position: int = 0,
+    end_position: int = None,
+    max_gap: int = 8,
+    max_shift: int = 2,
+    max_seed_words: int = 6,
+    max_seed_occurrences: int = 256,
+    max_candidates: int = 8,
+) -> Tuple[int, int, float]:
+    """Returns the span of a transcript that matches a phrase best at or after a start position.
+
+    The search follows seed and extend: occurrences of the rarest words of the phrase vote for the
+    position at which the phrase would start, and only the best voted, non-overlapping positions are
+    extended with a word-level edit distance within `max_gap` words. The cost per phrase is therefore
+    bounded by the number of seeds and candidates instead of the length of the transcript.
+
+    word_table (WordTable): Specifies the word table of the transcript.
+    phrase_words (List[str]): Specifies the normalized words of the phrase.
+    start_position (int): Specifies the first position of the transcript that is searched.
+    end_position (int): Specifies the position (exclusive) up to which the transcript is searched. Defaults to the end of the transcript.
+    max_gap (int): Specifies the maximum number of words a match may be shifted by insertions and deletions.
+    max_shift (int): Specifies the distance of positions whose votes are counted together.
+    max_seed_words (int): Specifies the number of rarest words of the phrase used as seeds.
+    max_seed_occurrences (int): Specifies the number of nearest occurrences after the start position of every seed word.
+    max_candidates (int): Specifies the number of best voted positions that are extended.
+    RETURNS (Tuple[int, int, float]): The start and end position (exclusive) of the span and the confidence between 0 and 1, or (-1, -1, 0.0) if no span is found.
+    """
+    word_positions = word_table.get_word_positions()
+    vocabulary = word_table.get_vocabulary()
+    token_ids = word_table.get_token_ids()
+    phrase_length = len(phrase_words)
+    end_position = (
+        len(token_ids) if end_position is None else min(end_position, len(token_ids))
+    )
+    if not phrase_length or start_position >= end_position:
+        return -1, -1, 0.0
+
+    # Vote for start positions with the nearest occurrences of the rarest words
+    seed_indices = sorted(
+        (
+            index
+            for index, phrase_word in enumerate(phrase_words)
+            if phrase_word in word_positions
+        ),
+        key=lambda index: len(word_positions[phrase_words[index]]),
+    )[:max_seed_words]
+    if not seed_indices:
+        return -1, -1, 0.0
+    seeds = []
+    for index in seed_indices:
+        positions = word_positions[phrase_words[index]]
+        first = np.searchsorted(positions, start_position)
+        last = np.searchsorted(positions, end_position)
+        seeds.append(positions[first : min(first + max_seed_occurrences, last)] - index)
+    diagonals = np.concatenate(seeds)
+    diagonals, counts = np.unique(
+        diagonals[diagonals >= start_position - max_gap], return_counts=True
+    )
+    if not len(diagonals):
+        return -1, -1, 0.0
+
+    # Count the votes of nearby positions, which are shifted by inserted or dropped words
+    cumulative_counts = np.concatenate([[0], np.cumsum(counts)])
+    votes = (
+        cumulative_counts[
+            np.searchsorted(diagonals, diagonals + max_shift, side="right")
+        ]
+        - cumulative_counts[np.searchsorted(diagonals, diagonals - max_shift)]
+    )
 
-def get_timestamps_for_sections(result_stt: Any, result_llm: Any) -> Any:
+    # Extend best voted positions that do not overlap with the edit distance to the phrase
+    phrase_ids = np.fromiter(
+        (vocabulary.get(phrase_word, -1) for phrase_word in phrase_words),
+        dtype=np.int32,
+        count=phrase_length,
+    )
+    candidates: List[int] = []
+    for candidate_index in np.argsort(-votes, kind="stable"):
+        if len(candidates) >= max_candidates:
+            break
+        candidate = int(diagonals[candidate_index])
+        if all(abs(candidate - other) > phrase_length for other in candidates):
+            candidates.append(candidate)
+
+    best = (-1, -1, 0.0)
+    best_distance = phrase_length
+    for candidate in candidates:
+        window_start = max(candidate - max_gap, start_position)
+        window_end = min(candidate + phrase_length + max_gap, end_position)
+        window_ids = token_ids[window_start:window_end]
+
+        # Find end of best span with free start and then its start backwards from the end,
+        # preferring the longest span on ties to cover as many words of the phrase as possible
+        end_distances = get_edit_distances(
+            phrase_ids=phrase_ids, window_ids=window_ids, free_start=True
+        )
+        end = len(end_distances) - 1 - int(np.argmin(end_distances[::-1]))
+        distance = int(end_distances[end])
+        if distance > best_distance or end == 0:
+            continue
+        start_distances = get_edit_distances(
+            phrase_ids=phrase_ids[::-1], window_ids=window_ids[:end][::-1]
+        )
+        length = len(start_distances) - 1 - int(np.argmin(start_distances[::-1]))
+
+        # Prefer the first of equally good spans like the exact search
+        if distance == best_distance and window_start + end - length > best[0] >= 0:
+            continue
+        best_distance = distance
+        best = (
+            window_start + end - length,
+            window_start + end,
+            1.0 - distance / phrase_length,
+        )
+    return best
+
+
+def find_section_phrase(
+    word_table: WordTable,
+    phrase_words: List[str],
+    start_position: int = 0,
+    alignment_mode: Literal["exact", "approximate"] = "exact",
+    min_confidence: float = 0.6,
+) -> Tuple[int, int, float]:
+    """Returns the span of a section sentence in a transcript at or after a start position.
+
+    word_table (WordTable): Specifies the word table of the transcript.
+    phrase_words (List[str]): Specifies the normalized words of the sentence.
+    start_position (int): Specifies the first position of the transcript that is searched.
+    alignment_mode (Literal["exact", "approximate"]): Specifies whether sentences that do not match exactly are aligned approximately.
+    min_confidence (float): Specifies the minimum confidence of an approximate alignment.
+    RETURNS (Tuple[int, int, float]): The start and end position (exclusive) of the span and the confidence, or (-1, -1, 0.0) if the sentence is not found.
+    """
+    position = find_phrase(
+        words=word_table.tokens,
+        word_index=word_table.get_word_index(),
+        phrase_words=phrase_words,
+        start_position=start_position,
+    )
+    if position >= 0:
+        return position, position + len(phrase_words), 1.0
+    if alignment_mode == "approximate":
+        # Only align approximately if the sentence does not occur after the start position
+        start, end, confidence = find_phrase_approximate(
+            word_table=word_table,
+            phrase_words=phrase_words,
+            start_position=start_position,
+        )
+        if start >= 0 and confidence >= min_confidence:
+            return start, end, confidence
+    return -1, -1, 0.0
+
+
+def get_timestamps_for_sections(
+    result_stt: Any,
+    result_llm: Any,
+    word_table: WordTable = None,
+    alignment_mode: Literal["exact", "approximate"] = "exact",
+    min_confidence: float = 0.6,
+) -> Any:
     """Calculates and adds timestamps to the llm result.
 
+    Sections are ordered and do not overlap, so the start and end sentences are searched with a cursor
+    that only moves forward through the transcript. Sentences that cannot be found after the cursor
+    are searched in the whole transcript. In approximate mode, sentences that do not match exactly are
+    aligned with the best matching span and the confidence of every alignment is added to the result.
+
     result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
     result_llm (Any): Specifies the JSON content from Azure Open AI analysis.
+    word_table (WordTable): Specifies the word table of the transcript, which is built from the stt result if not provided.
+    alignment_mode (Literal["exact", "approximate"]): Specifies whether sentences that do not match exactly are aligned approximately.
+    min_confidence (float): Specifies the minimum confidence of an approximate alignment.
     RETURNS (Any): The JSON content from Azure Open AI analysis with added timestamps for start and end.
     """
-    # Get word details from stt result
-    word_details = get_word_details(result_stt=result_stt, normalize_text=True)
+    # Get word table from stt result
+    if word_table is None:
+        word_table = WordTable.from_stt_result(result_stt=result_stt)
 
     # Prepare result
     result = copy.deepcopy(result_llm.get("sections", []))
 
+    cursor = 0
     for index_llm, item_llm in enumerate(result_llm.get("sections", [])):
-        # Configure current item
-        item_llm_current = "start"
-
-        # Get llm item words
-        item_llm_words = str(
-            get_normalized_text(item_llm.get(item_llm_current, ""))
-        ).split(sep=" ")
-
-        for index_word, item_word in enumerate(word_details):
-            # Get display text of current word item
-            item_word_display_text = item_word.get("displayText")
-
-            # Check if first word matches
-            if item_word_display_text and item_word_display_text == item_llm_words[0]:
-                # Check if following words also match
-                identical = [
-                    item_llm_word
-                    == word_details[index_word + index_llm_word].get("displayText")
-                    for index_llm_word, item_llm_word in enumerate(item_llm_words)
-                ]
-                all_identical = all(identical)
-
-                # If all are identical then update the timestamps
-                if all_identical:
-                    # Calculate timestamp based on start or end item
-                    if item_llm_current == "start":
-                        _, td_offset = offset_and_duration_to_timedelta(
-                            timedelta_str=item_word.get("offset")
-                        )
-                        td_sum = td_offset
-                    else:
-                        _, td_offset = offset_and_duration_to_timedelta(
-                            timedelta_str=word_details[
-                                index_word + len(item_llm_words) - 1
-                            ].get("offset")
-                        )
-                        _, td_duration = offset_and_duration_to_timedelta(
-                            timedelta_str=word_details[
-                                index_word + len(item_llm_words) - 1
-                            ].get("duration")
-                        )
-                        td_sum = td_offset + td_duration
-                    result[index_llm][f"{item_llm_current}_time"] = str(td_sum)
-
-                    # Update start or end item
-                    if item_llm_current == "start":
-                        # Configure new current item
-                        item_llm_current = "end"
-
-                        # Get new llm item words
-                        item_llm_words = str(
-                            get_normalized_text(item_llm.get(item_llm_current, ""))
-                        ).split(sep=" ")
-                    else:
-                        break
+        # Find start sentence
+        start_words = get_normalized_text(item_llm.get("start", "")).split()
+        start_position, _, start_confidence = find_section_phrase(
+            word_table=word_table,
+            phrase_words=start_words,
+            start_position=cursor,
+            alignment_mode=alignment_mode,
+            min_confidence=min_confidence,
+        )
+        if start_position < 0 and cursor > 0:
+            logging.warning(
+                f"Start of section {index_llm} not found after position {cursor}, searching whole transcript."
+            )
+            start_position, _, start_confidence = find_section_phrase(
+                word_table=word_table,
+                phrase_words=start_words,
+                alignment_mode=alignment_mode,
+                min_confidence=min_confidence,
+            )
+        if start_position < 0:
+            logging.warning(f"Start of section {index_llm} not found in transcript.")
+            continue
+        result[index_llm]["start_time"] = str(
+            word_table.get_start_time(position=start_position)
+        )
+        if alignment_mode == "approximate":
+            result[index_llm]["start_confidence"] = round(start_confidence, 4)
+
+        # Find end sentence after start sentence
+        end_words = get_normalized_text(item_llm.get("end", "")).split()
+        _, end_position, end_confidence = find_section_phrase(
+            word_table=word_table,
+            phrase_words=end_words,
+            start_position=start_position,
+            alignment_mode=alignment_mode,
+            min_confidence=min_confidence,
+        )
+        if end_position < 0:
+            logging.warning(f"End of section {index_llm} not found in transcript.")
+            cursor = start_position + 1
+            continue
+        result[index_llm]["end_time"] = str(
+            word_table.get_end_time(position=end_position - 1)
+        )
+        if alignment_mode == "approximate":
+            result[index_llm]["end_confidence"] = round(end_confidence, 4)
+        cursor = end_position
+
+    # Return result
+    return {
+        "sections": result,
+    }
+
+
+def get_timestamps_for_sentence_sections(word_table: WordTable, result_llm: Any) -> Any:
+    """Adds sentences and timestamps to an llm result whose sections reference sentence ids.
+
+    Sentences are numbered in the transcript sent to the llm, so the timestamps are looked up directly
+    instead of searching the sentences in the transcript.
+
+    word_table (WordTable): Specifies the word table of the transcript with the numbered sentences.
+    result_llm (Any): Specifies the JSON content from Azure Open AI analysis with `start_sentence_id` and `end_sentence_id` per section.
+    RETURNS (Any): The JSON content from Azure Open AI analysis with added sentences and timestamps for start and end.
+    """
+    # Prepare result
+    result = copy.deepcopy(result_llm.get("sections", []))
+    sentence_count = word_table.get_sentence_count()
+
+    for index_llm, item_llm in enumerate(result):
+        # Look up start sentence
+        start_sentence_id = item_llm.get("start_sentence_id")
+        if start_sentence_id is None or not 1 <= start_sentence_id <= sentence_count:
+            logging.warning(
+                f"Start sentence id '{start_sentence_id}' of section {index_llm} is not between 1 and {sentence_count}."
+            )
+            continue
+        start_position, _ = word_table.get_sentence_span(sentence_id=start_sentence_id)
+        item_llm["start"] = word_table.get_sentence_text(sentence_id=start_sentence_id)
+        item_llm["start_time"] = str(word_table.get_start_time(position=start_position))
+
+        # Look up end sentence
+        end_sentence_id = item_llm.get("end_sentence_id")
+        if (
+            end_sentence_id is None
+            or not start_sentence_id <= end_sentence_id <= sentence_count
+        ):
+            logging.warning(
+                f"End sentence id '{end_sentence_id}' of section {index_llm} is not between {start_sentence_id} and {sentence_count}."
+            )
+            continue
+        _, end_position = word_table.get_sentence_span(sentence_id=end_sentence_id)
+        item_llm["end"] = word_table.get_sentence_text(sentence_id=end_sentence_id)
+        item_llm["end_time"] = str(word_table.get_end_time(position=end_position - 1))
 
     # Return result
     return {
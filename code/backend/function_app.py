@@ -1,8 +1,50 @@
+import asyncio
+import atexit
+import logging
+
 import azure.functions as func
 from aispeechanalysis.function import bp as bp_aispeech
 from health.function import bp as bp_health
+from shared.config import settings
+from shared.executor import media_execution_pool
+from shared.http import http_client_registry
+from shared.storage import storage_backend_registry
 from videoupload.function import bp as bp_videoupload
 
+storage_backend_registry.configure(
+    storage_backend=settings.STORAGE_BACKEND,
+    local_root_directory=settings.STORAGE_LOCAL_ROOT_DIRECTORY,
+)
+media_execution_pool.configure(max_workers=settings.MEDIA_EXECUTION_POOL_MAX_WORKERS)
+
+
+def close_pooled_clients() -> None:
+    """Closes the pooled clients and credentials of the worker on shutdown.
+
+    Clients are closed on the event loop of the worker if it is still open, since pooled
+    connections are bound to the loop they were opened on. The credentials of the token cache
+    are pooled by the storage backend registry and are closed last.
+
+    RETURNS (None): No return values.
+    """
+    try:
+        loop = asyncio.get_event_loop_policy().get_event_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+    if loop.is_running():
+        logging.warning("Cannot close pooled clients while the event loop is running.")
+        return
+    for close in [http_client_registry.close, storage_backend_registry.close]:
+        try:
+            loop.run_until_complete(close())
+        except Exception as e:
+            logging.warning(f"Closing pooled clients failed: {e}")
+
+
+atexit.register(close_pooled_clients)
+
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 app.register_functions(bp_health)
 app.register_functions(bp_videoupload)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Tuple
+
+from azure.core.credentials import AccessToken
+from azure.identity.aio import DefaultAzureCredential
+from shared.models import TokenCacheMetrics
+from shared.storage import storage_backend_registry
+
+
+class TokenCache:
+    def __init__(
+        self,
+        get_credential: Callable[[str], DefaultAzureCredential] = None,
+        refresh_margin_in_seconds: float = 300.0,
+    ) -> None:
+        """Initializes the process-wide cache of access tokens.
+
+        Tokens are keyed by scope and managed identity client id and are shared across all clients
+        of the worker. A token is refreshed once it expires within `refresh_margin_in_seconds`, and
+        concurrent callers of the same key wait for a single refresh.
+
+        get_credential (Callable[[str], DefaultAzureCredential]): Specifies a function that returns the credential for a managed identity client id. Defaults to the pooled credentials of the storage backend registry.
+        refresh_margin_in_seconds (float): Specifies how long before expiry a token is refreshed.
+        RETURNS (None): No return values.
+        """
+        self.__get_credential = get_credential or (
+            lambda managed_identity_client_id: storage_backend_registry.get_credential(
+                managed_identity_client_id=managed_identity_client_id
+            )
+        )
+        self.__refresh_margin_in_seconds = refresh_margin_in_seconds
+        self.__tokens: Dict[Tuple[str, str], AccessToken] = {}
+        self.__locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.__hits = 0
+        self.__refreshes = 0
+        self.__refresh_duration_in_seconds = 0.0
+
+    async def get_token(
+        self, scope: str, managed_identity_client_id: str = None
+    ) -> AccessToken:
+        """Returns a cached access token and refreshes it before expiry.
+
+        scope (str): Specifies the scope of the access token.
+        managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+        RETURNS (AccessToken): The access token.
+        """
+        key = (scope, managed_identity_client_id or "")
+        token = self.__tokens.get(key)
+        if token is None or self.__requires_refresh(token=token):
+            lock = self.__locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                token = self.__tokens.get(key)
+                if token is None or self.__requires_refresh(token=token):
+                    logging.debug(f"Refreshing access token for scope '{scope}'.")
+                    start_time = time.perf_counter()
+                    credential = self.__get_credential(managed_identity_client_id)
+                    token = await credential.get_token(scope)
+                    self.__tokens[key] = token
+                    self.__refreshes += 1
+                    self.__refresh_duration_in_seconds += (
+                        time.perf_counter() - start_time
+                    )
+                    return token
+        self.__hits += 1
+        return token
+
+    def __requires_refresh(self, token: AccessToken) -> bool:
+        return token.expires_on - time.time() < self.__refresh_margin_in_seconds
+
+    def get_metrics(self) -> TokenCacheMetrics:
+        """Returns the usage metrics of the token cache.
+
+        RETURNS (TokenCacheMetrics): The number of cache hits, token refreshes and cached tokens, and the total duration of token refreshes.
+        """
+        return TokenCacheMetrics(
+            hits=self.__hits,
+            refreshes=self.__refreshes,
+            tokens=len(self.__tokens),
+            refresh_duration_in_seconds=self.__refresh_duration_in_seconds,
+        )
+
+
+token_cache = TokenCache()
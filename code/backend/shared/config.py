@@ -1,6 +1,7 @@
 import logging
+from typing import Any, Literal, Optional
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -32,14 +33,42 @@ class Settings(BaseSettings):
     AZURE_AI_SPEECH_BASE_URL: str
     AZURE_AI_SPEECH_API_VERSION: str = "2024-05-15-preview"
     AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY: str
+    AZURE_AI_SPEECH_REQUESTS_PER_SECOND: float = Field(
+        default=5.0,
+        alias="AZURE_AI_SPEECH_REQUESTS_PER_SECOND",
+        gt=0,
+    )
+    AZURE_AI_SPEECH_MAX_CONCURRENCY: int = Field(
+        default=16,
+        alias="AZURE_AI_SPEECH_MAX_CONCURRENCY",
+        gt=0,
+    )
 
     # Azure Open AI config
     AZURE_OPEN_AI_BASE_URL: str = "https://durable-aoai001.openai.azure.com/"
     AZURE_OPEN_AI_API_VERSION: str = "2024-02-15-preview"
     AZURE_OPEN_AI_DEPLOYMENT_NAME: str = "gpt-4o"
     AZURE_OPEN_AI_TEMPERATURE: float = 0.0
+    AZURE_OPEN_AI_REQUESTS_PER_SECOND: float = Field(
+        default=1.0,
+        alias="AZURE_OPEN_AI_REQUESTS_PER_SECOND",
+        gt=0,
+    )
+    AZURE_OPEN_AI_MAX_CONCURRENCY: int = Field(
+        default=4,
+        alias="AZURE_OPEN_AI_MAX_CONCURRENCY",
+        gt=0,
+    )
 
     # Storage config
+    STORAGE_BACKEND: Literal["azure", "local"] = Field(
+        default="azure",
+        alias="STORAGE_BACKEND",
+    )
+    STORAGE_LOCAL_ROOT_DIRECTORY: str = Field(
+        default=".localstorage",
+        alias="STORAGE_LOCAL_ROOT_DIRECTORY",
+    )
     STORAGE_DOMAIN_NAME: str = Field(
         default="rgdurablefunctiona8c3.blob.core.windows.net",
         alias="STORAGE_DOMAIN_NAME",
@@ -74,6 +103,158 @@ class Settings(BaseSettings):
         min_length=3,
         max_length=63,
     )
+    STORAGE_DOWNLOAD_CHUNK_SIZE: int = Field(
+        default=4 * 1024 * 1024,
+        alias="STORAGE_DOWNLOAD_CHUNK_SIZE",
+        gt=0,
+    )
+    STORAGE_DOWNLOAD_MAX_CONCURRENCY: int = Field(
+        default=4,
+        alias="STORAGE_DOWNLOAD_MAX_CONCURRENCY",
+        gt=0,
+    )
+    STORAGE_UPLOAD_BLOCK_SIZE: int = Field(
+        default=4 * 1024 * 1024,
+        alias="STORAGE_UPLOAD_BLOCK_SIZE",
+        gt=0,
+        le=4000 * 1024 * 1024,
+    )
+    STORAGE_UPLOAD_MAX_CONCURRENCY: int = Field(
+        default=4,
+        alias="STORAGE_UPLOAD_MAX_CONCURRENCY",
+        gt=0,
+    )
+    STORAGE_ARTIFACT_COMPRESSION: Optional[Literal["gzip", "zstd"]] = Field(
+        default=None,
+        alias="STORAGE_ARTIFACT_COMPRESSION",
+    )
+    STORAGE_COPY_MAX_CONCURRENCY: int = Field(
+        default=8,
+        alias="STORAGE_COPY_MAX_CONCURRENCY",
+        gt=0,
+    )
+    STORAGE_COPY_SYNC_SIZE_THRESHOLD: int = Field(
+        default=256 * 1024 * 1024,
+        alias="STORAGE_COPY_SYNC_SIZE_THRESHOLD",
+        ge=0,
+        le=256 * 1024 * 1024,
+    )
+
+    # Media execution config
+    MEDIA_EXECUTION_POOL_MAX_WORKERS: Optional[int] = Field(
+        default=None,
+        alias="MEDIA_EXECUTION_POOL_MAX_WORKERS",
+        gt=0,
+    )
+    MEDIA_EXECUTION_TIMEOUT: float = Field(
+        default=3600.0,
+        alias="MEDIA_EXECUTION_TIMEOUT",
+        gt=0,
+    )
+
+    # Video upload config
+    VIDEO_DEDUPLICATION_ENABLED: bool = Field(
+        default=True,
+        alias="VIDEO_DEDUPLICATION_ENABLED",
+    )
+    VIDEO_INGEST_MODE: Literal["file", "stream"] = Field(
+        default="stream",
+        alias="VIDEO_INGEST_MODE",
+    )
+    VIDEO_AUDIO_SAMPLE_RATE: int = Field(
+        default=16000,
+        alias="VIDEO_AUDIO_SAMPLE_RATE",
+        ge=8000,
+        le=48000,
+    )
+    VIDEO_AUDIO_CHANNELS: int = Field(
+        default=1,
+        alias="VIDEO_AUDIO_CHANNELS",
+        ge=1,
+        le=2,
+    )
+    VIDEO_AUDIO_CODEC: str = Field(
+        default="pcm_s16le",
+        alias="VIDEO_AUDIO_CODEC",
+    )
+
+    # Transcription config
+    VOICE_ACTIVITY_DETECTION_ENABLED: bool = Field(
+        default=True,
+        alias="VOICE_ACTIVITY_DETECTION_ENABLED",
+    )
+    VOICE_ACTIVITY_MIN_REMOVED_PERCENTAGE: float = Field(
+        default=5.0,
+        alias="VOICE_ACTIVITY_MIN_REMOVED_PERCENTAGE",
+        ge=0,
+        le=100,
+    )
+    TRANSCRIPTION_SEGMENT_DURATION: Optional[float] = Field(
+        default=None,
+        alias="TRANSCRIPTION_SEGMENT_DURATION",
+        ge=0,
+    )
+    TRANSCRIPTION_SEGMENT_OVERLAP_DURATION: float = Field(
+        default=4.0,
+        alias="TRANSCRIPTION_SEGMENT_OVERLAP_DURATION",
+        ge=0,
+    )
+    TRANSCRIPTION_SILENCE_SEARCH_DURATION: float = Field(
+        default=20.0,
+        alias="TRANSCRIPTION_SILENCE_SEARCH_DURATION",
+        ge=0,
+    )
+    # Batching is disabled by default, as it would merge the parallel segment jobs of a video
+    TRANSCRIPTION_BATCH_WINDOW: float = Field(
+        default=0.0,
+        alias="TRANSCRIPTION_BATCH_WINDOW",
+        ge=0,
+    )
+    TRANSCRIPTION_BATCH_MAX_SIZE: int = Field(
+        default=50,
+        alias="TRANSCRIPTION_BATCH_MAX_SIZE",
+        ge=1,
+    )
+    TRANSCRIPTION_COMPLETION_SCHEDULE: str = Field(
+        default="*/30 * * * * *",
+        alias="TRANSCRIPTION_COMPLETION_SCHEDULE",
+    )
+    TRANSCRIPTION_COMPLETION_INITIAL_CHECK_INTERVAL: float = Field(
+        default=30.0,
+        alias="TRANSCRIPTION_COMPLETION_INITIAL_CHECK_INTERVAL",
+        gt=0,
+    )
+    TRANSCRIPTION_COMPLETION_MAX_CHECK_INTERVAL: float = Field(
+        default=300.0,
+        alias="TRANSCRIPTION_COMPLETION_MAX_CHECK_INTERVAL",
+        gt=0,
+    )
+    TRANSCRIPTION_COMPLETION_MAX_CONCURRENCY: int = Field(
+        default=8,
+        alias="TRANSCRIPTION_COMPLETION_MAX_CONCURRENCY",
+        gt=0,
+    )
+    TRANSCRIPTION_COMPLETION_TIMEOUT: float = Field(
+        default=12 * 60 * 60,
+        alias="TRANSCRIPTION_COMPLETION_TIMEOUT",
+        gt=0,
+    )
+
+    # Speech analysis config
+    LLM_SECTION_MODE: Literal["text", "sentence_id"] = Field(
+        default="text",
+        alias="LLM_SECTION_MODE",
+    )
+    SECTION_ALIGNMENT_MODE: Literal["exact", "approximate"] = Field(
+        default="exact",
+        alias="SECTION_ALIGNMENT_MODE",
+    )
+    SECTION_ALIGNMENT_MIN_CONFIDENCE: float = Field(
+        default=0.6,
+        alias="SECTION_ALIGNMENT_MIN_CONFIDENCE",
+        ge=0,
+        le=1,
+    )
 
     # News tag extraction config
     ROOT_FOLDER_NAME: str = "newstagextraction"
@@ -102,6 +283,60 @@ class Settings(BaseSettings):
     ---
     Identify news sections for the provided news text according to the instructions. The text is from the following tv show: {news_show_details}
     """
+    SYSTEM_PROMPT_SENTENCE_ID: str = """
+    You are a world class assistant for identifying news sections.
+    The provided news content consists of numbered sentences. Every sentence is on a separate line and starts with its id in square brackets, e.g. "[12] The match ended in a draw.".
+    Do the following with the provided news content and provide a valid JSON response that uses the schema mentioned below:
+    1. Split the provided news content into broad thematic sections. The content of each section must cover a common news topic, whereas each section must comply with the following rules:
+        a) The first sentence in the provided news content must be part of the first section. The last sentence in the provided news content must be part of the last section.
+        b) Each section should consist of at least 3 sentences.
+        c) Every sentence of the provided news content must be part of exactly one section. If you are unsure about one sentence, then assign it to the previous section.
+        d) The last sentence of one section must be followed by the first sentence of the next section.
+        e) The sections are not allowed to overlap and must be mutually exclusive.
+        f) It is ok if some sections consist of 20 or more sentences and other sections only consist of 3 or more sentences.
+    2. You must find the id of the first sentence and the id of the last sentence of each section. Define the id of the first sentence as start_sentence_id and the id of the last sentence as end_sentence_id. Do not repeat the text of the sentences.
+    3. Generate a title for each news section.
+    4. Add one category to each section that matches the content. Assign one of the following categories: politics, sports, economy, environment, international, technology, health, meteorology, national, culture, justice, events.
+    5. Add tags to each section. Samples for tags are: sports, weather, international news, national news, politics, crime, technology, celebrity, other. Add up to 5 additional tags based on the content of each section.
+    6. Generate a score between 0 and 10 for each section. The score indicates how good the defined tags match the content of the section. 0 indicates that the tags don't match the content, and 10 means that the tags are a perfect match.
+    7. Translate the title and tags for each section into the language of the news content.
+    Here is a sample JSON response:
+    {"sections": [{"id": 1, "title": "Election results", "category": "politics", "tags": ["politics", "national news", "election"], "score": 9, "start_sentence_id": 1, "end_sentence_id": 14}, {"id": 2, "title": "Weather forecast", "category": "meteorology", "tags": ["weather"], "score": 10, "start_sentence_id": 15, "end_sentence_id": 21}]}
+    """
+    USER_PROMPT_SENTENCE_ID: str = """
+    News Content:
+    {news_content}
+    ---
+    Identify news sections for the provided numbered sentences according to the instructions. Reference sentences only by their ids. The text is from the following tv show: {news_show_details}
+    """
+
+    @field_validator("STORAGE_DOMAIN_NAME")
+    @classmethod
+    def get_storage_domain_name(cls, value: str) -> str:
+        # Accept blob endpoints like 'https://<account>.blob.core.windows.net/' and return the host name
+        return value.split("://", 1)[-1].strip("/")
+
+    @field_validator("TRANSCRIPTION_SEGMENT_DURATION", mode="before")
+    @classmethod
+    def parse_transcription_segment_duration(cls, value: Any) -> Any:
+        # Accept empty values of app settings to disable the segmentation
+        if isinstance(value, str) and value.strip().lower() in ["", "none", "null"]:
+            return None
+        return value
+
+    @field_validator("TRANSCRIPTION_SEGMENT_DURATION")
+    @classmethod
+    def get_transcription_segment_duration(
+        cls, value: Optional[float]
+    ) -> Optional[float]:
+        # A duration of 0 disables the segmentation, shorter segments are not supported
+        if not value:
+            return None
+        if value <= 60:
+            raise ValueError(
+                f"Transcription segment duration '{value}' must be 0 or greater than 60 seconds."
+            )
+        return value
 
 
 settings = Settings()
@@ -0,0 +1,84 @@
+import logging
+from typing import Any, Dict
+
+TICKS_PER_SECOND = 10_000_000
+DURATION_UNIT_TICKS = {
+    "D": 24 * 60 * 60 * TICKS_PER_SECOND,
+    "H": 60 * 60 * TICKS_PER_SECOND,
+    "M": 60 * TICKS_PER_SECOND,
+    "S": TICKS_PER_SECOND,
+}
+
+
+def parse_duration(duration: str) -> int:
+    """Parses an ISO 8601 duration of Azure AI Speech (e.g. 'PT1M38.32S') to ticks of 100 nanoseconds in a single pass.
+
+    duration (str): Specifies the ISO 8601 duration.
+    RETURNS (int): The duration in ticks.
+    """
+    ticks = 0
+    number_start = 1
+    time_part = False
+    units = 0
+    try:
+        if not duration.startswith("P"):
+            raise ValueError()
+        for index in range(1, len(duration)):
+            character = duration[index]
+            if character.isdigit() or character == ".":
+                continue
+            elif character == "T" and not time_part and index == number_start:
+                time_part = True
+                number_start = index + 1
+                continue
+            unit_ticks = (
+                DURATION_UNIT_TICKS.get(character)
+                if time_part or character == "D"
+                else None
+            )
+            if unit_ticks is None or index == number_start:
+                raise ValueError()
+            ticks += round(float(duration[number_start:index]) * unit_ticks)
+            number_start = index + 1
+            units += 1
+        if number_start != len(duration) or units == 0:
+            raise ValueError()
+    except (AttributeError, ValueError):
+        message = f"Unable to parse duration '{duration}'."
+        logging.error(message)
+        raise ValueError(message)
+    return ticks
+
+
+def format_duration(ticks: int) -> str:
+    """Formats ticks of 100 nanoseconds as ISO 8601 duration in the notation of Azure AI Speech.
+
+    ticks (int): Specifies the duration in ticks.
+    RETURNS (str): The ISO 8601 duration (e.g. 'PT1M38.32S').
+    """
+    microseconds = round(ticks / 10)
+    hours, microseconds = divmod(microseconds, 3600 * 10**6)
+    minutes, microseconds = divmod(microseconds, 60 * 10**6)
+    seconds, microseconds = divmod(microseconds, 10**6)
+    seconds_str = (
+        f"{seconds}.{microseconds:06d}".rstrip("0") if microseconds else f"{seconds}"
+    )
+    if hours:
+        return f"PT{hours}H{minutes}M{seconds_str}S"
+    elif minutes:
+        return f"PT{minutes}M{seconds_str}S"
+    return f"PT{seconds_str}S"
+
+
+def get_ticks(item: Dict[str, Any], key: str) -> int:
+    """Returns the offset or duration of a recognized phrase or word in ticks.
+
+    item (Dict[str, Any]): Specifies the recognized phrase or word.
+    key (str): Specifies the property ('offset' or 'duration').
+    RETURNS (int): The offset or duration in ticks.
+    """
+    if item.get(f"{key}InTicks") is not None:
+        return round(item[f"{key}InTicks"])
+    elif item.get(f"{key}Milliseconds") is not None:
+        return round(item[f"{key}Milliseconds"] * 10_000)
+    return parse_duration(duration=item.get(key))
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Tuple
+
+from shared.models import MediaExecutionPoolMetrics
+
+
+def initialize_worker() -> None:
+    """Initializes a worker process of the media execution pool.
+
+    Terminating a worker raises `SystemExit` in the running job, so that child processes like ffmpeg
+    are killed by `subprocess.run` instead of being orphaned.
+
+    RETURNS (None): No return values.
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+
+
+def run_job(
+    function: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Tuple[float, float, Any]:
+    """Runs a job in a worker process of the media execution pool.
+
+    function (Callable[..., Any]): Specifies the function that is executed.
+    args (Tuple[Any, ...]): Specifies the positional arguments of the function.
+    kwargs (Dict[str, Any]): Specifies the keyword arguments of the function.
+    RETURNS (Tuple[float, float, Any]): The start time, the duration in seconds and the result of the job.
+    """
+    start_time = time.time()
+    start_perf_counter = time.perf_counter()
+    result = function(*args, **kwargs)
+    return start_time, time.perf_counter() - start_perf_counter, result
+
+
+class MediaExecutionPool:
+    TERMINATION_GRACE_PERIOD_IN_SECONDS = 5.0
+
+    def __init__(self, max_workers: int = None) -> None:
+        """Initializes the process-wide pool of worker processes for CPU-bound media work.
+
+        Jobs are awaited without blocking the event loop. Worker processes are created lazily on the
+        first job. A worker cannot be interrupted, so jobs that time out or are cancelled while running
+        recycle the pool. Other jobs that were running in the recycled pool are resubmitted once.
+
+        max_workers (int): Specifies the number of worker processes. Defaults to the number of CPUs.
+        RETURNS (None): No return values.
+        """
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__executor: ProcessPoolExecutor = None
+        self.__generation = 0
+        self.__lock = threading.Lock()
+        self.__created_time = time.time()
+        self.__in_flight = 0
+        self.__submitted = 0
+        self.__completed = 0
+        self.__failed = 0
+        self.__timed_out = 0
+        self.__cancelled = 0
+        self.__recycled = 0
+        self.__busy_time_in_seconds = 0.0
+        self.__queue_time_in_seconds = 0.0
+
+    def configure(self, max_workers: int = None) -> None:
+        """Configures the number of worker processes of the pool.
+
+        max_workers (int): Specifies the number of worker processes. Defaults to the number of CPUs.
+        RETURNS (None): No return values.
+        """
+        if max_workers is not None and max_workers <= 0:
+            message = f"Max workers '{max_workers}' must be positive."
+            logging.error(message)
+            raise ValueError(message)
+        if self.__executor is not None:
+            logging.warning("Reconfiguring media execution pool with running workers.")
+            self.shutdown()
+        self.__max_workers = max_workers or os.cpu_count() or 1
+
+    def __get_executor(self) -> Tuple[ProcessPoolExecutor, int]:
+        with self.__lock:
+            if self.__executor is None:
+                logging.debug(
+                    f"Creating media execution pool with {self.__max_workers} worker(s)."
+                )
+                self.__executor = ProcessPoolExecutor(
+                    max_workers=self.__max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=initialize_worker,
+                )
+            return self.__executor, self.__generation
+
+    def __recycle(self, generation: int) -> None:
+        with self.__lock:
+            if generation != self.__generation or self.__executor is None:
+                return
+            executor = self.__executor
+            self.__executor = None
+            self.__generation += 1
+            self.__recycled += 1
+
+        # ProcessPoolExecutor does not expose its processes before Python 3.14
+        processes = list((executor._processes or {}).values())
+        logging.warning(
+            f"Recycling media execution pool and terminating {len(processes)} worker(s)."
+        )
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        def kill_processes() -> None:
+            for process in processes:
+                process.join(timeout=self.TERMINATION_GRACE_PERIOD_IN_SECONDS)
+                if process.is_alive():
+                    process.kill()
+
+        threading.Thread(target=kill_processes, daemon=True).start()
+
+    def __cancel(self, future: Future, generation: int) -> None:
+        # Jobs that were already picked up by a worker cannot be cancelled
+        if not future.cancel():
+            self.__recycle(generation=generation)
+
+    async def run(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        timeout: float = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Runs a picklable function in a worker process and awaits the result.
+
+        function (Callable[..., Any]): Specifies the module level function that is executed.
+        args (Any): Specifies the positional arguments of the function.
+        timeout (float): Specifies the maximum time in seconds the job may take including the time in the queue.
+        kwargs (Any): Specifies the keyword arguments of the function.
+        RETURNS (Any): The result of the function.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        resubmitted = False
+        while True:
+            executor, generation = self.__get_executor()
+            submit_time = time.time()
+            future = executor.submit(run_job, function, args, kwargs)
+            self.__submitted += 1
+            self.__in_flight += 1
+            try:
+                start_time, duration_in_seconds, result = await asyncio.wait_for(
+                    asyncio.wrap_future(future),
+                    timeout=(
+                        None
+                        if deadline is None
+                        else max(deadline - time.perf_counter(), 0)
+                    ),
+                )
+            except asyncio.TimeoutError:
+                self.__timed_out += 1
+                self.__cancel(future=future, generation=generation)
+                message = f"Job '{function.__name__}' did not finish within {timeout}s."
+                logging.error(message)
+                raise TimeoutError(message)
+            except (asyncio.CancelledError, BrokenProcessPool, SystemExit) as e:
+                if (
+                    generation != self.__generation
+                    and not resubmitted
+                    and not asyncio.current_task().cancelling()
+                ):
+                    # The job was interrupted because the pool was recycled for another job
+                    logging.info(
+                        f"Resubmitting job '{function.__name__}' to recycled media execution pool."
+                    )
+                    resubmitted = True
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    self.__cancelled += 1
+                    self.__cancel(future=future, generation=generation)
+                    raise
+                self.__failed += 1
+                self.__recycle(generation=generation)
+                message = f"Worker process terminated while running job '{function.__name__}'."
+                logging.error(message)
+                raise BrokenProcessPool(message) from e
+            except Exception:
+                self.__failed += 1
+                raise
+            finally:
+                self.__in_flight -= 1
+
+            self.__completed += 1
+            self.__busy_time_in_seconds += duration_in_seconds
+            self.__queue_time_in_seconds += max(start_time - submit_time, 0)
+            logging.debug(
+                f"Job '{function.__name__}' finished in {duration_in_seconds:.2f}s after waiting {max(start_time - submit_time, 0):.2f}s in the queue."
+            )
+            return result
+
+    def get_metrics(self) -> MediaExecutionPoolMetrics:
+        """Returns the usage metrics of the media execution pool.
+
+        RETURNS (MediaExecutionPoolMetrics): Returns the queue depth, job counts and busy time of the pool.
+        """
+        uptime_in_seconds = max(time.time() - self.__created_time, 1e-6)
+        return MediaExecutionPoolMetrics(
+            max_workers=self.__max_workers,
+            queue_depth=max(self.__in_flight - self.__max_workers, 0),
+            running=min(self.__in_flight, self.__max_workers),
+            submitted=self.__submitted,
+            completed=self.__completed,
+            failed=self.__failed,
+            timed_out=self.__timed_out,
+            cancelled=self.__cancelled,
+            recycled=self.__recycled,
+            busy_time_in_seconds=self.__busy_time_in_seconds,
+            queue_time_in_seconds=self.__queue_time_in_seconds,
+            utilization=self.__busy_time_in_seconds
+            / (uptime_in_seconds * self.__max_workers),
+        )
+
+    def shutdown(self) -> None:
+        """Shuts down the worker processes of the pool after the running jobs finished.
+
+        RETURNS (None): No return values.
+        """
+        logging.info(f"Shutting down media execution pool: {self.get_metrics()}")
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+            self.__generation += 1
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+media_execution_pool = MediaExecutionPool()
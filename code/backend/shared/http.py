@@ -0,0 +1,169 @@
+import bisect
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, List
+
+import httpx
+from shared.models import HttpClientMetrics
+from shared.ratelimit import RateGovernedAsyncTransport, RateGovernor
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+LATENCY_BUCKETS_IN_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class HttpRequestTrace:
+    def __init__(self) -> None:
+        """Initializes the trace of a single request, which is passed to httpcore as `trace` extension.
+
+        RETURNS (None): No return values.
+        """
+        self.start_time = time.perf_counter()
+        self.connection_opened = False
+        self.http2 = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name in [
+            "connection.connect_tcp.complete",
+            "connection.connect_unix_socket.complete",
+        ]:
+            self.connection_opened = True
+        elif event_name.startswith("http2."):
+            self.http2 = True
+
+
+class HttpClientRegistry:
+    def __init__(self) -> None:
+        """Initializes the process-wide registry of pooled http clients.
+
+        Clients are keyed by the base url of the service and keep their connections alive across
+        function invocations. HTTP/2 is used if the optional `h2` package is installed. Every request
+        is traced to collect latency histograms and the number of new and reused connections.
+
+        RETURNS (None): No return values.
+        """
+        self.__http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.__metrics: Dict[str, Dict[str, Any]] = {}
+
+    def get_http_client(
+        self,
+        base_url: str,
+        timeout: float = 60.0,
+        transport: httpx.AsyncBaseTransport = None,
+        rate_governor: RateGovernor = None,
+    ) -> httpx.AsyncClient:
+        """Returns the pooled http client for a service.
+
+        base_url (str): Specifies the base url of the service.
+        timeout (float): Specifies the timeout of requests in seconds.
+        transport (httpx.AsyncBaseTransport): Specifies the transport of a newly created client.
+        rate_governor (RateGovernor): Specifies the rate governor that limits the requests of a newly created client.
+        RETURNS (httpx.AsyncClient): Returns the pooled http client.
+        """
+        http_client = self.__http_clients.get(base_url)
+        if http_client is None or http_client.is_closed:
+            logging.debug(
+                f"Creating pooled http client for '{base_url}' (http2: {HTTP2_AVAILABLE})."
+            )
+            metrics = self.__metrics.setdefault(
+                base_url,
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "connections_opened": 0,
+                    "http2_requests": 0,
+                    "latency_histogram": [0] * (len(LATENCY_BUCKETS_IN_MS) + 1),
+                },
+            )
+
+            async def trace_request(request: httpx.Request) -> None:
+                request.extensions["trace"] = HttpRequestTrace()
+
+            async def record_response(response: httpx.Response) -> None:
+                trace = response.request.extensions.get("trace")
+                if not isinstance(trace, HttpRequestTrace):
+                    return
+                latency_in_ms = (time.perf_counter() - trace.start_time) * 1000
+                metrics["requests"] += 1
+                metrics["errors"] += int(response.status_code >= 400)
+                metrics["connections_opened"] += int(trace.connection_opened)
+                metrics["http2_requests"] += int(trace.http2)
+                metrics["latency_histogram"][
+                    bisect.bisect_left(LATENCY_BUCKETS_IN_MS, latency_in_ms)
+                ] += 1
+
+            limits = httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            )
+            if rate_governor is not None:
+                transport = RateGovernedAsyncTransport(
+                    rate_governor=rate_governor,
+                    transport=transport
+                    or httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits),
+                )
+            http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and transport is None,
+                timeout=timeout,
+                limits=limits,
+                transport=transport,
+                event_hooks={
+                    "request": [trace_request],
+                    "response": [record_response],
+                },
+            )
+            self.__http_clients[base_url] = http_client
+        return http_client
+
+    def get_metrics(self, base_url: str = None) -> HttpClientMetrics:
+        """Returns the request metrics of a pooled http client or of all pooled http clients.
+
+        base_url (str): Specifies the base url of the service. Defaults to all services.
+        RETURNS (HttpClientMetrics): Returns the request counts, connection reuse and latency histogram.
+        """
+        metrics_list: List[Dict[str, Any]] = (
+            list(self.__metrics.values())
+            if base_url is None
+            else [self.__metrics[base_url]] if base_url in self.__metrics else []
+        )
+        requests = sum(metrics["requests"] for metrics in metrics_list)
+        connections_opened = sum(
+            metrics["connections_opened"] for metrics in metrics_list
+        )
+        latency_histogram = [
+            sum(counts)
+            for counts in zip(
+                [0] * (len(LATENCY_BUCKETS_IN_MS) + 1),
+                *[metrics["latency_histogram"] for metrics in metrics_list],
+            )
+        ]
+        return HttpClientMetrics(
+            requests=requests,
+            errors=sum(metrics["errors"] for metrics in metrics_list),
+            connections_opened=connections_opened,
+            connections_reused=requests - connections_opened,
+            http2_requests=sum(metrics["http2_requests"] for metrics in metrics_list),
+            latency_histogram={
+                f"<={bucket}ms": count
+                for bucket, count in zip(LATENCY_BUCKETS_IN_MS, latency_histogram)
+            }
+            | {f">{LATENCY_BUCKETS_IN_MS[-1]}ms": latency_histogram[-1]},
+        )
+
+    async def close(self) -> None:
+        """Closes all pooled http clients.
+
+        RETURNS (None): No return values.
+        """
+        logging.info(f"Closing pooled http clients: {self.get_metrics()}")
+        http_clients = list(self.__http_clients.values())
+        self.__http_clients.clear()
+        for http_client in http_clients:
+            try:
+                await http_client.aclose()
+            except Exception as e:
+                logging.warning(f"Closing pooled http client failed: {e}")
+
+
+http_client_registry = HttpClientRegistry()
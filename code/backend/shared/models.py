@@ -0,0 +1,69 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ClientPoolMetrics(BaseModel):
+    hits: int
+    misses: int
+    clients: int
+    credentials: int
+
+
+class CopyBlobResult(BaseModel):
+    url: str
+    status: str
+    synchronous: bool
+    duration_in_seconds: float
+    request_count: int
+
+
+class CopyBlobFromUrlResult(BaseModel):
+    source_url: str
+    sink_storage_blob_name: str
+    url: Optional[str]
+    succeeded: bool
+    attempts: int
+    duration_in_seconds: float
+    error: Optional[str] = None
+
+
+class MediaExecutionPoolMetrics(BaseModel):
+    max_workers: int
+    queue_depth: int
+    running: int
+    submitted: int
+    completed: int
+    failed: int
+    timed_out: int
+    cancelled: int
+    recycled: int
+    busy_time_in_seconds: float
+    queue_time_in_seconds: float
+    utilization: float
+
+
+class TokenCacheMetrics(BaseModel):
+    hits: int
+    refreshes: int
+    tokens: int
+    refresh_duration_in_seconds: float = 0.0
+
+
+class HttpClientMetrics(BaseModel):
+    requests: int
+    errors: int
+    connections_opened: int
+    connections_reused: int
+    http2_requests: int
+    latency_histogram: Dict[str, int]
+
+
+class RateGovernorMetrics(BaseModel):
+    name: str
+    requests_per_second: float
+    concurrency_limit: int
+    in_flight: int
+    requests: int
+    throttled: int
+    wait_time_in_seconds: float
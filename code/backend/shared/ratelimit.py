@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+import httpx
+from shared.models import RateGovernorMetrics
+
+THROTTLING_STATUS_CODES = [429, 503]
+
+
+def get_retry_after(response: httpx.Response) -> float:
+    """Returns the seconds a throttled client should wait before the next request.
+
+    response (httpx.Response): Specifies the response of the throttled request.
+    RETURNS (float): Returns the seconds from the `retry-after-ms` or `Retry-After` header or `None` if no header is set.
+    """
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(
+                parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0
+            )
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+class RateGovernor:
+    INCREASE_STEP = 1.0
+    DECREASE_FACTOR = 0.5
+    DEFAULT_RETRY_AFTER_IN_SECONDS = 1.0
+    POLL_INTERVAL_IN_SECONDS = 0.05
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: float,
+        burst: int = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        max_retry_after: float = 60.0,
+    ) -> None:
+        """Initializes the client-side rate governor of a service endpoint.
+
+        Requests are admitted by a token bucket with `requests_per_second` and `burst` and by a
+        concurrency limit that follows additive-increase/multiplicative-decrease: every successful
+        response raises the limit by roughly one per round trip, while a 429 or 503 response halves it
+        and pauses all requests for the duration of the `Retry-After` header. The governor is thread
+        safe and can be used from async and sync clients.
+
+        name (str): Specifies the name of the governed endpoint.
+        requests_per_second (float): Specifies the sustained request rate.
+        burst (int): Specifies the number of requests that may be sent at once. Defaults to one second of requests.
+        max_concurrency (int): Specifies the maximum number of concurrent requests.
+        min_concurrency (int): Specifies the minimum number of concurrent requests.
+        max_retry_after (float): Specifies the maximum seconds requests are paused after throttling.
+        RETURNS (None): No return values.
+        """
+        if requests_per_second <= 0 or max_concurrency < min_concurrency:
+            message = f"Invalid rate limits for '{name}': {requests_per_second} requests per second, concurrency between {min_concurrency} and {max_concurrency}."
+            logging.error(message)
+            raise ValueError(message)
+        self.name = name
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max(round(requests_per_second), 1)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retry_after = max_retry_after
+        self.__lock = threading.Lock()
+        self.__tokens = float(self.burst)
+        self.__refill_time = time.monotonic()
+        self.__concurrency_limit = float(max_concurrency)
+        self.__in_flight = 0
+        self.__paused_until = 0.0
+        self.__decreased_time = 0.0
+        self.__requests = 0
+        self.__throttled = 0
+        self.__wait_time_in_seconds = 0.0
+
+    def __try_acquire(self) -> float:
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(
+                self.__tokens + (now - self.__refill_time) * self.requests_per_second,
+                float(self.burst),
+            )
+            self.__refill_time = now
+            if now < self.__paused_until:
+                return self.__paused_until - now
+            elif self.__in_flight >= int(self.__concurrency_limit):
+                return self.POLL_INTERVAL_IN_SECONDS
+            elif self.__tokens < 1:
+                return (1 - self.__tokens) / self.requests_per_second
+            self.__tokens -= 1
+            self.__in_flight += 1
+            self.__requests += 1
+            return 0.0
+
+    async def acquire_async(self) -> None:
+        """Waits until a request may be sent without blocking the event loop.
+
+        RETURNS (None): No return values.
+        """
+        start_time = time.monotonic()
+        while (wait_time := self.__try_acquire()) > 0:
+            await asyncio.sleep(wait_time)
+        self.__wait_time_in_seconds += time.monotonic() - start_time
+
+    def acquire(self) -> None:
+        """Waits until a request may be sent.
+
+        RETURNS (None): No return values.
+        """
+        start_time = time.monotonic()
+        while (wait_time := self.__try_acquire()) > 0:
+            time.sleep(wait_time)
+        self.__wait_time_in_seconds += time.monotonic() - start_time
+
+    def release(self, status_code: int = None, retry_after: float = None) -> None:
+        """Releases a request slot and adapts the limits to the response of the service.
+
+        status_code (int): Specifies the status code of the response or `None` if the request failed without response.
+        retry_after (float): Specifies the seconds requested by the service before the next request.
+        RETURNS (None): No return values.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__in_flight -= 1
+            if status_code in THROTTLING_STATUS_CODES:
+                self.__throttled += 1
+                pause = min(
+                    (
+                        self.DEFAULT_RETRY_AFTER_IN_SECONDS
+                        if retry_after is None
+                        else retry_after
+                    ),
+                    self.max_retry_after,
+                )
+                self.__paused_until = max(self.__paused_until, now + pause)
+
+                # Decrease once per throttling episode instead of once per concurrent response
+                if now - self.__decreased_time > max(pause, 1.0):
+                    self.__decreased_time = now
+                    self.__concurrency_limit = max(
+                        self.__concurrency_limit * self.DECREASE_FACTOR,
+                        float(self.min_concurrency),
+                    )
+                    logging.warning(
+                        f"Throttled by '{self.name}', reduced concurrency limit to {int(self.__concurrency_limit)} and paused requests for {pause:.2f}s."
+                    )
+            elif status_code is not None and status_code < 400:
+                self.__concurrency_limit = min(
+                    self.__concurrency_limit
+                    + self.INCREASE_STEP / self.__concurrency_limit,
+                    float(self.max_concurrency),
+                )
+
+    def get_metrics(self) -> RateGovernorMetrics:
+        """Returns the current limits and throttling counts of the governor.
+
+        RETURNS (RateGovernorMetrics): Returns the request rate, concurrency limit and throttle counts.
+        """
+        with self.__lock:
+            return RateGovernorMetrics(
+                name=self.name,
+                requests_per_second=self.requests_per_second,
+                concurrency_limit=int(self.__concurrency_limit),
+                in_flight=self.__in_flight,
+                requests=self.__requests,
+                throttled=self.__throttled,
+                wait_time_in_seconds=self.__wait_time_in_seconds,
+            )
+
+
+class RateGovernorRegistry:
+    def __init__(self) -> None:
+        """Initializes the process-wide registry of rate governors, so that all clients of an endpoint share its limits.
+
+        RETURNS (None): No return values.
+        """
+        self.__rate_governors: Dict[str, RateGovernor] = {}
+        self.__lock = threading.Lock()
+
+    def get_rate_governor(
+        self,
+        name: str,
+        requests_per_second: float,
+        burst: int = None,
+        max_concurrency: int = 16,
+    ) -> RateGovernor:
+        """Returns the rate governor of an endpoint and creates it on first use.
+
+        name (str): Specifies the name of the governed endpoint.
+        requests_per_second (float): Specifies the sustained request rate of a newly created governor.
+        burst (int): Specifies the number of requests of a newly created governor that may be sent at once.
+        max_concurrency (int): Specifies the maximum number of concurrent requests of a newly created governor.
+        RETURNS (RateGovernor): Returns the rate governor.
+        """
+        with self.__lock:
+            rate_governor = self.__rate_governors.get(name)
+            if rate_governor is None:
+                rate_governor = RateGovernor(
+                    name=name,
+                    requests_per_second=requests_per_second,
+                    burst=burst,
+                    max_concurrency=max_concurrency,
+                )
+                self.__rate_governors[name] = rate_governor
+            return rate_governor
+
+    def get_metrics(self) -> Dict[str, RateGovernorMetrics]:
+        """Returns the metrics of all rate governors.
+
+        RETURNS (Dict[str, RateGovernorMetrics]): Returns the metrics by name of the governed endpoint.
+        """
+        with self.__lock:
+            rate_governors = list(self.__rate_governors.values())
+        return {
+            rate_governor.name: rate_governor.get_metrics()
+            for rate_governor in rate_governors
+        }
+
+
+class RateGovernedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        rate_governor: RateGovernor,
+        transport: httpx.AsyncBaseTransport = None,
+        max_retries: int = 5,
+    ) -> None:
+        """Initializes an async transport that sends requests within the limits of a rate governor.
+
+        Throttled requests are retried after the pause requested by the service, so that bursts are
+        queued instead of failing. The throttled response is returned once `max_retries` is exhausted.
+
+        rate_governor (RateGovernor): Specifies the rate governor of the endpoint.
+        transport (httpx.AsyncBaseTransport): Specifies the transport that sends the requests.
+        max_retries (int): Specifies the maximum number of retries of a throttled request.
+        RETURNS (None): No return values.
+        """
+        self.rate_governor = rate_governor
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self.rate_governor.acquire_async()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except BaseException:
+                self.rate_governor.release()
+                raise
+            retry_after = get_retry_after(response=response)
+            self.rate_governor.release(
+                status_code=response.status_code, retry_after=retry_after
+            )
+            if (
+                response.status_code not in THROTTLING_STATUS_CODES
+                or attempt >= self.max_retries
+            ):
+                return response
+            attempt += 1
+            logging.info(
+                f"Retrying throttled request to '{request.url.host}' (attempt: {attempt}, status code: '{response.status_code}', retry after: {retry_after})."
+            )
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class RateGovernedTransport(httpx.BaseTransport):
+    def __init__(
+        self,
+        rate_governor: RateGovernor,
+        transport: httpx.BaseTransport = None,
+        max_retries: int = 5,
+    ) -> None:
+        """Initializes a sync transport that sends requests within the limits of a rate governor.
+
+        Throttled requests are retried after the pause requested by the service, so that bursts are
+        queued instead of failing. The throttled response is returned once `max_retries` is exhausted.
+
+        rate_governor (RateGovernor): Specifies the rate governor of the endpoint.
+        transport (httpx.BaseTransport): Specifies the transport that sends the requests.
+        max_retries (int): Specifies the maximum number of retries of a throttled request.
+        RETURNS (None): No return values.
+        """
+        self.rate_governor = rate_governor
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            self.rate_governor.acquire()
+            try:
+                response = self.transport.handle_request(request)
+            except BaseException:
+                self.rate_governor.release()
+                raise
+            retry_after = get_retry_after(response=response)
+            self.rate_governor.release(
+                status_code=response.status_code, retry_after=retry_after
+            )
+            if (
+                response.status_code not in THROTTLING_STATUS_CODES
+                or attempt >= self.max_retries
+            ):
+                return response
+            attempt += 1
+            logging.info(
+                f"Retrying throttled request to '{request.url.host}' (attempt: {attempt}, status code: '{response.status_code}', retry after: {retry_after})."
+            )
+            response.close()
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+rate_governor_registry = RateGovernorRegistry()
@@ -0,0 +1,1042 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import httpx
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+)
+from azure.core.pipeline import PipelineResponse
+from azure.identity.aio import DefaultAzureCredential
+from azure.storage.blob import BlobProperties, ContentSettings
+from azure.storage.blob.aio import BlobLeaseClient, BlobServiceClient
+from shared.models import ClientPoolMetrics
+
+
+class StorageBackend(ABC):
+    """Interface of the blob storage operations used by the storage helpers in `shared.utils`."""
+
+    @abstractmethod
+    def get_blob_url(self, storage_container_name: str, storage_blob_name: str) -> str:
+        """Returns the url of a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        RETURNS (str): Returns the url of the blob.
+        """
+
+    @abstractmethod
+    async def get_blob_properties(
+        self, storage_container_name: str, storage_blob_name: str
+    ) -> BlobProperties:
+        """Returns the properties of a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        RETURNS (BlobProperties): Returns the properties of the blob.
+        """
+
+    @abstractmethod
+    async def download_blob_range(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        offset: int = 0,
+        length: int = None,
+        etag: str = None,
+    ) -> bytes:
+        """Downloads a byte range of a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        offset (int): Specifies the start of the byte range.
+        length (int): Specifies the length of the byte range. Downloads until the end of the blob if not provided.
+        etag (str): Specifies the etag the blob must match.
+        RETURNS (bytes): Returns the bytes of the range.
+        """
+
+    @abstractmethod
+    async def upload_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        data: bytes,
+        content_settings: ContentSettings = None,
+    ) -> None:
+        """Uploads data to a blob with a single request and overwrites existing data.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        data (bytes): The data that will be uploaded.
+        content_settings (ContentSettings): Specifies the content settings of the blob.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def stage_block(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_id: str,
+        data: bytes,
+    ) -> None:
+        """Stages a block of a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        block_id (str): Specifies the id of the block.
+        data (bytes): The data of the block.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def commit_block_list(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_ids: List[str],
+        content_settings: ContentSettings = None,
+    ) -> None:
+        """Commits staged blocks of a blob in the provided order.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        block_ids (List[str]): Specifies the ordered ids of the staged blocks.
+        content_settings (ContentSettings): Specifies the content settings of the blob.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def start_copy_from_url(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        source_url: str,
+        requires_sync: bool = False,
+    ) -> Dict[str, str]:
+        """Starts copying a source url to a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        source_url (str): The url of the source file.
+        requires_sync (bool): Specifies whether the copy must complete before the request returns.
+        RETURNS (Dict[str, str]): Returns the 'copy_id' and 'copy_status' of the copy activity.
+        """
+
+    @abstractmethod
+    async def abort_copy(
+        self, storage_container_name: str, storage_blob_name: str, copy_id: str
+    ) -> None:
+        """Aborts a pending copy activity.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        copy_id (str): Specifies the id of the copy activity.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def copy_from_url(
+        self, storage_container_name: str, storage_blob_name: str, source_url: str
+    ) -> None:
+        """Copies a source url to a blob with a single request and overwrites existing data.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        source_url (str): The url of the source file.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def acquire_lease(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_duration: int = -1,
+    ) -> str:
+        """Acquires a lease on a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        lease_duration (int): Specifies the duration of the lease in seconds or -1 for an infinite lease.
+        RETURNS (str): Returns the id of the lease.
+        """
+
+    @abstractmethod
+    async def release_lease(
+        self, storage_container_name: str, storage_blob_name: str, lease_id: str
+    ) -> None:
+        """Releases a lease on a blob.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        lease_id (str): Specifies the id of the lease.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def delete_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_id: str = None,
+    ) -> None:
+        """Deletes a blob including its snapshots.
+
+        storage_container_name (str): The container name of the storage account.
+        storage_blob_name (str): The blob name of the storage account.
+        lease_id (str): Specifies the id of the lease if the blob is leased.
+        RETURNS (None): No return values.
+        """
+
+    @abstractmethod
+    async def list_blobs(
+        self, storage_container_name: str, name_starts_with: str = None
+    ) -> List[str]:
+        """Lists the names of the blobs in a container.
+
+        storage_container_name (str): The container name of the storage account.
+        name_starts_with (str): Specifies the prefix of the blob names.
+        RETURNS (List[str]): Returns the names of the blobs.
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Closes the backend and releases its connections.
+
+        RETURNS (None): No return values.
+        """
+
+
+def remove_content_encoding(response: PipelineResponse) -> None:
+    """Removes the content encoding from a download response, so that the transport returns the raw bytes.
+
+    response (PipelineResponse): Specifies the response of the download request.
+    RETURNS (None): No return values.
+    """
+    response.http_response.headers.pop("Content-Encoding", None)
+
+
+class AzureStorageBackend(StorageBackend):
+    def __init__(
+        self, storage_domain_name: str, credential: DefaultAzureCredential
+    ) -> None:
+        """Initializes the azure blob storage backend.
+
+        storage_domain_name (str): The domain name of the storage account.
+        credential (DefaultAzureCredential): Specifies the credential used for auth.
+        RETURNS (None): No return values.
+        """
+        self.__credential = credential
+        self.__blob_service_client = BlobServiceClient(
+            account_url=f"https://{storage_domain_name}",
+            credential=credential,
+        )
+
+    def get_blob_url(self, storage_container_name: str, storage_blob_name: str) -> str:
+        return self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        ).url
+
+    async def get_blob_properties(
+        self, storage_container_name: str, storage_blob_name: str
+    ) -> BlobProperties:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        return await blob_client.get_blob_properties()
+
+    async def download_blob_range(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        offset: int = 0,
+        length: int = None,
+        etag: str = None,
+    ) -> bytes:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        kwargs = {}
+        if etag:
+            kwargs = {"etag": etag, "match_condition": MatchConditions.IfNotModified}
+        # Return raw bytes of compressed blobs, as ranges cannot be decompressed independently.
+        # Older clients ignore `decompress`, so the content encoding is removed from the response as well.
+        download_stream = await blob_client.download_blob(
+            offset=offset,
+            length=length,
+            decompress=False,
+            raw_response_hook=remove_content_encoding,
+            **kwargs,
+        )
+        return await download_stream.readall()
+
+    async def upload_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        data: bytes,
+        content_settings: ContentSettings = None,
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.upload_blob(
+            data=data, overwrite=True, content_settings=content_settings
+        )
+
+    async def stage_block(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_id: str,
+        data: bytes,
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.stage_block(block_id=block_id, data=data)
+
+    async def commit_block_list(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_ids: List[str],
+        content_settings: ContentSettings = None,
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.commit_block_list(
+            block_list=block_ids, content_settings=content_settings
+        )
+
+    async def start_copy_from_url(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        source_url: str,
+        requires_sync: bool = False,
+    ) -> Dict[str, str]:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        kwargs = {}
+        if requires_sync:
+            # Synchronous copies require explicit authorization for the source
+            token = await self.__credential.get_token(
+                "https://storage.azure.com/.default"
+            )
+            kwargs = {"source_authorization": f"Bearer {token.token}"}
+        copy_properties = await blob_client.start_copy_from_url(
+            source_url=source_url, requires_sync=requires_sync, **kwargs
+        )
+        return {
+            "copy_id": copy_properties.get("copy_id"),
+            "copy_status": copy_properties.get("copy_status"),
+        }
+
+    async def abort_copy(
+        self, storage_container_name: str, storage_blob_name: str, copy_id: str
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.abort_copy(copy_id)
+
+    async def copy_from_url(
+        self, storage_container_name: str, storage_blob_name: str, source_url: str
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.upload_blob_from_url(source_url=source_url, overwrite=True)
+
+    async def acquire_lease(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_duration: int = -1,
+    ) -> str:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        lease = BlobLeaseClient(client=blob_client)
+        await lease.acquire(lease_duration=lease_duration)
+        return lease.id
+
+    async def release_lease(
+        self, storage_container_name: str, storage_blob_name: str, lease_id: str
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        lease = BlobLeaseClient(client=blob_client, lease_id=lease_id)
+        await lease.release()
+
+    async def delete_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_id: str = None,
+    ) -> None:
+        blob_client = self.__blob_service_client.get_blob_client(
+            container=storage_container_name, blob=storage_blob_name
+        )
+        await blob_client.delete_blob(delete_snapshots="include", lease=lease_id)
+
+    async def list_blobs(
+        self, storage_container_name: str, name_starts_with: str = None
+    ) -> List[str]:
+        container_client = self.__blob_service_client.get_container_client(
+            container=storage_container_name
+        )
+        return [
+            blob_name
+            async for blob_name in container_client.list_blob_names(
+                name_starts_with=name_starts_with
+            )
+        ]
+
+    async def close(self) -> None:
+        await self.__blob_service_client.close()
+
+
+class LocalStorageBackend(StorageBackend):
+    PROPERTIES_FILE_SUFFIX: str = ".__properties__.json"
+
+    def __init__(self, root_directory: str, storage_domain_name: str) -> None:
+        """Initializes the local file system storage backend.
+
+        Blobs are stored as files below `<root_directory>/<storage_domain_name>/<container>/`. The
+        properties of every blob (etag, content settings, copy status and lease) are stored in a
+        sidecar json file next to it, so that the semantics of azure blob storage are preserved
+        for local runs and benchmarks.
+
+        root_directory (str): Specifies the root directory of the local storage.
+        storage_domain_name (str): The domain name of the storage account.
+        RETURNS (None): No return values.
+        """
+        self.__root_directory = os.path.abspath(
+            os.path.join(root_directory, storage_domain_name)
+        )
+        self.__blocks: Dict[Tuple[str, str], Dict[str, bytes]] = {}
+        self.__copy_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def __get_file_path(
+        self, storage_container_name: str, storage_blob_name: str
+    ) -> str:
+        container_path = os.path.join(self.__root_directory, storage_container_name)
+        file_path = os.path.abspath(os.path.join(container_path, storage_blob_name))
+        if not file_path.startswith(container_path + os.sep):
+            message = f"Blob name '{storage_blob_name}' is not valid."
+            logging.error(message)
+            raise ValueError(message)
+        return file_path
+
+    @staticmethod
+    def __create_etag() -> str:
+        return f'"0x{uuid.uuid4().hex[:15].upper()}"'
+
+    @staticmethod
+    def __read_properties(file_path: str) -> Dict[str, Any]:
+        if not os.path.exists(file_path):
+            message = f"The specified blob '{file_path}' does not exist."
+            logging.error(message)
+            raise ResourceNotFoundError(message)
+        properties_file_path = (
+            f"{file_path}{LocalStorageBackend.PROPERTIES_FILE_SUFFIX}"
+        )
+        if os.path.exists(properties_file_path):
+            with open(file=properties_file_path, mode="r", encoding="utf-8") as file:
+                return json.load(file)
+
+        # Create properties for files that were added without the backend
+        modified_time = datetime.fromtimestamp(
+            os.path.getmtime(file_path), tz=timezone.utc
+        ).isoformat()
+        return {
+            "etag": LocalStorageBackend.__create_etag(),
+            "creation_time": modified_time,
+            "last_modified": modified_time,
+            "content_settings": {},
+            "copy": {},
+            "lease": {},
+        }
+
+    @staticmethod
+    def __write_properties(file_path: str, properties: Dict[str, Any]) -> None:
+        properties_file_path = (
+            f"{file_path}{LocalStorageBackend.PROPERTIES_FILE_SUFFIX}"
+        )
+        with open(file=properties_file_path, mode="w", encoding="utf-8") as file:
+            json.dump(properties, file)
+
+    @staticmethod
+    def __get_lease_id(properties: Dict[str, Any]) -> str:
+        lease = properties.get("lease", {})
+        expiry_time = lease.get("expiry_time")
+        if expiry_time and datetime.fromisoformat(expiry_time) < datetime.now(
+            tz=timezone.utc
+        ):
+            return None
+        return lease.get("id")
+
+    def __check_lease(self, file_path: str, lease_id: str = None) -> None:
+        if not os.path.exists(file_path):
+            return
+        current_lease_id = self.__get_lease_id(
+            properties=self.__read_properties(file_path=file_path)
+        )
+        if current_lease_id and current_lease_id != lease_id:
+            message = f"There is currently a lease on the blob '{file_path}' and no matching lease id was specified."
+            logging.error(message)
+            raise ResourceModifiedError(message)
+
+    def __write_blob(
+        self,
+        file_path: str,
+        data: bytes,
+        content_settings: ContentSettings = None,
+        copy: Dict[str, Any] = None,
+    ) -> None:
+        self.__check_lease(file_path=file_path)
+        now = datetime.now(tz=timezone.utc).isoformat()
+        creation_time = (
+            self.__read_properties(file_path=file_path).get("creation_time", now)
+            if os.path.exists(file_path)
+            else now
+        )
+
+        # Write data atomically
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temporary_file_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        with open(file=temporary_file_path, mode="wb") as file:
+            file.write(data)
+        os.replace(temporary_file_path, file_path)
+
+        # Write properties
+        content_settings = content_settings or ContentSettings()
+        self.__write_properties(
+            file_path=file_path,
+            properties={
+                "etag": self.__create_etag(),
+                "creation_time": creation_time,
+                "last_modified": now,
+                "content_settings": {
+                    "content_type": content_settings.content_type
+                    or "application/octet-stream",
+                    "content_encoding": content_settings.content_encoding,
+                    "content_md5": (
+                        base64.b64encode(content_settings.content_md5).decode("ascii")
+                        if content_settings.content_md5
+                        else None
+                    ),
+                },
+                "copy": copy or {},
+                "lease": {},
+            },
+        )
+
+    async def __read_source(self, source_url: str) -> Tuple[bytes, ContentSettings]:
+        parsed_source_url = urlparse(source_url)
+        if parsed_source_url.scheme == "file":
+            source_file_path = url2pathname(parsed_source_url.path)
+            properties = self.__read_properties(file_path=source_file_path)
+            data = await asyncio.to_thread(Path(source_file_path).read_bytes)
+            content_settings = properties.get("content_settings", {})
+            return data, ContentSettings(
+                content_type=content_settings.get("content_type"),
+                content_encoding=content_settings.get("content_encoding"),
+                content_md5=(
+                    bytearray(base64.b64decode(content_settings["content_md5"]))
+                    if content_settings.get("content_md5")
+                    else None
+                ),
+            )
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url=source_url, follow_redirects=True)
+        if response.status_code >= 400:
+            message = f"Failed to read copy source '{source_url}' (status code: '{response.status_code}')."
+            logging.error(message)
+            raise HttpResponseError(message)
+        return response.content, ContentSettings(
+            content_type=response.headers.get("Content-Type"),
+            content_encoding=response.headers.get("Content-Encoding"),
+        )
+
+    def get_blob_url(self, storage_container_name: str, storage_blob_name: str) -> str:
+        return Path(
+            self.__get_file_path(
+                storage_container_name=storage_container_name,
+                storage_blob_name=storage_blob_name,
+            )
+        ).as_uri()
+
+    async def get_blob_properties(
+        self, storage_container_name: str, storage_blob_name: str
+    ) -> BlobProperties:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        properties = self.__read_properties(file_path=file_path)
+        content_settings = properties.get("content_settings", {})
+        copy = properties.get("copy", {})
+        lease_id = self.__get_lease_id(properties=properties)
+        blob_properties = BlobProperties(
+            **{
+                "name": storage_blob_name,
+                "x-ms-blob-type": "BlockBlob",
+                "Content-Length": os.path.getsize(file_path),
+                "ETag": properties["etag"],
+                "x-ms-creation-time": datetime.fromisoformat(
+                    properties["creation_time"]
+                ),
+                "Last-Modified": datetime.fromisoformat(properties["last_modified"]),
+                "Content-Type": content_settings.get("content_type"),
+                "Content-Encoding": content_settings.get("content_encoding"),
+                "Content-MD5": (
+                    bytearray(base64.b64decode(content_settings["content_md5"]))
+                    if content_settings.get("content_md5")
+                    else None
+                ),
+                "x-ms-copy-id": copy.get("id"),
+                "x-ms-copy-source": copy.get("source"),
+                "x-ms-copy-status": copy.get("status"),
+                "x-ms-copy-progress": copy.get("progress"),
+                "x-ms-lease-status": "locked" if lease_id else "unlocked",
+                "x-ms-lease-state": "leased" if lease_id else "available",
+                "metadata": {},
+            }
+        )
+        blob_properties.container = storage_container_name
+        return blob_properties
+
+    async def download_blob_range(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        offset: int = 0,
+        length: int = None,
+        etag: str = None,
+    ) -> bytes:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        properties = self.__read_properties(file_path=file_path)
+        if etag and etag != properties["etag"]:
+            message = f"The condition specified using HTTP conditional header(s) is not met for blob '{storage_blob_name}'."
+            logging.error(message)
+            raise ResourceModifiedError(message)
+
+        def read_range() -> bytes:
+            with open(file=file_path, mode="rb") as file:
+                file.seek(offset)
+                return file.read(-1 if length is None else length)
+
+        return await asyncio.to_thread(read_range)
+
+    async def upload_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        data: bytes,
+        content_settings: ContentSettings = None,
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+
+        # The service calculates the md5 hash for blobs uploaded with a single request
+        content_settings = content_settings or ContentSettings()
+        if not content_settings.content_md5:
+            content_settings.content_md5 = bytearray(hashlib.md5(data).digest())
+        await asyncio.to_thread(
+            self.__write_blob,
+            file_path=file_path,
+            data=data,
+            content_settings=content_settings,
+        )
+
+    async def stage_block(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_id: str,
+        data: bytes,
+    ) -> None:
+        self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        self.__blocks.setdefault((storage_container_name, storage_blob_name), {})[
+            block_id
+        ] = bytes(data)
+
+    async def commit_block_list(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        block_ids: List[str],
+        content_settings: ContentSettings = None,
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        blocks = self.__blocks.pop((storage_container_name, storage_blob_name), {})
+        missing_block_ids = [
+            block_id for block_id in block_ids if block_id not in blocks
+        ]
+        if missing_block_ids:
+            message = f"The specified block list is invalid, missing blocks: '{missing_block_ids}'."
+            logging.error(message)
+            raise HttpResponseError(message)
+        await asyncio.to_thread(
+            self.__write_blob,
+            file_path=file_path,
+            data=b"".join(blocks[block_id] for block_id in block_ids),
+            content_settings=content_settings,
+        )
+
+    async def start_copy_from_url(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        source_url: str,
+        requires_sync: bool = False,
+    ) -> Dict[str, str]:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        copy_id = str(uuid.uuid4())
+
+        async def copy() -> None:
+            data, content_settings = await self.__read_source(source_url=source_url)
+            await asyncio.to_thread(
+                self.__write_blob,
+                file_path=file_path,
+                data=data,
+                content_settings=content_settings,
+                copy={
+                    "id": copy_id,
+                    "source": source_url,
+                    "status": "success",
+                    "progress": f"{len(data)}/{len(data)}",
+                },
+            )
+
+        if requires_sync:
+            await copy()
+            return {"copy_id": copy_id, "copy_status": "success"}
+
+        # Create pending destination blob and copy in the background
+        await asyncio.to_thread(
+            self.__write_blob,
+            file_path=file_path,
+            data=b"",
+            copy={"id": copy_id, "source": source_url, "status": "pending"},
+        )
+        copy_task = asyncio.create_task(copy())
+        self.__copy_tasks[(storage_container_name, storage_blob_name)] = copy_task
+
+        def set_failed(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() and os.path.exists(file_path):
+                properties = self.__read_properties(file_path=file_path)
+                properties["copy"]["status"] = "failed"
+                properties["copy"]["status_description"] = str(task.exception())
+                self.__write_properties(file_path=file_path, properties=properties)
+
+        copy_task.add_done_callback(set_failed)
+        return {"copy_id": copy_id, "copy_status": "pending"}
+
+    async def abort_copy(
+        self, storage_container_name: str, storage_blob_name: str, copy_id: str
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        properties = self.__read_properties(file_path=file_path)
+        if properties.get("copy", {}).get("id") != copy_id:
+            message = f"The copy id '{copy_id}' does not match the pending copy activity of blob '{storage_blob_name}'."
+            logging.error(message)
+            raise ResourceExistsError(message)
+        copy_task = self.__copy_tasks.pop(
+            (storage_container_name, storage_blob_name), None
+        )
+        if copy_task and not copy_task.done():
+            copy_task.cancel()
+            properties["copy"]["status"] = "aborted"
+            self.__write_properties(file_path=file_path, properties=properties)
+
+    async def copy_from_url(
+        self, storage_container_name: str, storage_blob_name: str, source_url: str
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        data, content_settings = await self.__read_source(source_url=source_url)
+        await asyncio.to_thread(
+            self.__write_blob,
+            file_path=file_path,
+            data=data,
+            content_settings=content_settings,
+        )
+
+    async def acquire_lease(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_duration: int = -1,
+    ) -> str:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        properties = self.__read_properties(file_path=file_path)
+        if self.__get_lease_id(properties=properties):
+            message = f"There is already a lease present on blob '{storage_blob_name}'."
+            logging.error(message)
+            raise ResourceExistsError(message)
+        lease_id = str(uuid.uuid4())
+        properties["lease"] = {
+            "id": lease_id,
+            "expiry_time": (
+                (
+                    datetime.now(tz=timezone.utc) + timedelta(seconds=lease_duration)
+                ).isoformat()
+                if lease_duration > 0
+                else None
+            ),
+        }
+        self.__write_properties(file_path=file_path, properties=properties)
+        return lease_id
+
+    async def release_lease(
+        self, storage_container_name: str, storage_blob_name: str, lease_id: str
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        properties = self.__read_properties(file_path=file_path)
+        if properties.get("lease", {}).get("id") != lease_id:
+            message = f"The lease id '{lease_id}' does not match the lease on blob '{storage_blob_name}'."
+            logging.error(message)
+            raise ResourceModifiedError(message)
+        properties["lease"] = {}
+        self.__write_properties(file_path=file_path, properties=properties)
+
+    async def delete_blob(
+        self,
+        storage_container_name: str,
+        storage_blob_name: str,
+        lease_id: str = None,
+    ) -> None:
+        file_path = self.__get_file_path(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+        )
+        self.__read_properties(file_path=file_path)
+        self.__check_lease(file_path=file_path, lease_id=lease_id)
+        os.remove(file_path)
+        properties_file_path = f"{file_path}{self.PROPERTIES_FILE_SUFFIX}"
+        if os.path.exists(properties_file_path):
+            os.remove(properties_file_path)
+
+    async def list_blobs(
+        self, storage_container_name: str, name_starts_with: str = None
+    ) -> List[str]:
+        container_path = os.path.join(self.__root_directory, storage_container_name)
+        blob_names = []
+        for directory_path, _, file_names in os.walk(container_path):
+            for file_name in file_names:
+                if file_name.endswith(
+                    self.PROPERTIES_FILE_SUFFIX
+                ) or file_name.endswith(".tmp"):
+                    continue
+                blob_name = Path(
+                    os.path.relpath(
+                        os.path.join(directory_path, file_name), container_path
+                    )
+                ).as_posix()
+                if name_starts_with is None or blob_name.startswith(name_starts_with):
+                    blob_names.append(blob_name)
+        return sorted(blob_names)
+
+    async def close(self) -> None:
+        copy_tasks = list(self.__copy_tasks.values())
+        self.__copy_tasks.clear()
+        for copy_task in copy_tasks:
+            copy_task.cancel()
+        await asyncio.gather(*copy_tasks, return_exceptions=True)
+
+
+class StorageBackendRegistry:
+    def __init__(
+        self,
+        storage_backend: Literal["azure", "local"] = "azure",
+        local_root_directory: str = ".localstorage",
+    ) -> None:
+        """Initializes the process-wide registry of pooled storage backends.
+
+        Backends are keyed by the configured backend, storage domain name and managed identity client id and are shared
+        across function invocations within the worker, so that connections and cached access
+        tokens are reused instead of being created per call.
+
+        storage_backend (Literal["azure", "local"]): Specifies the type of storage backend.
+        local_root_directory (str): Specifies the root directory of the local storage backend.
+        RETURNS (None): No return values.
+        """
+        self.__storage_backend = storage_backend
+        self.__local_root_directory = local_root_directory
+        self.__credentials: Dict[str, DefaultAzureCredential] = {}
+        self.__storage_backends: Dict[Tuple[str, str, str, str], StorageBackend] = {}
+        self.__hits = 0
+        self.__misses = 0
+
+    def configure(
+        self,
+        storage_backend: Literal["azure", "local"],
+        local_root_directory: str = ".localstorage",
+    ) -> None:
+        """Configures the type of storage backend created by the registry.
+
+        storage_backend (Literal["azure", "local"]): Specifies the type of storage backend.
+        local_root_directory (str): Specifies the root directory of the local storage backend.
+        RETURNS (None): No return values.
+        """
+        if storage_backend not in ["azure", "local"]:
+            message = f"Storage backend '{storage_backend}' is not supported."
+            logging.error(message)
+            raise ValueError(message)
+        if self.__storage_backends:
+            logging.warning(
+                "Reconfiguring storage backend registry with open backends."
+            )
+        self.__storage_backend = storage_backend
+        self.__local_root_directory = local_root_directory
+
+    def get_credential(
+        self, managed_identity_client_id: str = None
+    ) -> DefaultAzureCredential:
+        """Returns the pooled default azure credential for a managed identity.
+
+        managed_identity_client_id (str): Specifies the client id of a managed identity.
+        RETURNS (DefaultAzureCredential): Returns the pooled default azure credential.
+        """
+        key = managed_identity_client_id or ""
+        if key not in self.__credentials:
+            if managed_identity_client_id is None:
+                self.__credentials[key] = DefaultAzureCredential()
+            else:
+                self.__credentials[key] = DefaultAzureCredential(
+                    managed_identity_client_id=managed_identity_client_id,
+                )
+        return self.__credentials[key]
+
+    def get_storage_backend(
+        self, storage_domain_name: str, managed_identity_client_id: str = None
+    ) -> StorageBackend:
+        """Returns the pooled storage backend for a storage domain and identity.
+
+        storage_domain_name (str): The domain name of the storage account.
+        managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+        RETURNS (StorageBackend): Returns the pooled storage backend.
+        """
+        key = (
+            self.__storage_backend,
+            self.__local_root_directory if self.__storage_backend == "local" else "",
+            storage_domain_name,
+            managed_identity_client_id or "",
+        )
+        storage_backend = self.__storage_backends.get(key)
+        if storage_backend is None:
+            self.__misses += 1
+            logging.debug(
+                f"Creating pooled {self.__storage_backend} storage backend for domain '{storage_domain_name}'."
+            )
+            if self.__storage_backend == "local":
+                storage_backend = LocalStorageBackend(
+                    root_directory=self.__local_root_directory,
+                    storage_domain_name=storage_domain_name,
+                )
+            else:
+                storage_backend = AzureStorageBackend(
+                    storage_domain_name=storage_domain_name,
+                    credential=self.get_credential(
+                        managed_identity_client_id=managed_identity_client_id
+                    ),
+                )
+            self.__storage_backends[key] = storage_backend
+        else:
+            self.__hits += 1
+        return storage_backend
+
+    def get_metrics(self) -> ClientPoolMetrics:
+        """Returns the usage metrics of the backend pool.
+
+        RETURNS (ClientPoolMetrics): Returns the number of pool hits, misses and open backends.
+        """
+        return ClientPoolMetrics(
+            hits=self.__hits,
+            misses=self.__misses,
+            clients=len(self.__storage_backends),
+            credentials=len(self.__credentials),
+        )
+
+    async def close(self) -> None:
+        """Closes all pooled storage backends and credentials.
+
+        RETURNS (None): No return values.
+        """
+        logging.info(f"Closing pooled storage backends: {self.get_metrics()}")
+        storage_backends = list(self.__storage_backends.values())
+        credentials = list(self.__credentials.values())
+        self.__storage_backends.clear()
+        self.__credentials.clear()
+        for closeable in storage_backends + credentials:
+            try:
+                await closeable.close()
+            except Exception as e:
+                logging.warning(f"Closing pooled storage backend failed: {e}")
+
+
+storage_backend_registry = StorageBackendRegistry()
+
+
+def get_storage_backend(
+    storage_domain_name: str,
+    managed_identity_client_id: str = None,
+) -> StorageBackend:
+    """Returns the pooled storage backend of the worker.
+
+    storage_domain_name (str): The domain name of the storage account.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (StorageBackend): Returns the pooled storage backend.
+    """
+    return storage_backend_registry.get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
@@ -1,14 +1,42 @@
 import asyncio
+import gzip
 import hashlib
 import logging
 import os
 import shutil
+import time
 import uuid
-from urllib.parse import unquote
-
+import zlib
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Literal,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import unquote, urlparse
+
+import httpx
 from azure.identity.aio import DefaultAzureCredential
-from azure.storage.blob import BlobProperties
-from azure.storage.blob.aio import BlobLeaseClient, BlobServiceClient
+from azure.storage.blob import BlobProperties, ContentSettings
+from shared.http import http_client_registry
+from shared.models import CopyBlobFromUrlResult, CopyBlobResult
+from shared.storage import get_storage_backend
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"
 
 
 def get_guid(seed: str) -> str:
@@ -21,6 +49,140 @@ def get_guid(seed: str) -> str:
     return str(uuid.UUID(hex=seed_hex, version=4))
 
 
+def get_throughput_message(bytes_transferred: int, duration_in_seconds: float) -> str:
+    """Creates a log message describing the throughput of a transfer.
+
+    bytes_transferred (int): Specifies the number of bytes that were transferred.
+    duration_in_seconds (float): Specifies the duration of the transfer in seconds.
+    RETURNS (str): Returns the throughput message.
+    """
+    throughput = bytes_transferred / max(duration_in_seconds, 1e-9)
+    return f"{bytes_transferred} bytes in {duration_in_seconds:.2f}s, {throughput / (1024 * 1024):.2f} MiB/s"
+
+
+def get_content_encoding(data: bytes) -> str:
+    """Detects the compression of data based on its magic number.
+
+    data (bytes): Specifies the data.
+    RETURNS (str): Returns 'gzip' or 'zstd' if the data is compressed, otherwise None.
+    """
+    if data[:2] == GZIP_MAGIC_NUMBER:
+        return "gzip"
+    elif data[:4] == ZSTD_MAGIC_NUMBER:
+        return "zstd"
+    return None
+
+
+def compress_data(data: bytes, content_encoding: Literal["gzip", "zstd"]) -> bytes:
+    """Compresses data with gzip or zstd.
+
+    data (bytes): Specifies the data that should be compressed.
+    content_encoding (Literal["gzip", "zstd"]): Specifies the compression algorithm.
+    RETURNS (bytes): Returns the compressed data.
+    """
+    if content_encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    elif content_encoding == "zstd":
+        if zstandard is None:
+            message = "Compression 'zstd' requires the package 'zstandard'."
+            logging.error(message)
+            raise ValueError(message)
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    message = f"Compression '{content_encoding}' is not supported."
+    logging.error(message)
+    raise ValueError(message)
+
+
+def decompress_data(data: bytes, content_encoding: Literal["gzip", "zstd"]) -> bytes:
+    """Decompresses data compressed with gzip or zstd.
+
+    data (bytes): Specifies the compressed data.
+    content_encoding (Literal["gzip", "zstd"]): Specifies the compression algorithm.
+    RETURNS (bytes): Returns the decompressed data.
+    """
+    if content_encoding == "gzip":
+        return gzip.decompress(data)
+    elif content_encoding == "zstd":
+        if zstandard is None:
+            message = "Decompression of 'zstd' requires the package 'zstandard'."
+            logging.error(message)
+            raise ValueError(message)
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    message = f"Compression '{content_encoding}' is not supported."
+    logging.error(message)
+    raise ValueError(message)
+
+
+async def iter_decompressed_chunks(
+    chunks: AsyncIterator[bytes], max_chunk_size: int = 4 * 1024 * 1024
+) -> AsyncIterator[bytes]:
+    """Decompresses a stream of chunks compressed with gzip or zstd incrementally.
+
+    The compression is detected from the magic number of the first chunk. Uncompressed chunks are
+    passed through unchanged and empty chunks are skipped.
+
+    chunks (AsyncIterator[bytes]): Specifies the chunks of the data.
+    max_chunk_size (int): Specifies the maximum size of decompressed gzip chunks, which bounds the memory of highly compressed data.
+    RETURNS (AsyncIterator[bytes]): Returns the decompressed chunks.
+    """
+    decompressor = None
+    content_encoding = None
+    first_chunk = True
+    async for chunk in chunks:
+        if first_chunk:
+            first_chunk = False
+            content_encoding = get_content_encoding(data=chunk)
+            if content_encoding == "gzip":
+                decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            elif content_encoding == "zstd":
+                if zstandard is None:
+                    message = (
+                        "Decompression of 'zstd' requires the package 'zstandard'."
+                    )
+                    logging.error(message)
+                    raise ValueError(message)
+                decompressor = zstandard.ZstdDecompressor().decompressobj()
+        if content_encoding == "gzip":
+            while chunk:
+                data = decompressor.decompress(chunk, max_chunk_size)
+                if data:
+                    yield data
+                chunk = decompressor.unconsumed_tail
+        else:
+            data = chunk if decompressor is None else decompressor.decompress(chunk)
+            if data:
+                yield data
+    if content_encoding == "gzip":
+        data = decompressor.flush()
+        if data:
+            yield data
+
+
+async def load_url(url: str) -> bytes:
+    """Download file from a url async and return data.
+
+    url (str): The url of the file, e.g. a url including a sas token.
+    RETURNS (bytes): The data within the file.
+    """
+    logging.info(f"Start downloading file from url.")
+
+    # Download file with pooled http client of the host
+    url_parsed = urlparse(url)
+    http_client = http_client_registry.get_http_client(
+        base_url=f"{url_parsed.scheme}://{url_parsed.netloc}"
+    )
+    response = await http_client.get(url=url, follow_redirects=True)
+
+    # Check response
+    if response.status_code >= 400:
+        message = f"Failed to download file (status code: '{response.status_code}'): '{response.text}'"
+        logging.error(message)
+        raise httpx.RequestError(message)
+
+    logging.info(f"Finished downloading file from url to memory.")
+    return response.content
+
+
 def get_azure_credential(
     managed_identity_client_id: str = None,
 ) -> DefaultAzureCredential:
@@ -55,21 +217,17 @@ async def get_blob_properties(
         f"Get properties for blob: 'https://{storage_domain_name}/{storage_container_name}/{storage_blob_name}'."
     )
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
     )
 
-    # Copy blob file
-    async with BlobServiceClient(
-        account_url=f"https://{storage_domain_name}",
-        credential=credential,
-    ) as blob_service_client:
-        blob_client = blob_service_client.get_blob_client(
-            container=storage_container_name,
-            blob=storage_blob_name,
-        )
-        blob_properties = await blob_client.get_blob_properties()
+    # Get blob properties
+    blob_properties = await storage_backend.get_blob_properties(
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+    )
 
     return blob_properties
 
@@ -94,25 +252,105 @@ async def copy_blob_from_url(
         f"Start copying file source '{source_url}' to sink 'https://{sink_storage_domain_name}/{sink_storage_container_name}/{sink_storage_blob_name}'."
     )
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=sink_storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
     )
 
     # Copy blob file
-    async with BlobServiceClient(
-        account_url=f"https://{sink_storage_domain_name}",
-        credential=credential,
-    ) as blob_service_client:
-        sink_blob_client = blob_service_client.get_blob_client(
-            container=sink_storage_container_name,
-            blob=sink_storage_blob_name,
-        )
-        await sink_blob_client.upload_blob_from_url(
-            source_url=source_url, overwrite=True
+    await storage_backend.copy_from_url(
+        storage_container_name=sink_storage_container_name,
+        storage_blob_name=sink_storage_blob_name,
+        source_url=source_url,
+    )
+
+    return storage_backend.get_blob_url(
+        storage_container_name=sink_storage_container_name,
+        storage_blob_name=sink_storage_blob_name,
+    )
+
+
+async def copy_blobs_from_url(
+    items: List[Tuple[str, str]],
+    sink_storage_domain_name: str,
+    sink_storage_container_name: str,
+    max_concurrency: int = 8,
+    max_attempts: int = 3,
+    retry_interval: float = 1.0,
+    managed_identity_client_id: str = None,
+) -> List[CopyBlobFromUrlResult]:
+    """Copy files from source urls async to a sink blob storage container concurrently.
+
+    Each item is copied and retried independently, so a failing item does not affect the others.
+
+    items (List[Tuple[str, str]]): The list of source urls and sink blob names.
+    sink_storage_domain_name (str): The domain name of the storage account to which the files will be copied.
+    sink_storage_container_name (str): The container name of the storage account.
+    max_concurrency (int): Specifies the maximum number of concurrent copy activities.
+    max_attempts (int): Specifies the maximum number of attempts per item.
+    retry_interval (float): Specifies the initial interval in seconds between attempts, which doubles after every attempt.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (List[CopyBlobFromUrlResult]): Returns the result of every item in the order of the provided items.
+    """
+    logging.info(
+        f"Start copying {len(items)} files to sink 'https://{sink_storage_domain_name}/{sink_storage_container_name}'."
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def copy_item(
+        source_url: str, sink_storage_blob_name: str
+    ) -> CopyBlobFromUrlResult:
+        start_time = time.perf_counter()
+        error = None
+        for attempt in range(1, max_attempts + 1):
+            try:
+                async with semaphore:
+                    sink_url = await copy_blob_from_url(
+                        source_url=source_url,
+                        sink_storage_domain_name=sink_storage_domain_name,
+                        sink_storage_container_name=sink_storage_container_name,
+                        sink_storage_blob_name=sink_storage_blob_name,
+                        managed_identity_client_id=managed_identity_client_id,
+                    )
+                return CopyBlobFromUrlResult(
+                    source_url=source_url,
+                    sink_storage_blob_name=sink_storage_blob_name,
+                    url=sink_url,
+                    succeeded=True,
+                    attempts=attempt,
+                    duration_in_seconds=time.perf_counter() - start_time,
+                )
+            except Exception as e:
+                error = str(e)
+                logging.warning(
+                    f"Attempt {attempt} of {max_attempts} to copy file to '{sink_storage_blob_name}' failed: '{error}'"
+                )
+                if attempt < max_attempts:
+                    await asyncio.sleep(retry_interval * 2 ** (attempt - 1))
+        return CopyBlobFromUrlResult(
+            source_url=source_url,
+            sink_storage_blob_name=sink_storage_blob_name,
+            url=None,
+            succeeded=False,
+            attempts=max_attempts,
+            duration_in_seconds=time.perf_counter() - start_time,
+            error=error,
         )
 
-    return sink_blob_client.url
+    results = await asyncio.gather(
+        *[
+            copy_item(
+                source_url=source_url, sink_storage_blob_name=sink_storage_blob_name
+            )
+            for source_url, sink_storage_blob_name in items
+        ]
+    )
+
+    logging.info(
+        f"Finished copying files: {sum(result.succeeded for result in results)} of {len(results)} succeeded."
+    )
+    return results
 
 
 async def copy_blob(
@@ -122,71 +360,298 @@ async def copy_blob(
     sink_storage_container_name: str,
     sink_storage_blob_name: str,
     delete_source: bool = True,
+    sync_copy_size_threshold: int = 256 * 1024 * 1024,
+    poll_interval: float = 0.5,
+    max_poll_interval: float = 15.0,
     managed_identity_client_id: str = None,
-) -> str:
+) -> CopyBlobResult:
     """Copy file from source blob storage container async to sink blob storage container.
 
+    Blobs up to `sync_copy_size_threshold` bytes are copied synchronously with a single request.
+    Larger blobs are copied asynchronously and the copy status is polled with an exponential
+    backoff, which is shortened based on the progress reported by the service. The lease on the
+    source blob is always released if the copy does not succeed.
+
     storage_domain_name (str): The domain name of the storage account.
     source_storage_container_name (str): The container name of the storage account.
     source_storage_blob_name (str): The blob name of the storage account.
     sink_storage_container_name (str): The container name of the storage account.
     sink_storage_blob_name (str): The blob name of the storage account.
     delete_source (bool): Specifies whether the source blob should be removed after the successful copy activity.
+    sync_copy_size_threshold (int): Specifies the maximum blob size in bytes for which a synchronous copy is used.
+    poll_interval (float): Specifies the initial interval in seconds between copy status checks.
+    max_poll_interval (float): Specifies the maximum interval in seconds between copy status checks.
     managed_identity_client_id (str): Specifies the managed identity client id used for auth.
-    RETURNS (str): Returns the url of the destination blob.
+    RETURNS (CopyBlobResult): Returns the url of the destination blob and metrics of the copy activity.
     """
     logging.info(
         f"Start copying file source 'https://{storage_domain_name}/{source_storage_container_name}/{source_storage_blob_name}' to sink 'https://{storage_domain_name}/{sink_storage_container_name}/{sink_storage_blob_name}'."
     )
+    start_time = time.perf_counter()
+    request_count = 0
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+    source_url = storage_backend.get_blob_url(
+        storage_container_name=source_storage_container_name,
+        storage_blob_name=source_storage_blob_name,
+    )
+    sink_url = storage_backend.get_blob_url(
+        storage_container_name=sink_storage_container_name,
+        storage_blob_name=sink_storage_blob_name,
     )
 
-    # Copy blob file
-    async with BlobServiceClient(
-        account_url=f"https://{storage_domain_name}",
-        credential=credential,
-    ) as blob_service_client:
-        # Create blob clients
-        source_blob_client = blob_service_client.get_blob_client(
-            container=source_storage_container_name,
-            blob=source_storage_blob_name,
-        )
-        sink_blob_client = blob_service_client.get_blob_client(
-            container=sink_storage_container_name,
-            blob=sink_storage_blob_name,
-        )
-
-        # Aquire lease
-        lease = BlobLeaseClient(
-            client=source_blob_client,
+    # Aquire lease
+    lease_id = await storage_backend.acquire_lease(
+        storage_container_name=source_storage_container_name,
+        storage_blob_name=source_storage_blob_name,
+        lease_duration=-1,
+    )
+    request_count += 1
+    lease_released = False
+
+    copy_id = None
+    status = None
+    try:
+        # Get size of source blob
+        source_blob_properties = await storage_backend.get_blob_properties(
+            storage_container_name=source_storage_container_name,
+            storage_blob_name=source_storage_blob_name,
         )
-        await lease.acquire(lease_duration=-1)
+        request_count += 1
+        synchronous = source_blob_properties.size <= sync_copy_size_threshold
 
         # Copy blob
-        _ = await sink_blob_client.start_copy_from_url(
-            source_url=source_blob_client.url,
-            requires_sync=False,
+        copy_properties = await storage_backend.start_copy_from_url(
+            storage_container_name=sink_storage_container_name,
+            storage_blob_name=sink_storage_blob_name,
+            source_url=source_url,
+            requires_sync=synchronous,
         )
+        request_count += 1
+        copy_id = copy_properties.get("copy_id")
+        status = copy_properties.get("copy_status")
+        logging.info(f"Status of copy activity: {status}")
 
         # Wait for copy to finish
-        status = (await sink_blob_client.get_blob_properties()).copy.status
-        logging.info(f"Status of copy activity: {status}")
-        while status not in ["success", "failed", "aborted"]:  # "pending",
-            await asyncio.sleep(1)
-            status = (await sink_blob_client.get_blob_properties()).copy.status
-            logging.info(f"Status of copy activity: {status}")
+        interval = poll_interval
+        bytes_copied_previous, time_previous = 0, time.perf_counter()
+        while status == "pending":
+            await asyncio.sleep(interval)
+            copy = (
+                await storage_backend.get_blob_properties(
+                    storage_container_name=sink_storage_container_name,
+                    storage_blob_name=sink_storage_blob_name,
+                )
+            ).copy
+            request_count += 1
+            status = copy.status
+            logging.info(f"Status of copy activity: {status} ({copy.progress})")
+
+            # Calculate next interval based on the progress of the copy activity
+            interval = min(interval * 2, max_poll_interval)
+            if copy.progress:
+                bytes_copied, bytes_total = [
+                    int(value) for value in str.split(copy.progress, sep="/")
+                ]
+                time_current = time.perf_counter()
+                rate = (bytes_copied - bytes_copied_previous) / max(
+                    time_current - time_previous, 1e-9
+                )
+                if rate > 0:
+                    interval = min(
+                        max((bytes_total - bytes_copied) / rate, poll_interval),
+                        interval,
+                    )
+                bytes_copied_previous, time_previous = bytes_copied, time_current
+
+        # Check final status
+        if status != "success":
+            message = f"Copy activity to '{sink_url}' finished with status '{status}'."
+            logging.error(message)
+            raise Exception(message)
 
         # Delete source blob
         if delete_source:
-            await source_blob_client.delete_blob(
-                delete_snapshots="include", lease=lease
+            await storage_backend.delete_blob(
+                storage_container_name=source_storage_container_name,
+                storage_blob_name=source_storage_blob_name,
+                lease_id=lease_id,
             )
-        else:
-            await lease.release()
-    return sink_blob_client.url
+            request_count += 1
+            lease_released = True
+    finally:
+        if status == "pending" and copy_id:
+            logging.warning(f"Aborting copy activity '{copy_id}'.")
+            await storage_backend.abort_copy(
+                storage_container_name=sink_storage_container_name,
+                storage_blob_name=sink_storage_blob_name,
+                copy_id=copy_id,
+            )
+            request_count += 1
+        if not lease_released:
+            await storage_backend.release_lease(
+                storage_container_name=source_storage_container_name,
+                storage_blob_name=source_storage_blob_name,
+                lease_id=lease_id,
+            )
+            request_count += 1
+
+    result = CopyBlobResult(
+        url=sink_url,
+        status=status,
+        synchronous=synchronous,
+        duration_in_seconds=time.perf_counter() - start_time,
+        request_count=request_count,
+    )
+    logging.info(f"Finished copy activity: {result.model_dump_json()}")
+    return result
+
+
+async def delete_blob(
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    managed_identity_client_id: str = None,
+) -> None:
+    """Delete file including its snapshots from blob storage async.
+
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the storage account.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (None): Returns no value.
+    """
+    logging.info(
+        f"Delete blob: 'https://{storage_domain_name}/{storage_container_name}/{storage_blob_name}'."
+    )
+
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+
+    # Delete blob
+    await storage_backend.delete_blob(
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+    )
+
+
+async def list_blobs(
+    storage_domain_name: str,
+    storage_container_name: str,
+    name_starts_with: str = None,
+    managed_identity_client_id: str = None,
+) -> List[str]:
+    """List the names of the files in a blob storage container async.
+
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    name_starts_with (str): Specifies the prefix of the blob names.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (List[str]): Returns the names of the blobs.
+    """
+    logging.info(
+        f"List blobs: 'https://{storage_domain_name}/{storage_container_name}/{name_starts_with or ''}'."
+    )
+
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+
+    # List blobs
+    return await storage_backend.list_blobs(
+        storage_container_name=storage_container_name,
+        name_starts_with=name_starts_with,
+    )
+
+
+async def iter_blob_chunks(
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    chunk_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    offset: int = 0,
+    length: int = None,
+    managed_identity_client_id: str = None,
+) -> AsyncIterator[bytes]:
+    """Download file from blob storage async as concurrent byte ranges and yield them in order.
+
+    At most `max_concurrency` ranges are in flight at any time, so the memory used is bounded by
+    `max_concurrency * chunk_size` independent of the size of the blob. All ranges are requested
+    with the etag of the blob to detect modifications during the download.
+
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the storage account.
+    chunk_size (int): Specifies the size of the byte ranges in bytes.
+    offset (int): Specifies the byte offset from which the blob is downloaded.
+    length (int): Specifies the number of bytes that are downloaded. Defaults to the end of the blob.
+    max_concurrency (int): Specifies the maximum number of concurrent range requests.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (AsyncIterator[bytes]): Returns the chunks of the blob in order.
+    """
+    if chunk_size <= 0 or max_concurrency <= 0:
+        message = f"Chunk size '{chunk_size}' and max concurrency '{max_concurrency}' must be positive."
+        logging.error(message)
+        raise ValueError(message)
+
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+
+    # Get size and etag of blob
+    blob_properties = await storage_backend.get_blob_properties(
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+    )
+    end_offset = (
+        blob_properties.size
+        if length is None
+        else min(blob_properties.size, offset + length)
+    )
+    blob_etag = blob_properties.etag
+
+    async def download_range(range_offset: int, range_length: int) -> bytes:
+        return await storage_backend.download_blob_range(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+            offset=range_offset,
+            length=range_length,
+            etag=blob_etag,
+        )
+
+    # Download ranges with a sliding window of concurrent requests
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        for range_offset in range(offset, end_offset, chunk_size):
+            pending.append(
+                asyncio.create_task(
+                    download_range(
+                        range_offset=range_offset,
+                        range_length=min(chunk_size, end_offset - range_offset),
+                    )
+                )
+            )
+            if len(pending) >= max_concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # Cancel ranges of an early exit and wait for them to release their responses
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
 
 async def download_blob(
@@ -194,14 +659,24 @@ async def download_blob(
     storage_domain_name: str,
     storage_container_name: str,
     storage_blob_name: str,
+    chunk_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    hash_object: Any = None,
     managed_identity_client_id: str = None,
 ) -> str:
     """Download file from blob storage async to local storage.
 
+    Byte ranges are downloaded concurrently by `iter_blob_chunks`, but are written to the file in
+    order instead of at their offsets. This keeps the file sequential, allows the hash of the
+    content to be computed during the download and bounds memory by `max_concurrency * chunk_size`.
+
     file_path (str): The file path to which the file will be downloaded.
     storage_domain_name (str): The domain name of the storage account.
     storage_container_name (str): The container name of the storage account.
     storage_blob_name (str): The blob name of the storage account.
+    chunk_size (int): Specifies the size of the byte ranges in bytes.
+    max_concurrency (int): Specifies the maximum number of concurrent range requests.
+    hash_object (Any): Specifies a hashlib object which is updated with the downloaded bytes in order.
     managed_identity_client_id (str): Specifies the managed identity client id used for auth.
     RETURNS (str): The file path to which the file was downloaded.
     """
@@ -213,41 +688,204 @@ async def download_blob(
         f"Storage Details: Domain='{storage_domain_name}', Container='{storage_container_name}', Blob='{storage_blob_name_cleansed}'."
     )
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
-    )
-
     # Create directory
     head, _ = os.path.split(file_path)
     if not os.path.exists(head):
         os.makedirs(head)
 
-    # Create client
-    blob_service_client = BlobServiceClient(
-        account_url=f"https://{storage_domain_name}", credential=credential
-    )
-    blob_client = blob_service_client.get_blob_client(
-        container=storage_container_name, blob=storage_blob_name_cleansed
-    )
-
     # Download blob
+    start_time = time.perf_counter()
+    bytes_downloaded = 0
     with open(file=file_path, mode="wb") as sample_blob:
-        download_stream = await blob_client.download_blob()
-        data = await download_stream.readall()
-        sample_blob.write(data)
+        async for chunk in iter_blob_chunks(
+            storage_domain_name=storage_domain_name,
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name_cleansed,
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            managed_identity_client_id=managed_identity_client_id,
+        ):
+            await asyncio.to_thread(sample_blob.write, chunk)
+            if hash_object is not None:
+                hash_object.update(chunk)
+            bytes_downloaded += len(chunk)
 
-    logging.info(f"Finished downloading file from blob storage to '{file_path}'.")
+    logging.info(
+        f"Finished downloading file from blob storage to '{file_path}' ({get_throughput_message(bytes_transferred=bytes_downloaded, duration_in_seconds=time.perf_counter() - start_time)})."
+    )
 
     # Return file path of downloaded blob
     return file_path
 
 
+async def iter_file_chunks(
+    file_path: str, chunk_size: int = 4 * 1024 * 1024
+) -> AsyncIterator[bytes]:
+    """Read a local file async in chunks without blocking the event loop.
+
+    file_path (str): The file path of the file that will be read.
+    chunk_size (int): Specifies the size of the chunks in bytes.
+    RETURNS (AsyncIterator[bytes]): Returns the chunks of the file in order.
+    """
+    with open(file=file_path, mode="rb") as file:
+        while True:
+            chunk = await asyncio.to_thread(file.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def upload_stream(
+    data: Union[bytes, Iterable[bytes], AsyncIterable[bytes]],
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    content_settings: ContentSettings = None,
+    header: Callable[[int], bytes] = None,
+    managed_identity_client_id: str = None,
+) -> str:
+    """Upload data to blob storage async by staging blocks in parallel.
+
+    The data is split into blocks of `block_size` bytes which are staged concurrently and committed
+    once all blocks were staged. At most `max_concurrency` blocks are in flight at any time, so
+    producers can stream data of arbitrary size into storage with bounded memory. Payloads that
+    fit into a single block are uploaded with a single request.
+
+    Formats which store the length of the payload in a header can be streamed by providing a `header`
+    function. The header is created once all data was staged and committed as the first block.
+
+    data (Union[bytes, Iterable[bytes], AsyncIterable[bytes]]): The data or an (async) iterator of chunks that will be uploaded.
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the storage account.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of blocks staged concurrently.
+    content_settings (ContentSettings): Specifies the content settings of the blob.
+    header (Callable[[int], bytes]): Specifies a function that creates the header of the blob from the number of bytes of the data.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (str): The url of the uploaded blob.
+    """
+    if block_size <= 0 or max_concurrency <= 0:
+        message = f"Block size '{block_size}' and max concurrency '{max_concurrency}' must be positive."
+        logging.error(message)
+        raise ValueError(message)
+
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+
+    async def iter_blocks() -> AsyncIterator[bytes]:
+        if isinstance(data, (bytes, bytearray)):
+            chunks = [data]
+        else:
+            chunks = data
+        buffer = bytearray()
+        if isinstance(chunks, AsyncIterable):
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                while len(buffer) >= block_size:
+                    yield bytes(buffer[:block_size])
+                    del buffer[:block_size]
+        else:
+            for chunk in chunks:
+                buffer.extend(chunk)
+                while len(buffer) >= block_size:
+                    yield bytes(buffer[:block_size])
+                    del buffer[:block_size]
+        if buffer:
+            yield bytes(buffer)
+
+    # Upload blocks
+    start_time = time.perf_counter()
+    bytes_uploaded = 0
+    block_ids: List[str] = []
+    blocks = iter_blocks()
+    block = await anext(blocks, b"")
+    next_block = await anext(blocks, None)
+    if next_block is None and header is None:
+        # Upload small payloads with a single request
+        await storage_backend.upload_blob(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+            data=block,
+            content_settings=content_settings,
+        )
+        bytes_uploaded = len(block)
+    else:
+        pending: Set[asyncio.Task] = set()
+        try:
+            while block:
+                if len(pending) >= max_concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                block_id = f"{len(block_ids):032d}"
+                block_ids.append(block_id)
+                bytes_uploaded += len(block)
+                pending.add(
+                    asyncio.create_task(
+                        storage_backend.stage_block(
+                            storage_container_name=storage_container_name,
+                            storage_blob_name=storage_blob_name,
+                            block_id=block_id,
+                            data=block,
+                        )
+                    )
+                )
+                block, next_block = next_block, await anext(blocks, None)
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                for task in done:
+                    task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Stage header
+        if header is not None:
+            header_block = header(bytes_uploaded)
+            header_block_id = f"{len(block_ids):032d}"
+            await storage_backend.stage_block(
+                storage_container_name=storage_container_name,
+                storage_blob_name=storage_blob_name,
+                block_id=header_block_id,
+                data=header_block,
+            )
+            block_ids.insert(0, header_block_id)
+            bytes_uploaded += len(header_block)
+
+        # Commit blocks
+        await storage_backend.commit_block_list(
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+            block_ids=block_ids,
+            content_settings=content_settings,
+        )
+
+    logging.info(
+        f"Uploaded {len(block_ids) or 1} block(s) to blob storage ({get_throughput_message(bytes_transferred=bytes_uploaded, duration_in_seconds=time.perf_counter() - start_time)})."
+    )
+
+    # Return blob url
+    return storage_backend.get_blob_url(
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+    )
+
+
 async def upload_blob(
     file_path: str,
     storage_domain_name: str,
     storage_container_name: str,
     storage_blob_name: str,
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
     managed_identity_client_id: str = None,
 ) -> str:
     """Upload file to blob storage async from local storage.
@@ -256,6 +894,8 @@ async def upload_blob(
     storage_domain_name (str): The domain name of the storage account.
     storage_container_name (str): The container name of the storage account.
     storage_blob_name (str): The blob name of the storage account.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of blocks staged concurrently.
     managed_identity_client_id (str): Specifies the managed identity client id used for auth.
     RETURNS (str): The url of the uploaded blob.
     """
@@ -267,29 +907,21 @@ async def upload_blob(
         f"Storage Details: Domain='{storage_domain_name}', Container='{storage_container_name}', Blob='{storage_blob_name_cleansed}'."
     )
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
-    )
-
-    # Create client
-    blob_service_client = BlobServiceClient(
-        account_url=f"https://{storage_domain_name}", credential=credential
-    )
-    container_client = blob_service_client.get_container_client(
-        container=storage_container_name
-    )
-
     # Upload blob
-    with open(file=file_path, mode="rb") as data:
-        blob_client = await container_client.upload_blob(
-            name=storage_blob_name_cleansed, data=data, overwrite=True
-        )
+    blob_url = await upload_stream(
+        data=iter_file_chunks(file_path=file_path, chunk_size=block_size),
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name_cleansed,
+        block_size=block_size,
+        max_concurrency=max_concurrency,
+        managed_identity_client_id=managed_identity_client_id,
+    )
 
     logging.info(f"Finished uploading file '{file_path}' to blob storage.")
 
     # Return blob url
-    return blob_client.url
+    return blob_url
 
 
 async def load_blob(
@@ -315,22 +947,27 @@ async def load_blob(
         f"Storage Details: Domain='{storage_domain_name}', Container='{storage_container_name}', Blob='{storage_blob_name_cleansed}'."
     )
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
+    # Get pooled storage backend
+    storage_backend = get_storage_backend(
+        storage_domain_name=storage_domain_name,
+        managed_identity_client_id=managed_identity_client_id,
     )
 
-    # Create client
-    blob_service_client = BlobServiceClient(
-        account_url=f"https://{storage_domain_name}", credential=credential
-    )
-    blob_client = blob_service_client.get_blob_client(
-        container=storage_container_name, blob=storage_blob_name_cleansed
+    # Download blob
+    data_bytes = await storage_backend.download_blob_range(
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name_cleansed,
     )
 
-    # Download blob
-    download_stream = await blob_client.download_blob()
-    data_bytes = await download_stream.readall()
+    # Decompress data
+    content_encoding = get_content_encoding(data=data_bytes)
+    if content_encoding:
+        start_time = time.perf_counter()
+        compressed_size = len(data_bytes)
+        data_bytes = decompress_data(data=data_bytes, content_encoding=content_encoding)
+        logging.info(
+            f"Decompressed {content_encoding} data from {compressed_size} to {len(data_bytes)} bytes in {time.perf_counter() - start_time:.3f}s."
+        )
     data = data_bytes.decode(encoding=encoding)
 
     logging.info(f"Finished downloading file from blob storage to memory.")
@@ -344,41 +981,57 @@ async def upload_string(
     storage_domain_name: str,
     storage_container_name: str,
     storage_blob_name: str,
+    encoding: str = "utf-8",
+    content_encoding: Literal["gzip", "zstd"] = None,
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
     managed_identity_client_id: str = None,
 ) -> str:
     """Upload file to blob storage async from local storage.
 
-    file_path (str): The file path to which the file will be downloaded.
+    data (str): The string that will be uploaded.
     storage_domain_name (str): The domain name of the storage account.
     storage_container_name (str): The container name of the storage account.
     storage_blob_name (str): The blob name of the storage account.
+    encoding (str): Specifies the encoding of the string.
+    content_encoding (Literal["gzip", "zstd"]): Specifies the compression of the uploaded data. Data is uploaded uncompressed if not provided.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of blocks staged concurrently.
     managed_identity_client_id (str): Specifies the managed identity client id used for auth.
     RETURNS (str): The url of the uploaded blob.
     """
     logging.info(f"Start uploading string to blob storage.")
 
-    # Create credentials
-    credential = get_azure_credential(
-        managed_identity_client_id=managed_identity_client_id
-    )
-
-    # Create client
-    blob_service_client = BlobServiceClient(
-        account_url=f"https://{storage_domain_name}", credential=credential
-    )
-    container_client = blob_service_client.get_container_client(
-        container=storage_container_name
-    )
+    # Compress data
+    data_bytes = data.encode(encoding=encoding)
+    if content_encoding:
+        start_time = time.perf_counter()
+        uncompressed_size = len(data_bytes)
+        data_bytes = compress_data(data=data_bytes, content_encoding=content_encoding)
+        logging.info(
+            f"Compressed data with {content_encoding} from {uncompressed_size} to {len(data_bytes)} bytes (ratio: {uncompressed_size / max(len(data_bytes), 1):.1f}) in {time.perf_counter() - start_time:.3f}s."
+        )
 
     # Upload blob
-    blob_client = await container_client.upload_blob(
-        name=storage_blob_name, data=data, overwrite=True
+    blob_url = await upload_stream(
+        data=data_bytes,
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+        block_size=block_size,
+        max_concurrency=max_concurrency,
+        content_settings=(
+            ContentSettings(content_encoding=content_encoding)
+            if content_encoding
+            else None
+        ),
+        managed_identity_client_id=managed_identity_client_id,
     )
 
     logging.info(f"Finished uploading string to blob storage.")
 
     # Return blob url
-    return blob_client.url
+    return blob_url
 
 
 def delete_directory(directory_path: str) -> None:
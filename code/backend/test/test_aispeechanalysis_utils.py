@@ -0,0 +1,301 @@
+import asyncio
+import json
+
+import pytest
+from aispeechanalysis.utils import (
+    WordTable,
+    find_phrase,
+    find_phrase_approximate,
+    get_locale,
+    get_timestamps_for_sections,
+    get_timestamps_for_sentence_sections,
+    get_transcript,
+    get_word_index,
+    read_stt_result,
+)
+from tools.speech_emulator import SpeechEmulator
+
+
+def create_result_stt(text: str):
+    display_words = [
+        {
+            "displayText": word,
+            "offset": f"PT{index}S",
+            "duration": "PT0.5S",
+        }
+        for index, word in enumerate(text.split())
+    ]
+    return {
+        "recognizedPhrases": [
+            {"nBest": [{"display": text, "displayWords": display_words}]}
+        ]
+    }
+
+
+def test_find_phrase():
+    # init
+    words = "a b c a b d a b".split()
+    word_index = get_word_index(words=words)
+
+    # act
+    positions = [
+        find_phrase(words=words, word_index=word_index, phrase_words=["a", "b"]),
+        find_phrase(
+            words=words,
+            word_index=word_index,
+            phrase_words=["a", "b"],
+            start_position=1,
+        ),
+        find_phrase(words=words, word_index=word_index, phrase_words=["b", "d"]),
+        find_phrase(words=words, word_index=word_index, phrase_words=["b", "x"]),
+        find_phrase(
+            words=words,
+            word_index=word_index,
+            phrase_words=["a", "b", "c"],
+            start_position=1,
+        ),
+        find_phrase(words=words, word_index=word_index, phrase_words=[]),
+    ]
+
+    # validate
+    assert positions == [0, 3, 4, -1, -1, -1]
+
+
+@pytest.mark.parametrize(
+    "phrase, start_position, expected",
+    [
+        ("rain is coming today", 0, (2, 6, 1.0)),
+        ("rain was coming today", 0, (2, 6, 0.75)),
+        ("the match ended in a draw", 0, (9, 15, 5 / 6)),
+        ("good morning", 0, (0, 2, 0.5)),
+        ("good evening", 1, (1, 2, 0.5)),
+        ("unknown words", 0, (-1, -1, 0.0)),
+    ],
+)
+def test_find_phrase_approximate(phrase, start_position, expected):
+    # init
+    word_table = WordTable.from_stt_result(
+        result_stt=create_result_stt(
+            text="Good evening. Rain is coming today in the north. The match ended with a draw. Good night."
+        )
+    )
+
+    # act
+    result = find_phrase_approximate(
+        word_table=word_table,
+        phrase_words=phrase.split(),
+        start_position=start_position,
+    )
+
+    # validate
+    assert result[:2] == expected[:2]
+    assert result[2] == pytest.approx(expected[2])
+
+
+def test_get_timestamps_for_sections():
+    # init
+    result_stt = create_result_stt(
+        text="Good evening. Rain is coming. Good evening. The match ended. Good night."
+    )
+    result_llm = {
+        "sections": [
+            {"id": 1, "start": "Good evening.", "end": "Rain is coming."},
+            {"id": 2, "start": "Good evening!", "end": "The match ended."},
+            {"id": 3, "start": "Missing sentence.", "end": "Good night."},
+            {"id": 4, "start": "Good night.", "end": "Good night and more."},
+        ]
+    }
+
+    # act
+    result = get_timestamps_for_sections(result_stt=result_stt, result_llm=result_llm)
+
+    # validate
+    assert [
+        (section.get("start_time"), section.get("end_time"))
+        for section in result["sections"]
+    ] == [
+        ("0:00:00", "0:00:04.500000"),
+        ("0:00:05", "0:00:09.500000"),
+        (None, None),
+        ("0:00:10", None),
+    ]
+
+
+def test_get_timestamps_for_sections_approximate():
+    # init
+    result_stt = create_result_stt(
+        text="Good evening. Rain is coming. Good evening. The match ended. Good night."
+    )
+    result_llm = {
+        "sections": [
+            {"id": 1, "start": "Good evening.", "end": "Rain is coming."},
+            {"id": 2, "start": "Good evening!", "end": "The match has ended."},
+            {"id": 3, "start": "Good night now.", "end": "Missing sentence."},
+        ]
+    }
+    result_stt_repeated = create_result_stt(
+        text="Here is the news for today. Rain is coming. Here is the weather for today. Good night."
+    )
+    result_llm_repeated = {
+        "sections": [
+            {"id": 1, "start": "Here is the weather for today.", "end": "Good night."},
+        ]
+    }
+
+    # act
+    result = get_timestamps_for_sections(
+        result_stt=result_stt, result_llm=result_llm, alignment_mode="approximate"
+    )
+    result_repeated = get_timestamps_for_sections(
+        result_stt=result_stt_repeated,
+        result_llm=result_llm_repeated,
+        alignment_mode="approximate",
+    )
+
+    # validate
+    assert [
+        (
+            section.get("start_time"),
+            section.get("start_confidence"),
+            section.get("end_time"),
+            section.get("end_confidence"),
+        )
+        for section in result["sections"]
+    ] == [
+        ("0:00:00", 1.0, "0:00:04.500000", 1.0),
+        ("0:00:05", 1.0, "0:00:09.500000", 0.75),
+        ("0:00:10", 0.6667, None, None),
+    ]
+    assert [
+        (
+            section.get("start_time"),
+            section.get("start_confidence"),
+            section.get("end_time"),
+            section.get("end_confidence"),
+        )
+        for section in result_repeated["sections"]
+    ] == [("0:00:09", 1.0, "0:00:16.500000", 1.0)]
+
+
+def test_word_table():
+    # init
+    result_stt = create_result_stt(text="Hello, World! Bye")
+    result_stt["recognizedPhrases"][0]["nBest"][0]["displayWords"][2] |= {
+        "offsetInTicks": 25_000_000.0,
+        "durationInTicks": 1_000_000.0,
+    }
+
+    # act
+    word_table = WordTable.from_stt_result(result_stt=result_stt)
+
+    # validate
+    assert word_table.tokens == ["hello", "world", "bye"]
+    assert word_table.offsets_in_ticks.tolist() == [0, 10_000_000, 25_000_000]
+    assert word_table.durations_in_ticks.tolist() == [5_000_000] * 2 + [1_000_000]
+    assert str(word_table.get_end_time(position=2)) == "0:00:02.600000"
+    assert word_table.get_word_index() == {"hello": [0], "world": [1], "bye": [2]}
+    assert (
+        result_stt["recognizedPhrases"][0]["nBest"][0]["displayWords"][0]["displayText"]
+        == "Hello,"
+    )
+
+
+def test_read_stt_result():
+    # init
+    result_stt = SpeechEmulator(audio_duration=120.0).create_stt_result(
+        source="https://mystorage/audio.wav", locale="de-DE"
+    )
+    for recognized_phrase in result_stt["recognizedPhrases"]:
+        recognized_phrase["nBest"].append(
+            {
+                "display": "Alternative",
+                "displayWords": [
+                    {"displayText": "Alternative", "offset": "PT0S", "duration": "PT1S"}
+                ],
+            }
+        )
+    data = json.dumps(result_stt).encode("utf-8")
+
+    async def iter_chunks():
+        for index in range(0, len(data), 100):
+            yield data[index : index + 100]
+
+    # act
+    transcript, locale, word_table = asyncio.run(read_stt_result(chunks=iter_chunks()))
+
+    # validate
+    expected_word_table = WordTable.from_stt_result(result_stt=result_stt)
+    assert transcript == get_transcript(result_stt=result_stt)
+    assert locale == get_locale(result_stt=result_stt) == "de-DE"
+    assert word_table.tokens == expected_word_table.tokens
+    assert (
+        word_table.offsets_in_ticks.tolist()
+        == expected_word_table.offsets_in_ticks.tolist()
+    )
+    assert (
+        word_table.durations_in_ticks.tolist()
+        == expected_word_table.durations_in_ticks.tolist()
+    )
+
+
+def test_word_table_sentences():
+    # init
+    result_stt = create_result_stt(text='Good evening. "Rain is coming!" Next')
+    result_stt["recognizedPhrases"].append(
+        create_result_stt(text="Good night")["recognizedPhrases"][0]
+    )
+
+    # act
+    word_table = WordTable.from_stt_result(result_stt=result_stt)
+
+    # validate
+    assert word_table.get_sentence_count() == 4
+    assert word_table.get_sentence_span(sentence_id=2) == (2, 5)
+    assert word_table.get_numbered_transcript() == "\n".join(
+        [
+            "[1] Good evening.",
+            '[2] "Rain is coming!"',
+            "[3] Next",
+            "[4] Good night",
+        ]
+    )
+    with pytest.raises(ValueError):
+        word_table.get_sentence_span(sentence_id=5)
+
+
+def test_get_timestamps_for_sentence_sections():
+    # init
+    word_table = WordTable.from_stt_result(
+        result_stt=create_result_stt(
+            text="Good evening. Rain is coming. The match ended. Good night."
+        )
+    )
+    result_llm = {
+        "sections": [
+            {"id": 1, "start_sentence_id": 1, "end_sentence_id": 2},
+            {"id": 2, "start_sentence_id": 3, "end_sentence_id": 4},
+            {"id": 3, "start_sentence_id": 4, "end_sentence_id": 3},
+            {"id": 4, "start_sentence_id": 5, "end_sentence_id": 5},
+        ]
+    }
+
+    # act
+    result = get_timestamps_for_sentence_sections(
+        word_table=word_table, result_llm=result_llm
+    )
+
+    # validate
+    assert [
+        (
+            section.get("start"),
+            section.get("start_time"),
+            section.get("end"),
+            section.get("end_time"),
+        )
+        for section in result["sections"]
+    ] == [
+        ("Good evening.", "0:00:00", "Rain is coming.", "0:00:04.500000"),
+        ("The match ended.", "0:00:05", "Good night.", "0:00:09.500000"),
+        ("Good night.", "0:00:08", None, None),
+        (None, None, None, None),
+    ]
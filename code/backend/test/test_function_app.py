@@ -0,0 +1,61 @@
+import asyncio
+import importlib
+
+import httpx
+import pytest
+from shared.http import http_client_registry
+from shared.storage import storage_backend_registry
+from shared.utils import upload_string
+
+
+@pytest.fixture
+def function_app(tmp_path, monkeypatch):
+    # Settings of the function app are read on import
+    for name in [
+        "MANAGED_IDENTITY_CLIENT_ID",
+        "MAIN_CONTENT_LANGUAGE",
+        "AZURE_AI_SPEECH_RESOURCE_ID",
+        "AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY",
+        "AZURE_OPEN_AI_API_VERSION",
+        "AZURE_OPEN_AI_DEPLOYMENT_NAME",
+    ]:
+        monkeypatch.setenv(name, "myvalue")
+    monkeypatch.setenv("AZURE_AI_SPEECH_BASE_URL", "https://myspeech")
+    monkeypatch.setenv("AZURE_OPEN_AI_BASE_URL", "https://myopenai")
+    function_app = importlib.import_module("function_app")
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    yield function_app
+    storage_backend_registry.configure(storage_backend="azure")
+
+
+def test_close_pooled_clients(function_app):
+    # init
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    http_client = http_client_registry.get_http_client(
+        base_url="https://myservice",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+    )
+    loop.run_until_complete(http_client.get("https://myservice/"))
+    loop.run_until_complete(
+        upload_string(
+            data="mydata",
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.txt",
+        )
+    )
+
+    # act
+    try:
+        function_app.close_pooled_clients()
+        storage_metrics = storage_backend_registry.get_metrics()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    # validate
+    assert http_client.is_closed
+    assert storage_metrics.clients == 0
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from azure.core.credentials import AccessToken
+from shared.auth import TokenCache
+
+
+class Credential:
+    def __init__(self, expires_in: float):
+        self.expires_in = expires_in
+        self.calls = 0
+
+    async def get_token(self, scope: str) -> AccessToken:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return AccessToken(
+            token=f"{scope}-{self.calls}", expires_on=int(time.time() + self.expires_in)
+        )
+
+
+def test_token_cache():
+    # init
+    credential = Credential(expires_in=3600)
+    token_cache = TokenCache(
+        get_credential=lambda managed_identity_client_id: credential
+    )
+
+    async def act():
+        tokens = await asyncio.gather(
+            *[token_cache.get_token(scope="myscope") for _ in range(5)]
+        )
+        tokens.append(await token_cache.get_token(scope="myotherscope"))
+        return tokens
+
+    # act
+    result = asyncio.run(act())
+
+    # validate
+    assert [token.token for token in result] == ["myscope-1"] * 5 + ["myotherscope-2"]
+    assert credential.calls == 2
+    assert token_cache.get_metrics().hits == 4
+    assert token_cache.get_metrics().refreshes == 2
+    assert token_cache.get_metrics().refresh_duration_in_seconds >= 0.02
+
+
+def test_token_cache_refresh_before_expiry():
+    # init
+    credential = Credential(expires_in=60)
+    token_cache = TokenCache(
+        get_credential=lambda managed_identity_client_id: credential,
+        refresh_margin_in_seconds=300,
+    )
+
+    async def act():
+        return [await token_cache.get_token(scope="myscope") for _ in range(3)]
+
+    # act
+    result = asyncio.run(act())
+
+    # validate
+    assert [token.token for token in result] == ["myscope-1", "myscope-2", "myscope-3"]
+    assert credential.calls == 3
@@ -0,0 +1,48 @@
+import pytest
+from shared.duration import format_duration, parse_duration
+
+
+@pytest.mark.parametrize(
+    "duration, ticks",
+    [
+        ("PT0S", 0),
+        ("PT0.07S", 700_000),
+        ("PT24.01S", 240_100_000),
+        ("PT1M38.32S", 983_200_000),
+        ("PT1H0M5.5S", 36_055_000_000),
+    ],
+)
+def test_parse_and_format_duration(duration, ticks):
+    # act
+    result_parse = parse_duration(duration=duration)
+    result_format = format_duration(ticks=ticks)
+
+    # validate
+    assert result_parse == ticks
+    assert result_format == duration
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [
+        ("PT24.01S", 240_100_000),
+        ("PT1M38.32S", 983_200_000),
+        ("PT2H", 72_000_000_000),
+        ("PT1H0.5S", 36_005_000_000),
+        ("P1DT1S", 864_010_000_000),
+        ("PT0S", 0),
+    ],
+)
+def test_parse_duration(duration, expected):
+    # act
+    ticks = parse_duration(duration=duration)
+
+    # validate
+    assert ticks == expected
+
+
+@pytest.mark.parametrize("duration", ["", "PT", "1M", "PT1.2.3S", "PTS", "PT1", "P1M"])
+def test_parse_duration_invalid(duration):
+    # act & validate
+    with pytest.raises(ValueError):
+        parse_duration(duration=duration)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from shared.executor import MediaExecutionPool
+
+
+def multiply(a: int, b: int) -> int:
+    return a * b
+
+
+def sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+def test_media_execution_pool():
+    # init
+    media_execution_pool = MediaExecutionPool(max_workers=2)
+
+    async def act():
+        return await asyncio.gather(
+            media_execution_pool.run(multiply, 6, b=7),
+            media_execution_pool.run(sleep, seconds=0.1),
+            media_execution_pool.run(sleep, seconds=0.1),
+        )
+
+    # act
+    try:
+        result = asyncio.run(act())
+        with pytest.raises(ValueError):
+            asyncio.run(media_execution_pool.run(fail, message="failed"))
+        metrics = media_execution_pool.get_metrics()
+    finally:
+        media_execution_pool.shutdown()
+
+    # validate
+    assert result == [42, 0.1, 0.1]
+    assert metrics.submitted == 4
+    assert metrics.completed == 3
+    assert metrics.failed == 1
+    assert metrics.queue_depth == 0
+    assert metrics.busy_time_in_seconds >= 0.2
+
+
+def test_media_execution_pool_timeout():
+    # init
+    media_execution_pool = MediaExecutionPool(max_workers=2)
+
+    async def act():
+        return await asyncio.gather(
+            media_execution_pool.run(sleep, seconds=30, timeout=1.0),
+            media_execution_pool.run(sleep, seconds=1.5),
+            return_exceptions=True,
+        )
+
+    # act
+    try:
+        start_time = time.perf_counter()
+        result = asyncio.run(act())
+        duration_in_seconds = time.perf_counter() - start_time
+        result_after_recycle = asyncio.run(media_execution_pool.run(multiply, 2, 3))
+        metrics = media_execution_pool.get_metrics()
+    finally:
+        media_execution_pool.shutdown()
+
+    # validate
+    assert isinstance(result[0], TimeoutError)
+    assert result[1] == 1.5
+    assert duration_in_seconds < 10
+    assert result_after_recycle == 6
+    assert metrics.timed_out == 1
+    assert metrics.recycled == 1
+    assert metrics.completed == 2
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from shared.http import HttpClientRegistry
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok" if self.path == "/ok" else b"not found"
+        self.send_response(200 if self.path == "/ok" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_client_registry():
+    # init
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    http_client_registry = HttpClientRegistry()
+
+    async def act():
+        responses = []
+        for path in ["/ok", "/ok", "/ok", "/missing"]:
+            http_client = http_client_registry.get_http_client(base_url=base_url)
+            responses.append(await http_client.get(f"{base_url}{path}"))
+        await http_client_registry.close()
+        return responses
+
+    # act
+    try:
+        responses = asyncio.run(act())
+    finally:
+        server.shutdown()
+    metrics = http_client_registry.get_metrics(base_url=base_url)
+
+    # validate
+    assert [response.status_code for response in responses] == [200, 200, 200, 404]
+    assert metrics.requests == 4
+    assert metrics.errors == 1
+    assert metrics.connections_opened == 1
+    assert metrics.connections_reused == 3
+    assert sum(metrics.latency_histogram.values()) == 4
+    assert http_client_registry.get_metrics(base_url="http://unknown").requests == 0
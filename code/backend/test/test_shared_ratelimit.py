@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from shared.ratelimit import (
+    RateGovernedAsyncTransport,
+    RateGovernedTransport,
+    RateGovernor,
+    get_retry_after,
+)
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, None),
+        ({"Retry-After": "3"}, 3.0),
+        ({"retry-after-ms": "250", "Retry-After": "3"}, 0.25),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"Retry-After": "invalid"}, None),
+    ],
+)
+def test_get_retry_after(headers, expected):
+    # act
+    retry_after = get_retry_after(response=httpx.Response(429, headers=headers))
+
+    # validate
+    assert retry_after == expected
+
+
+def test_rate_governed_async_transport():
+    # init
+    status_codes = [429, 503, 200, 200]
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0), headers={"Retry-After": "0.1"})
+
+    rate_governor = RateGovernor(
+        name="myservice", requests_per_second=100, max_concurrency=8
+    )
+    transport = RateGovernedAsyncTransport(
+        rate_governor=rate_governor,
+        transport=httpx.MockTransport(handle_request),
+    )
+
+    async def act():
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            start_time = time.perf_counter()
+            response = await http_client.get("https://myservice/")
+            return response, time.perf_counter() - start_time
+
+    # act
+    response, duration = asyncio.run(act())
+    metrics = rate_governor.get_metrics()
+
+    # validate
+    assert response.status_code == 200
+    assert duration >= 0.2
+    assert metrics.requests == 3
+    assert metrics.throttled == 2
+    assert metrics.in_flight == 0
+    assert metrics.concurrency_limit < 8
+
+
+def test_rate_governed_transport_token_bucket():
+    # init
+    rate_governor = RateGovernor(name="myservice", requests_per_second=20, burst=1)
+    transport = RateGovernedTransport(
+        rate_governor=rate_governor,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+    )
+
+    # act
+    with httpx.Client(transport=transport) as http_client:
+        start_time = time.perf_counter()
+        responses = [http_client.get("https://myservice/") for _ in range(5)]
+        duration = time.perf_counter() - start_time
+    metrics = rate_governor.get_metrics()
+
+    # validate
+    assert [response.status_code for response in responses] == [200] * 5
+    assert duration >= 0.19
+    assert metrics.requests == 5
+    assert metrics.throttled == 0
@@ -0,0 +1,174 @@
+import asyncio
+import gzip
+import re
+
+import pytest
+from aiohttp import web
+from azure.core.exceptions import (
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+)
+from azure.storage.blob.aio import BlobServiceClient
+from shared.storage import (
+    AzureStorageBackend,
+    LocalStorageBackend,
+    StorageBackendRegistry,
+)
+from shared.utils import iter_decompressed_chunks
+
+
+def test_storage_backend_registry():
+    # init
+    registry = StorageBackendRegistry(storage_backend="azure")
+    storage_domain_name = "mystorage.blob.core.windows.net"
+
+    # act
+    backend_1 = registry.get_storage_backend(storage_domain_name=storage_domain_name)
+    backend_2 = registry.get_storage_backend(storage_domain_name=storage_domain_name)
+    backend_3 = registry.get_storage_backend(
+        storage_domain_name=storage_domain_name, managed_identity_client_id="myid"
+    )
+    metrics = registry.get_metrics()
+    asyncio.run(registry.close())
+
+    # validate
+    assert backend_1 is backend_2
+    assert backend_1 is not backend_3
+    assert metrics.hits == 1
+    assert metrics.misses == 2
+    assert metrics.credentials == 2
+    assert registry.get_metrics().clients == 0
+
+
+def test_local_storage_backend_etag_and_lease(tmp_path):
+    # init
+    backend = LocalStorageBackend(
+        root_directory=str(tmp_path), storage_domain_name="mystorage"
+    )
+
+    async def act():
+        await backend.upload_blob("mycontainer", "myfile.txt", data=b"hello")
+        properties_1 = await backend.get_blob_properties("mycontainer", "myfile.txt")
+        await backend.upload_blob("mycontainer", "myfile.txt", data=b"hello world")
+        properties_2 = await backend.get_blob_properties("mycontainer", "myfile.txt")
+        with pytest.raises(ResourceModifiedError):
+            await backend.download_blob_range(
+                "mycontainer", "myfile.txt", etag=properties_1.etag
+            )
+        data = await backend.download_blob_range(
+            "mycontainer", "myfile.txt", offset=6, length=5, etag=properties_2.etag
+        )
+
+        lease_id = await backend.acquire_lease("mycontainer", "myfile.txt")
+        with pytest.raises(ResourceExistsError):
+            await backend.acquire_lease("mycontainer", "myfile.txt")
+        with pytest.raises(ResourceModifiedError):
+            await backend.delete_blob("mycontainer", "myfile.txt")
+        await backend.delete_blob("mycontainer", "myfile.txt", lease_id=lease_id)
+        with pytest.raises(ResourceNotFoundError):
+            await backend.get_blob_properties("mycontainer", "myfile.txt")
+        return properties_1, properties_2, data
+
+    # act
+    properties_1, properties_2, data = asyncio.run(act())
+
+    # validate
+    assert properties_1.etag != properties_2.etag
+    assert properties_2.size == 11
+    assert properties_2.creation_time == properties_1.creation_time
+    assert data == b"world"
+
+
+def test_local_storage_backend_async_copy(tmp_path):
+    # init
+    backend = LocalStorageBackend(
+        root_directory=str(tmp_path), storage_domain_name="mystorage"
+    )
+
+    async def act():
+        await backend.upload_blob("source", "myfile.txt", data=b"hello")
+        copy_properties = await backend.start_copy_from_url(
+            "sink",
+            "myfile.txt",
+            source_url=backend.get_blob_url("source", "myfile.txt"),
+            requires_sync=False,
+        )
+        while (
+            await backend.get_blob_properties("sink", "myfile.txt")
+        ).copy.status == "pending":
+            await asyncio.sleep(0.01)
+        properties = await backend.get_blob_properties("sink", "myfile.txt")
+        data = await backend.download_blob_range("sink", "myfile.txt")
+        return copy_properties, properties, data
+
+    # act
+    copy_properties, properties, data = asyncio.run(act())
+
+    # validate
+    assert copy_properties["copy_status"] == "pending"
+    assert properties.copy.status == "success"
+    assert properties.copy.progress == "5/5"
+    assert data == b"hello"
+
+
+def test_azure_storage_backend_compressed_ranges():
+    # init
+    data = b"hello world " * 10000
+    data_compressed = gzip.compress(data)
+
+    async def get_blob(request: web.Request) -> web.Response:
+        start, end = map(
+            int,
+            re.fullmatch(r"bytes=(\d+)-(\d+)", request.headers["x-ms-range"]).groups(),
+        )
+        end = min(end, len(data_compressed) - 1)
+        return web.Response(
+            status=206,
+            body=data_compressed[start : end + 1],
+            headers={
+                "Content-Range": f"bytes {start}-{end}/{len(data_compressed)}",
+                "Content-Encoding": "gzip",
+                "ETag": '"0x1"',
+                "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                "x-ms-blob-type": "BlockBlob",
+            },
+        )
+
+    async def act():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", get_blob)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        backend = AzureStorageBackend(storage_domain_name="mystorage", credential=None)
+        backend._AzureStorageBackend__blob_service_client = BlobServiceClient(
+            account_url=f"http://{host}:{port}/mystorage"
+        )
+        try:
+            chunks = [
+                await backend.download_blob_range(
+                    "mycontainer", "myfile.json", offset=offset, length=100
+                )
+                for offset in range(0, len(data_compressed), 100)
+            ]
+        finally:
+            await backend.close()
+            await runner.cleanup()
+
+        async def iter_chunks():
+            for chunk in chunks:
+                yield chunk
+
+        return chunks, b"".join(
+            [chunk async for chunk in iter_decompressed_chunks(chunks=iter_chunks())]
+        )
+
+    # act
+    chunks, result = asyncio.run(act())
+
+    # validate
+    assert b"".join(chunks) == data_compressed
+    assert result == data
@@ -1,5 +1,21 @@
+import asyncio
+import os
+
 import pytest
-from shared.utils import get_guid
+from shared.storage import LocalStorageBackend, storage_backend_registry
+from shared.utils import (
+    compress_data,
+    copy_blob,
+    download_blob,
+    get_blob_properties,
+    get_guid,
+    iter_blob_chunks,
+    iter_decompressed_chunks,
+    list_blobs,
+    load_blob,
+    upload_blob,
+    upload_string,
+)
 
 
 def test_uuid():
@@ -14,3 +30,180 @@ def test_uuid():
 
     # validate
     assert uuid_1 == uuid_2
+
+
+def test_download_and_upload_blob_with_local_storage_backend(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path / "storage")
+    )
+    data = os.urandom(1_000_003)
+    source_file_path = str(tmp_path / "source.bin")
+    with open(source_file_path, mode="wb") as file:
+        file.write(data)
+
+    async def act():
+        await upload_blob(
+            file_path=source_file_path,
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfolder/myfile.bin",
+            block_size=100_000,
+            max_concurrency=3,
+        )
+        await copy_blob(
+            storage_domain_name="mystorage",
+            source_storage_container_name="mycontainer",
+            source_storage_blob_name="myfolder/myfile.bin",
+            sink_storage_container_name="mysinkcontainer",
+            sink_storage_blob_name="myfile.bin",
+            delete_source=True,
+            sync_copy_size_threshold=0,
+            poll_interval=0.01,
+        )
+        return await download_blob(
+            file_path=str(tmp_path / "download" / "myfile.bin"),
+            storage_domain_name="mystorage",
+            storage_container_name="mysinkcontainer",
+            storage_blob_name="myfile.bin",
+            chunk_size=65_536,
+            max_concurrency=4,
+        )
+
+    # act
+    try:
+        result_download_blob = asyncio.run(act())
+        result_list_blobs = asyncio.run(
+            list_blobs(
+                storage_domain_name="mystorage", storage_container_name="mycontainer"
+            )
+        )
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    with open(result_download_blob, mode="rb") as file:
+        assert file.read() == data
+    assert result_list_blobs == []
+
+
+def test_iter_blob_chunks_early_exit(tmp_path, monkeypatch):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    data = "0123456789" * 10_000
+    download_blob_range = LocalStorageBackend.download_blob_range
+
+    async def download_blob_range_slow(self, offset: int, **kwargs) -> bytes:
+        if offset > 0:
+            await asyncio.sleep(10)
+        return await download_blob_range(self, offset=offset, **kwargs)
+
+    monkeypatch.setattr(
+        LocalStorageBackend, "download_blob_range", download_blob_range_slow
+    )
+
+    async def act():
+        await upload_string(
+            data=data,
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.bin",
+        )
+        chunks = iter_blob_chunks(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.bin",
+            chunk_size=1_000,
+            max_concurrency=8,
+        )
+        chunk = await anext(chunks)
+        await chunks.aclose()
+        return chunk, asyncio.all_tasks() - {asyncio.current_task()}
+
+    # act
+    try:
+        chunk, pending_tasks = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    assert chunk == data[:1_000].encode()
+    assert pending_tasks == set()
+
+
+@pytest.mark.parametrize("content_encoding", [None, "gzip", "zstd"])
+def test_upload_string_and_load_blob_with_compression(tmp_path, content_encoding):
+    # init
+    if content_encoding == "zstd":
+        pytest.importorskip("zstandard")
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    data = '{"text": "' + "hello world " * 1000 + '"}'
+
+    async def act():
+        await upload_string(
+            data=data,
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.json",
+            content_encoding=content_encoding,
+        )
+        blob_properties = await get_blob_properties(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.json",
+        )
+        result_load_blob = await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="myfile.json",
+        )
+        return blob_properties, result_load_blob
+
+    # act
+    try:
+        blob_properties, result_load_blob = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    assert result_load_blob == data
+    assert blob_properties.content_settings.content_encoding == content_encoding
+    if content_encoding:
+        assert blob_properties.size < len(data) / 10
+
+
+@pytest.mark.parametrize("content_encoding", [None, "gzip", "zstd"])
+def test_iter_decompressed_chunks(content_encoding):
+    # init
+    if content_encoding == "zstd":
+        pytest.importorskip("zstandard")
+    data = b"hello world " * 10000
+    data_compressed = (
+        compress_data(data=data, content_encoding=content_encoding)
+        if content_encoding
+        else data
+    )
+
+    async def iter_chunks():
+        for index in range(0, len(data_compressed), 1000):
+            yield data_compressed[index : index + 1000]
+
+    async def act():
+        return [
+            chunk
+            async for chunk in iter_decompressed_chunks(
+                chunks=iter_chunks(), max_chunk_size=4096
+            )
+        ]
+
+    # act
+    chunks = asyncio.run(act())
+
+    # validate
+    assert b"".join(chunks) == data
+    if content_encoding == "gzip":
+        assert max(len(chunk) for chunk in chunks) <= 4096
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from aiohttp import web
+from shared.duration import get_ticks
+from tools.speech_emulator import SpeechEmulator
+from videoupload.speech import SpeechClient
+
+
+async def run_speech_emulator(speech_emulator: SpeechEmulator, act):
+    runner = web.AppRunner(speech_emulator.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        speech_client = SpeechClient(
+            azure_ai_speech_resource_id="myresource",
+            azure_ai_speech_base_url=f"http://{host}:{port}",
+            azure_ai_speech_api_version="2024-11-15",
+            azure_ai_speech_primary_access_key="mykey",
+        )
+        return await act(speech_client)
+    finally:
+        await runner.cleanup()
+
+
+def test_speech_emulator():
+    # init
+    speech_emulator = SpeechEmulator(processing_delay=0.2, audio_duration=30.0)
+
+    async def act(speech_client: SpeechClient):
+        transcription_id = await speech_client.create_batch_transcription_job(
+            guid="myguid",
+            blob_urls=["https://mystorage/audio0.wav", "https://mystorage/audio1.wav"],
+            locale="en-US",
+        )
+        statuses = [
+            await speech_client.get_transcription_job_status(
+                transcription_id=transcription_id
+            )
+        ]
+        await asyncio.sleep(0.3)
+        statuses.append(
+            await speech_client.get_transcription_job_status(
+                transcription_id=transcription_id
+            )
+        )
+        files = await speech_client.get_transcription_job_files(
+            transcription_id=transcription_id
+        )
+        async with httpx.AsyncClient() as http_client:
+            response = await http_client.get(files[1])
+        return statuses, files, json.loads(response.content)
+
+    # act
+    statuses, files, result_stt = asyncio.run(
+        run_speech_emulator(speech_emulator=speech_emulator, act=act)
+    )
+
+    # validate
+    assert statuses[0] in ["NotStarted", "Running"]
+    assert statuses[1] == "Succeeded"
+    assert sorted(files) == [0, 1]
+    assert result_stt["source"] == "https://mystorage/audio1.wav"
+    assert result_stt["recognizedPhrases"]
+    assert result_stt["combinedRecognizedPhrases"][0]["display"] == " ".join(
+        phrase["nBest"][0]["display"] for phrase in result_stt["recognizedPhrases"]
+    )
+    for phrase in result_stt["recognizedPhrases"]:
+        display_words = phrase["nBest"][0]["displayWords"]
+        assert get_ticks(display_words[0], "offset") == get_ticks(phrase, "offset")
+        assert get_ticks(display_words[-1], "offset") + get_ticks(
+            display_words[-1], "duration"
+        ) <= get_ticks(result_stt, "duration")
+
+
+def test_speech_emulator_throttling():
+    # init
+    speech_emulator = SpeechEmulator(throttling_rate=1.0, retry_after=0)
+
+    async def act(speech_client: SpeechClient):
+        with pytest.raises(httpx.RequestError, match="429"):
+            await speech_client.create_transcription_job(
+                guid="myguid", blob_url="https://mystorage/audio.wav", locale="en-US"
+            )
+
+        return speech_client.get_rate_governor_metrics()
+
+    # act
+    metrics = asyncio.run(run_speech_emulator(speech_emulator=speech_emulator, act=act))
+
+    # validate
+    assert metrics.requests == 6
+    assert metrics.throttled == 6
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from shared.storage import storage_backend_registry
+from shared.utils import load_blob
+from videoupload.dedup import DedupIndex
+
+
+def test_dedup_index(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    dedup_index = DedupIndex(
+        storage_domain_name="mystorage", storage_container_name="mycontainer"
+    )
+    metrics_before = dedup_index.get_metrics()
+
+    async def act():
+        guid_1 = await dedup_index.get_guid(content_md5="abc")
+        await dedup_index.add_guid(content_md5="abc", guid="myguid")
+        guid_2 = await dedup_index.get_guid(content_md5="abc")
+        alias_storage_blob_name = await dedup_index.add_alias(
+            guid="mynewguid",
+            prior_guid=guid_2,
+            content_md5="abc",
+            storage_container_name="myresultcontainer",
+        )
+        alias = await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="myresultcontainer",
+            storage_blob_name=alias_storage_blob_name,
+        )
+        return guid_1, guid_2, json.loads(alias)
+
+    # act
+    try:
+        guid_1, guid_2, alias = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+    metrics_after = dedup_index.get_metrics()
+
+    # validate
+    assert guid_1 is None
+    assert guid_2 == "myguid"
+    assert alias["guid"] == "mynewguid"
+    assert alias["prior_guid"] == "myguid"
+    assert metrics_after.hits == metrics_before.hits + 1
+    assert metrics_after.misses == metrics_before.misses + 1
@@ -0,0 +1,210 @@
+import asyncio
+import importlib
+import json
+from datetime import timedelta
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from shared.storage import storage_backend_registry
+from shared.utils import list_blobs, load_blob, upload_string
+from videoupload.dedup import DedupIndex
+from videoupload.jobs import TranscriptionJobFailedError, TranscriptionJobStore
+from videoupload.models import SpeechRegion, TranscriptionReference
+
+
+class SpeechClient:
+    def __init__(self, statuses, files):
+        self.statuses = statuses
+        self.files = files
+
+    async def get_transcription_job_status(self, transcription_id: str) -> str:
+        return self.statuses[transcription_id]
+
+    async def get_transcription_job_files(self, transcription_id: str):
+        return self.files.get(transcription_id, {})
+
+    def get_metrics(self):
+        return None
+
+    def get_rate_governor_metrics(self):
+        return None
+
+
+@pytest.fixture
+def function(tmp_path, monkeypatch):
+    # Settings of the function app are read on import
+    for name in [
+        "MANAGED_IDENTITY_CLIENT_ID",
+        "MAIN_CONTENT_LANGUAGE",
+        "AZURE_AI_SPEECH_RESOURCE_ID",
+        "AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY",
+        "AZURE_OPEN_AI_API_VERSION",
+        "AZURE_OPEN_AI_DEPLOYMENT_NAME",
+    ]:
+        monkeypatch.setenv(name, "myvalue")
+    monkeypatch.setenv("AZURE_AI_SPEECH_BASE_URL", "https://myspeech")
+    monkeypatch.setenv("AZURE_OPEN_AI_BASE_URL", "https://myopenai")
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    yield importlib.import_module("videoupload.function")
+    storage_backend_registry.configure(storage_backend="azure")
+
+
+def create_job(transcription_job_store: TranscriptionJobStore, guid: str):
+    return transcription_job_store.create_job(
+        guid=guid,
+        storage_domain_name="mystorage",
+        source_url="https://mystorage/audio.wav",
+        content_md5=f"{guid}-md5",
+        transcriptions=[
+            TranscriptionReference(transcription_id=f"{guid}-id", content_index=0)
+        ],
+        audio_segments=[],
+        speech_regions=[
+            SpeechRegion(
+                original_start_in_ticks=10_000_000,
+                trimmed_start_in_ticks=0,
+                duration_in_ticks=100_000_000,
+            )
+        ],
+        intermediate_storage_blob_names=[f"{guid}/audio.speech.wav"],
+    )
+
+
+def test_complete_transcription_job(function, monkeypatch):
+    # init
+    transcription_job_store = TranscriptionJobStore(
+        storage_domain_name="mystorage",
+        storage_container_name="internal-videos",
+        initial_check_interval=0,
+    )
+    job = create_job(transcription_job_store=transcription_job_store, guid="myguid")
+    speech_client = SpeechClient(
+        statuses={"myguid-id": "Succeeded"},
+        files={"myguid-id": {0: "https://myspeech/files/0"}},
+    )
+    result_stt = {
+        "duration": "PT5S",
+        "recognizedPhrases": [
+            {
+                "offset": "PT1S",
+                "duration": "PT1S",
+                "nBest": [
+                    {
+                        "display": "Hello.",
+                        "displayWords": [
+                            {
+                                "displayText": "Hello.",
+                                "offset": "PT1S",
+                                "duration": "PT1S",
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+    async def load_url(url: str) -> bytes:
+        return json.dumps(result_stt).encode()
+
+    monkeypatch.setattr(function, "load_url", load_url)
+
+    async def act():
+        await transcription_job_store.save_job(job=job)
+        await upload_string(
+            data="audio",
+            storage_domain_name="mystorage",
+            storage_container_name="internal-videos",
+            storage_blob_name="myguid/audio.speech.wav",
+        )
+        result = await function.complete_transcription_job(
+            job=job,
+            transcription_job_store=transcription_job_store,
+            speech_client=speech_client,
+        )
+        result_load_blob = await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="internal-analysis-speech",
+            storage_blob_name="myguid/speech0.json",
+        )
+        with pytest.raises(ResourceNotFoundError):
+            await load_blob(
+                storage_domain_name="mystorage",
+                storage_container_name="internal-videos",
+                storage_blob_name="myguid/audio.speech.wav",
+            )
+        prior_guid = await DedupIndex(
+            storage_domain_name="mystorage", storage_container_name="internal-videos"
+        ).get_guid(content_md5="myguid-md5")
+        jobs = await transcription_job_store.list_due_jobs()
+        return result, json.loads(result_load_blob), prior_guid, jobs
+
+    # act
+    result, result_stt_remapped, prior_guid, jobs = asyncio.run(act())
+
+    # validate
+    assert result is True
+    assert result_stt_remapped["recognizedPhrases"][0]["offset"] == "PT2S"
+    assert prior_guid == "myguid"
+    assert jobs == []
+
+
+def test_complete_transcription_jobs_with_failures(function):
+    # init
+    transcription_job_store = TranscriptionJobStore(
+        storage_domain_name="mystorage",
+        storage_container_name="internal-videos",
+        initial_check_interval=0,
+    )
+    jobs = [
+        create_job(transcription_job_store=transcription_job_store, guid=guid)
+        for guid in ["running", "failed", "retry", "expired"]
+    ]
+    jobs[3] = jobs[3].model_copy(
+        update={"created_time": jobs[3].created_time - timedelta(days=1)}
+    )
+    speech_client = SpeechClient(
+        statuses={
+            "running-id": "Running",
+            "failed-id": "Failed",
+            "retry-id": "Succeeded",
+            "expired-id": "Succeeded",
+        },
+        files={},
+    )
+
+    async def act():
+        for job in jobs:
+            await transcription_job_store.save_job(job=job)
+        with pytest.raises(TranscriptionJobFailedError):
+            await function.complete_transcription_job(
+                job=jobs[1],
+                transcription_job_store=transcription_job_store,
+                speech_client=speech_client,
+            )
+        with pytest.raises(Exception, match="failed") as exception_info:
+            await function.complete_transcription_jobs(
+                transcription_job_store=transcription_job_store,
+                speech_client=speech_client,
+            )
+        errors = await list_blobs(
+            storage_domain_name="mystorage",
+            storage_container_name="results-newsvideos",
+        )
+        remaining_jobs = await transcription_job_store.list_due_jobs(
+            now=jobs[0].created_time + timedelta(days=1)
+        )
+        return str(exception_info.value), errors, remaining_jobs
+
+    # act
+    message, errors, remaining_jobs = asyncio.run(act())
+
+    # validate
+    assert message == "Completion of runs ['expired', 'retry'] failed."
+    assert sorted(errors) == ["expired/error.json", "failed/error.json"]
+    assert [(job.guid, job.check_count) for job in remaining_jobs] == [
+        ("running", 1),
+        ("retry", 1),
+    ]
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from shared.storage import storage_backend_registry
+from videoupload.jobs import TranscriptionJobStore
+from videoupload.models import TranscriptionReference
+
+
+def test_transcription_job_store(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    transcription_job_store = TranscriptionJobStore(
+        storage_domain_name="mystorage",
+        storage_container_name="mycontainer",
+        initial_check_interval=10.0,
+        max_check_interval=60.0,
+    )
+
+    def create_job(guid: str):
+        return transcription_job_store.create_job(
+            guid=guid,
+            storage_domain_name="mystorage",
+            source_url=f"https://mystorage/mycontainer/{guid}/audio.wav",
+            content_md5=None,
+            transcriptions=[
+                TranscriptionReference(
+                    transcription_id=f"{guid}-transcription", content_index=0
+                )
+            ],
+            audio_segments=[],
+            speech_regions=None,
+            intermediate_storage_blob_names=[],
+        )
+
+    async def act():
+        job_1 = create_job(guid="myguid1")
+        job_2 = create_job(guid="myguid2")
+        await transcription_job_store.save_job(job=job_1)
+        await transcription_job_store.save_job(job=job_2)
+        now = datetime.now(tz=timezone.utc)
+        due_jobs_now = await transcription_job_store.list_due_jobs(now=now)
+        due_jobs_later = await transcription_job_store.list_due_jobs(
+            now=now + timedelta(seconds=11)
+        )
+        rescheduled_job = await transcription_job_store.reschedule_job(job=job_1)
+        await transcription_job_store.delete_job(job=job_2)
+        due_jobs_final = await transcription_job_store.list_due_jobs(
+            now=now + timedelta(seconds=11)
+        )
+        return due_jobs_now, due_jobs_later, rescheduled_job, due_jobs_final
+
+    # act
+    try:
+        due_jobs_now, due_jobs_later, rescheduled_job, due_jobs_final = asyncio.run(
+            act()
+        )
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    assert due_jobs_now == []
+    assert [job.guid for job in due_jobs_later] == ["myguid1", "myguid2"]
+    assert rescheduled_job.check_count == 1
+    assert due_jobs_final == []
+    assert [
+        transcription_job_store.get_check_interval(check_count=check_count)
+        for check_count in range(5)
+    ] == [10.0, 20.0, 40.0, 60.0, 60.0]
@@ -0,0 +1,179 @@
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+from shared.duration import format_duration
+from shared.storage import storage_backend_registry
+from shared.utils import load_blob, upload_string
+from videoupload.models import AudioSegment
+from videoupload.segmentation import create_audio_segments, merge_stt_results
+
+
+def test_create_audio_segments(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    sample_rate = 16000
+    time = np.arange(27 * sample_rate) / sample_rate
+    samples = 10000 * np.sin(2 * np.pi * 440 * time)
+    samples[(time >= 11.0) & (time < 11.5)] = 0
+    samples[(time >= 19.0) & (time < 19.5)] = 0
+    audio_file = io.BytesIO()
+    with wave.open(audio_file, "wb") as wave_file:
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(sample_rate)
+        wave_file.writeframes(samples.astype("<i2").tobytes())
+
+    async def act():
+        await upload_string(
+            data=audio_file.getvalue().decode("latin-1"),
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="guid/audio.wav",
+            encoding="latin-1",
+        )
+        audio_segments = await create_audio_segments(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="guid/audio.wav",
+            segment_duration=10.0,
+            overlap_duration=2.0,
+            silence_search_duration=4.0,
+            block_size=64 * 1024,
+        )
+        segment_files = [
+            await load_blob(
+                storage_domain_name="mystorage",
+                storage_container_name="mycontainer",
+                storage_blob_name=audio_segment.storage_blob_name,
+                encoding="latin-1",
+            )
+            for audio_segment in audio_segments
+        ]
+        return audio_segments, segment_files
+
+    # act
+    try:
+        audio_segments, segment_files = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    assert len(audio_segments) == 3
+    assert 11.0 <= audio_segments[1].keep_start_in_ticks / 10**7 < 11.5
+    assert 19.0 <= audio_segments[2].keep_start_in_ticks / 10**7 < 19.5
+    assert audio_segments[0].keep_end_in_ticks == audio_segments[1].keep_start_in_ticks
+    assert (
+        audio_segments[1].start_in_ticks
+        == audio_segments[1].keep_start_in_ticks - 10**7
+    )
+    assert audio_segments[1].storage_blob_name == "guid/audio/segment1.wav"
+    durations = []
+    for segment_file in segment_files:
+        with wave.open(io.BytesIO(segment_file.encode("latin-1")), "rb") as wave_file:
+            assert wave_file.getframerate() == sample_rate
+            durations.append(wave_file.getnframes() / sample_rate)
+    assert sum(durations) == pytest.approx(27 + 2 * 2, abs=0.01)
+
+
+def test_merge_stt_results():
+    # init
+    def get_phrase(offset: float, words: list):
+        display_words = [
+            {
+                "displayText": text,
+                "offset": format_duration(ticks=round(word_offset * 10**7)),
+                "duration": "PT0.4S",
+                "offsetInTicks": float(round(word_offset * 10**7)),
+                "durationInTicks": 4_000_000.0,
+            }
+            for text, word_offset in words
+        ]
+        return {
+            "recognitionStatus": "Success",
+            "channel": 0,
+            "offset": format_duration(ticks=round(offset * 10**7)),
+            "duration": "PT2S",
+            "offsetInTicks": float(round(offset * 10**7)),
+            "durationInTicks": 20_000_000.0,
+            "nBest": [
+                {
+                    "confidence": 0.9,
+                    "lexical": " ".join(text.lower() for text, _ in words),
+                    "display": " ".join(text for text, _ in words),
+                    "displayWords": display_words,
+                }
+            ],
+        }
+
+    audio_segments = [
+        AudioSegment(
+            index=0,
+            url="https://mystorage/segment0.wav",
+            storage_blob_name="segment0.wav",
+            start_in_ticks=0,
+            keep_start_in_ticks=0,
+            keep_end_in_ticks=100_000_000,
+        ),
+        AudioSegment(
+            index=1,
+            url="https://mystorage/segment1.wav",
+            storage_blob_name="segment1.wav",
+            start_in_ticks=90_000_000,
+            keep_start_in_ticks=100_000_000,
+            keep_end_in_ticks=2**63 - 1,
+        ),
+    ]
+    result_stts = [
+        {
+            "source": "https://mystorage/segment0.wav",
+            "timestamp": "2024-10-01T00:00:00Z",
+            "recognizedPhrases": [
+                get_phrase(offset=1.0, words=[("Good", 1.0), ("evening.", 1.5)]),
+                get_phrase(offset=8.5, words=[("Today", 8.5), ("we", 9.5)]),
+                get_phrase(offset=10.2, words=[("talk", 10.2), ("sports.", 10.6)]),
+            ],
+        },
+        {
+            "source": "https://mystorage/segment1.wav",
+            "timestamp": "2024-10-01T00:00:01Z",
+            "recognizedPhrases": [
+                get_phrase(
+                    offset=0.0, words=[("we", 0.5), ("talk", 1.2), ("sports.", 1.6)]
+                ),
+                get_phrase(offset=3.0, words=[("Goal!", 3.0)]),
+            ],
+        },
+    ]
+
+    # act
+    result = merge_stt_results(
+        result_stts=result_stts,
+        audio_segments=audio_segments,
+        source="https://mystorage/audio.wav",
+    )
+
+    # validate
+    assert result["source"] == "https://mystorage/audio.wav"
+    assert result["combinedRecognizedPhrases"] == [
+        {"channel": 0, "display": "Good evening. Today we talk sports. Goal!"}
+    ]
+    assert [item["offset"] for item in result["recognizedPhrases"]] == [
+        "PT1S",
+        "PT8.5S",
+        "PT10.2S",
+        "PT12S",
+    ]
+    assert result["recognizedPhrases"][2]["offsetInTicks"] == 102_000_000.0
+    assert result["recognizedPhrases"][1]["nBest"][0]["lexical"] == "today we"
+    assert "lexical" not in result["recognizedPhrases"][2]["nBest"][0]
+    assert result["recognizedPhrases"][2]["duration"] == "PT0.8S"
+    assert [
+        word["offset"]
+        for word in result["recognizedPhrases"][2]["nBest"][0]["displayWords"]
+    ] == ["PT10.2S", "PT10.6S"]
+    assert result["duration"] == "PT14S"
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+from shared.http import http_client_registry
+from videoupload.speech import SpeechClient
+
+
+def test_speech_client_batching():
+    # init
+    base_url = "https://mybatchspeech.cognitiveservices.azure.com"
+    submitted_content_urls = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("transcriptions:submit"):
+            submitted_content_urls.append(json.loads(request.content)["contentUrls"])
+            transcription_id = f"transcription{len(submitted_content_urls)}"
+            return httpx.Response(
+                201,
+                json={
+                    "self": f"{base_url}/speechtotext/transcriptions/{transcription_id}"
+                },
+            )
+        return httpx.Response(
+            200,
+            json={
+                "values": [
+                    {
+                        "kind": "Transcription",
+                        "name": f"contenturl_{index}.json",
+                        "links": {"contentUrl": f"{base_url}/files/{index}.json"},
+                    }
+                    for index in [1, 0]
+                ]
+                + [
+                    {
+                        "kind": "TranscriptionReport",
+                        "name": "report.json",
+                        "links": {"contentUrl": f"{base_url}/files/report.json"},
+                    }
+                ]
+            },
+        )
+
+    http_client_registry.get_http_client(
+        base_url=base_url, transport=httpx.MockTransport(handle_request)
+    )
+    speech_client = SpeechClient(
+        azure_ai_speech_resource_id="myresource",
+        azure_ai_speech_base_url=base_url,
+        azure_ai_speech_api_version="2024-11-15",
+        azure_ai_speech_primary_access_key="mykey",
+        batch_window=0.05,
+        batch_max_size=2,
+    )
+    metrics_before = speech_client.get_batch_metrics()
+
+    async def act():
+        transcriptions = await asyncio.gather(
+            *[
+                speech_client.submit_transcription(
+                    guid=f"myguid{index}",
+                    blob_url=f"https://mystorage/audio{index}.wav",
+                    locale="en-US",
+                )
+                for index in range(3)
+            ]
+        )
+        files = await speech_client.get_transcription_job_files(
+            transcription_id=transcriptions[0].transcription_id
+        )
+        return transcriptions, files
+
+    # act
+    transcriptions, files = asyncio.run(act())
+    metrics_after = speech_client.get_batch_metrics()
+
+    # validate
+    assert submitted_content_urls == [
+        ["https://mystorage/audio0.wav", "https://mystorage/audio1.wav"],
+        ["https://mystorage/audio2.wav"],
+    ]
+    assert [
+        (transcription.transcription_id, transcription.content_index)
+        for transcription in transcriptions
+    ] == [("transcription1", 0), ("transcription1", 1), ("transcription2", 0)]
+    assert files == {0: f"{base_url}/files/0.json", 1: f"{base_url}/files/1.json"}
+    assert metrics_after.batches == metrics_before.batches + 2
+    assert metrics_after.items == metrics_before.items + 3
+    assert metrics_after.max_batch_size >= 2
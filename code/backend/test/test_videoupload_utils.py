@@ -0,0 +1,226 @@
+import asyncio
+import io
+import subprocess
+import wave
+
+import imageio_ffmpeg
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from shared.storage import storage_backend_registry
+from shared.utils import iter_blob_chunks, load_blob, upload_blob
+from videoupload.utils import (
+    compact_stt_result,
+    extract_audio_from_video,
+    extract_audio_from_video_stream,
+    get_media_duration,
+    is_streamable_media,
+)
+
+
+def create_video(file_path: str, duration: int = 2, faststart: bool = False):
+    subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc=size=64x64:rate=10:duration={duration}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:sample_rate=44100:duration={duration}",
+            "-ac",
+            "2",
+            "-shortest",
+            *(["-movflags", "+faststart"] if faststart else []),
+            file_path,
+        ],
+        check=True,
+    )
+
+
+def test_extract_audio_from_video(tmp_path):
+    # init
+    video_file_path = str(tmp_path / "video.mp4")
+    create_video(file_path=video_file_path)
+
+    # act
+    result = extract_audio_from_video(
+        file_path=video_file_path, audio_file_name="audio.wav"
+    )
+
+    # validate
+    assert result == str(tmp_path / "audio.wav")
+    with wave.open(result, "rb") as audio_file:
+        assert audio_file.getframerate() == 16000
+        assert audio_file.getnchannels() == 1
+        assert audio_file.getsampwidth() == 2
+        assert abs(audio_file.getnframes() / 16000 - 2.0) < 0.1
+
+
+def test_is_streamable_media(tmp_path):
+    # init
+    create_video(file_path=str(tmp_path / "video.mp4"))
+    create_video(file_path=str(tmp_path / "video_faststart.mp4"), faststart=True)
+
+    # act
+    result = is_streamable_media(
+        data=(tmp_path / "video.mp4").read_bytes()[:1024], file_type="mp4"
+    )
+    result_faststart = is_streamable_media(
+        data=(tmp_path / "video_faststart.mp4").read_bytes()[:1024], file_type="MP4"
+    )
+
+    # validate
+    assert result is False
+    assert result_faststart is True
+    assert is_streamable_media(data=b"", file_type="ts") is True
+
+
+def test_extract_audio_from_video_stream(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    video_file_path = str(tmp_path / "video.mp4")
+    create_video(file_path=video_file_path, faststart=True)
+
+    async def act():
+        await upload_blob(
+            file_path=video_file_path,
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="video.mp4",
+        )
+        await extract_audio_from_video_stream(
+            data=iter_blob_chunks(
+                storage_domain_name="mystorage",
+                storage_container_name="mycontainer",
+                storage_blob_name="video.mp4",
+                chunk_size=4096,
+            ),
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="audio.wav",
+            block_size=16 * 1024,
+        )
+        return await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="audio.wav",
+            encoding="latin-1",
+        )
+
+    # act
+    try:
+        result = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+    # validate
+    with wave.open(io.BytesIO(result.encode("latin-1")), "rb") as audio_file:
+        assert audio_file.getframerate() == 16000
+        assert audio_file.getnchannels() == 1
+        assert audio_file.getsampwidth() == 2
+        assert audio_file.getnframes() * 2 + 44 == len(result)
+        assert abs(audio_file.getnframes() / 16000 - 2.0) < 0.1
+
+
+def test_extract_audio_from_video_stream_with_invalid_video(tmp_path):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+
+    async def iter_chunks():
+        for _ in range(16):
+            yield b"no video" * 1024
+
+    async def act():
+        await extract_audio_from_video_stream(
+            data=iter_chunks(),
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="audio.wav",
+        )
+
+    async def load():
+        await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="audio.wav",
+        )
+
+    # act & validate
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(act())
+        with pytest.raises(ResourceNotFoundError):
+            asyncio.run(load())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+
+
+def test_get_media_duration():
+    # init
+    ffmpeg_log = "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'video.mp4':\n  Duration: 01:02:03.50, start: 0.000000, bitrate: 83 kb/s"
+
+    # act
+    result = get_media_duration(ffmpeg_log=ffmpeg_log)
+
+    # validate
+    assert result == 3723.5
+    assert get_media_duration(ffmpeg_log="Duration: N/A") is None
+
+
+def test_compact_stt_result():
+    # init
+    display_words = [
+        {"displayText": "Hello", "offset": "PT0.1S", "duration": "PT0.2S"},
+        {"displayText": "world.", "offset": "PT0.3S", "duration": "PT0.2S"},
+    ]
+    result_stt = {
+        "source": "https://mystorage/audio.wav",
+        "combinedRecognizedPhrases": [
+            {
+                "channel": 0,
+                "lexical": "hello world",
+                "itn": "hello world",
+                "maskedITN": "hello world",
+                "display": "Hello world.",
+            }
+        ],
+        "recognizedPhrases": [
+            {
+                "recognitionStatus": "Success",
+                "offset": "PT0.1S",
+                "locale": "en-US",
+                "nBest": [
+                    {
+                        "confidence": 0.9,
+                        "lexical": "hello world",
+                        "itn": "hello world",
+                        "display": "Hello world.",
+                        "displayWords": display_words,
+                    },
+                    {"confidence": 0.1, "display": "Hello word."},
+                ],
+            }
+        ],
+    }
+
+    # act
+    result = compact_stt_result(result_stt=result_stt)
+
+    # validate
+    assert result["source"] == result_stt["source"]
+    assert result["combinedRecognizedPhrases"] == [
+        {"channel": 0, "display": "Hello world."}
+    ]
+    assert result["recognizedPhrases"][0]["locale"] == "en-US"
+    assert result["recognizedPhrases"][0]["nBest"] == [
+        {"confidence": 0.9, "display": "Hello world.", "displayWords": display_words}
+    ]
@@ -0,0 +1,173 @@
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+from shared.executor import media_execution_pool
+from shared.storage import storage_backend_registry
+from shared.utils import load_blob, upload_string
+from videoupload.models import SpeechRegion
+from videoupload.vad import (
+    detect_speech_regions,
+    map_offset,
+    remap_stt_result,
+    remove_non_speech_audio,
+)
+
+
+def test_detect_speech_regions():
+    # init
+    energies = np.full(100, -80.0)
+    energies[10:30] = -20.0
+    energies[32:40] = -20.0
+    energies[60:61] = -20.0
+    energies[80:95] = -20.0
+
+    # act
+    result = detect_speech_regions(
+        energies=energies,
+        frame_duration=0.1,
+        min_speech_duration=0.3,
+        min_silence_duration=0.5,
+        padding_duration=0.2,
+    )
+
+    # validate
+    assert result.tolist() == [[8, 42], [78, 97]]
+
+
+def test_map_offset_and_remap_stt_result():
+    # init
+    speech_regions = [
+        SpeechRegion(
+            original_start_in_ticks=10_000_000,
+            trimmed_start_in_ticks=0,
+            duration_in_ticks=20_000_000,
+        ),
+        SpeechRegion(
+            original_start_in_ticks=60_000_000,
+            trimmed_start_in_ticks=20_000_000,
+            duration_in_ticks=10_000_000,
+        ),
+    ]
+    result_stt = {
+        "duration": "PT3S",
+        "recognizedPhrases": [
+            {
+                "offset": "PT1.5S",
+                "duration": "PT1S",
+                "offsetInTicks": 15_000_000.0,
+                "durationInTicks": 10_000_000.0,
+                "nBest": [
+                    {
+                        "display": "Hello world.",
+                        "displayWords": [
+                            {
+                                "displayText": "Hello",
+                                "offset": "PT1.5S",
+                                "duration": "PT0.5S",
+                            },
+                            {
+                                "displayText": "world.",
+                                "offset": "PT2S",
+                                "duration": "PT0.5S",
+                            },
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+    # act
+    result = remap_stt_result(result_stt=result_stt, speech_regions=speech_regions)
+
+    # validate
+    assert map_offset(ticks=20_000_000, speech_regions=speech_regions) == 60_000_000
+    assert (
+        map_offset(ticks=20_000_000, speech_regions=speech_regions, is_end=True)
+        == 30_000_000
+    )
+    recognized_phrase = result["recognizedPhrases"][0]
+    assert recognized_phrase["offset"] == "PT2.5S"
+    assert recognized_phrase["offsetInTicks"] == 25_000_000.0
+    assert recognized_phrase["duration"] == "PT4S"
+    assert [
+        (word["offset"], word["duration"])
+        for word in recognized_phrase["nBest"][0]["displayWords"]
+    ] == [("PT2.5S", "PT0.5S"), ("PT6S", "PT0.5S")]
+    assert result["duration"] == "PT7S"
+    assert result_stt["recognizedPhrases"][0]["offset"] == "PT1.5S"
+
+
+@pytest.mark.parametrize("sample_width", [2, 3])
+def test_remove_non_speech_audio(tmp_path, sample_width):
+    # init
+    storage_backend_registry.configure(
+        storage_backend="local", local_root_directory=str(tmp_path)
+    )
+    sample_rate = 16000
+    time = np.arange(20 * sample_rate) / sample_rate
+    samples = 10000 * np.sin(2 * np.pi * 440 * time)
+    samples[(time >= 5.0) & (time < 15.0)] = 0
+    audio_file = io.BytesIO()
+    with wave.open(audio_file, "wb") as wave_file:
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(sample_width)
+        wave_file.setframerate(sample_rate)
+        wave_file.writeframes(
+            (samples * 256 ** (sample_width - 2))
+            .astype("<i4")
+            .view(np.uint8)
+            .reshape(-1, 4)[:, :sample_width]
+            .tobytes()
+        )
+
+    completed = media_execution_pool.get_metrics().completed
+
+    async def act():
+        await upload_string(
+            data=audio_file.getvalue().decode("latin-1"),
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="guid/audio.wav",
+            encoding="latin-1",
+        )
+        result = await remove_non_speech_audio(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="guid/audio.wav",
+            sink_storage_blob_name="guid/audio.speech.wav",
+            block_size=64 * 1024,
+        )
+        trimmed_file = await load_blob(
+            storage_domain_name="mystorage",
+            storage_container_name="mycontainer",
+            storage_blob_name="guid/audio.speech.wav",
+            encoding="latin-1",
+        )
+        return result, trimmed_file
+
+    # act
+    try:
+        result, trimmed_file = asyncio.run(act())
+    finally:
+        storage_backend_registry.configure(storage_backend="azure")
+        media_execution_pool.shutdown()
+
+    # validate
+    assert media_execution_pool.get_metrics().completed > completed
+    assert len(result.speech_regions) == 2
+    assert result.speech_regions[0].original_start_in_ticks == 0
+    assert 15.0 - 0.35 <= result.speech_regions[1].original_start_in_ticks / 10**7
+    assert result.speech_regions[1].original_start_in_ticks / 10**7 <= 15.0 - 0.25
+    assert 35 < result.removed_percentage < 50
+    with wave.open(io.BytesIO(trimmed_file.encode("latin-1")), "rb") as wave_file:
+        assert (
+            abs(
+                wave_file.getnframes() / sample_rate
+                - result.trimmed_duration_in_seconds
+            )
+            < 0.001
+        )
@@ -0,0 +1,183 @@
+import argparse
+import copy
+import logging
+import random
+import time
+from typing import Any, Callable
+
+from aispeechanalysis.utils import (
+    get_normalized_text,
+    get_timestamps_for_sections,
+    get_word_details,
+    offset_and_duration_to_timedelta,
+)
+from tools.speech_emulator import SpeechEmulator
+
+
+def get_timestamps_for_sections_legacy(result_stt: Any, result_llm: Any) -> Any:
+    """Previous implementation of `get_timestamps_for_sections`, which scans the whole transcript for
+    every section and is kept as baseline of the benchmark.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    result_llm (Any): Specifies the JSON content from Azure Open AI analysis.
+    RETURNS (Any): The JSON content from Azure Open AI analysis with added timestamps for start and end.
+    """
+    word_details = get_word_details(result_stt=result_stt, normalize_text=True)
+    result = copy.deepcopy(result_llm.get("sections", []))
+    for index_llm, item_llm in enumerate(result_llm.get("sections", [])):
+        item_llm_current = "start"
+        item_llm_words = get_normalized_text(item_llm.get(item_llm_current, "")).split(
+            sep=" "
+        )
+        for index_word, item_word in enumerate(word_details):
+            item_word_display_text = item_word.get("displayText")
+            if item_word_display_text and item_word_display_text == item_llm_words[0]:
+                identical = [
+                    index_word + index_llm_word < len(word_details)
+                    and item_llm_word
+                    == word_details[index_word + index_llm_word].get("displayText")
+                    for index_llm_word, item_llm_word in enumerate(item_llm_words)
+                ]
+                if all(identical):
+                    last_word = word_details[index_word + len(item_llm_words) - 1]
+                    if item_llm_current == "start":
+                        _, td_sum = offset_and_duration_to_timedelta(
+                            timedelta_str=item_word.get("offset")
+                        )
+                    else:
+                        _, td_offset = offset_and_duration_to_timedelta(
+                            timedelta_str=last_word.get("offset")
+                        )
+                        _, td_duration = offset_and_duration_to_timedelta(
+                            timedelta_str=last_word.get("duration")
+                        )
+                        td_sum = td_offset + td_duration
+                    result[index_llm][f"{item_llm_current}_time"] = str(td_sum)
+                    if item_llm_current == "start":
+                        item_llm_current = "end"
+                        item_llm_words = get_normalized_text(
+                            item_llm.get(item_llm_current, "")
+                        ).split(sep=" ")
+                    else:
+                        break
+    return {"sections": result}
+
+
+def create_result_llm(result_stt: Any, sections: int) -> Any:
+    """Creates ordered sections whose start and end sentences are taken from a transcript.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    sections (int): Specifies the number of sections.
+    RETURNS (Any): The JSON content of an Azure Open AI analysis.
+    """
+    displays = [
+        recognized_phrase["nBest"][0]["display"]
+        for recognized_phrase in result_stt["recognizedPhrases"]
+    ]
+    section_length = max(len(displays) // sections, 1)
+    return {
+        "sections": [
+            {
+                "id": index,
+                "start": displays[start],
+                "end": displays[min(start + section_length, len(displays)) - 1],
+            }
+            for index, start in enumerate(range(0, len(displays), section_length))
+        ]
+    }
+
+
+def drop_words(result_llm: Any, seed: int = 0) -> Any:
+    """Drops one word from every start and end sentence, like a paraphrasing llm.
+
+    result_llm (Any): Specifies the JSON content of an Azure Open AI analysis.
+    seed (int): Specifies the seed of the dropped words.
+    RETURNS (Any): The JSON content of an Azure Open AI analysis with altered sentences.
+    """
+    rng = random.Random(seed)
+    result = copy.deepcopy(result_llm)
+    for section in result["sections"]:
+        for key in ["start", "end"]:
+            words = section[key].split()
+            if len(words) > 3:
+                del words[rng.randrange(1, len(words) - 1)]
+            section[key] = " ".join(words)
+    return result
+
+
+def count_aligned_sections(result: Any) -> int:
+    return sum(
+        "start_time" in section and "end_time" in section
+        for section in result["sections"]
+    )
+
+
+def run_benchmark(
+    function: Callable[[Any, Any], Any], result_stt: Any, result_llm: Any
+) -> float:
+    # Word details are normalized in place, so every run gets a fresh copy
+    result_stt = copy.deepcopy(result_stt)
+    start_time = time.perf_counter()
+    function(result_stt=result_stt, result_llm=result_llm)
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    """Benchmarks the alignment of llm sections with transcripts of increasing duration.
+
+    RETURNS (None): No return values.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark of get_timestamps_for_sections."
+    )
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 2, 4])
+    parser.add_argument("--sections-per-hour", type=int, default=30)
+    args = parser.parse_args()
+
+    # Parser warnings of the legacy duration parsing would dominate the output
+    logging.disable(logging.WARNING)
+    print(
+        "hours\twords\tsections\tlegacy_s\tindexed_s\tspeedup\texact_aligned\tapproximate_s\tapproximate_aligned"
+    )
+    for hours in args.hours:
+        result_stt = SpeechEmulator(audio_duration=hours * 3600).create_stt_result(
+            source=f"benchmark-{hours}", locale="en-US"
+        )
+        result_llm = create_result_llm(
+            result_stt=result_stt,
+            sections=max(round(hours * args.sections_per_hour), 1),
+        )
+        words = sum(
+            len(recognized_phrase["nBest"][0]["displayWords"])
+            for recognized_phrase in result_stt["recognizedPhrases"]
+        )
+        duration_legacy = run_benchmark(
+            get_timestamps_for_sections_legacy, result_stt, result_llm
+        )
+        duration_indexed = run_benchmark(
+            get_timestamps_for_sections, result_stt, result_llm
+        )
+
+        # Align sentences that do not match the transcript exactly
+        result_llm_altered = drop_words(result_llm=result_llm)
+        aligned_exact = count_aligned_sections(
+            get_timestamps_for_sections(
+                result_stt=result_stt, result_llm=result_llm_altered
+            )
+        )
+        start_time = time.perf_counter()
+        aligned_approximate = count_aligned_sections(
+            get_timestamps_for_sections(
+                result_stt=result_stt,
+                result_llm=result_llm_altered,
+                alignment_mode="approximate",
+            )
+        )
+        duration_approximate = time.perf_counter() - start_time
+        print(
+            f"{hours}\t{words}\t{len(result_llm['sections'])}\t{duration_legacy:.3f}\t{duration_indexed:.3f}\t{duration_legacy / duration_indexed:.1f}x\t{aligned_exact}\t{duration_approximate:.3f}\t{aligned_approximate}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Tuple
+
+from aispeechanalysis.utils import (
+    WordTable,
+    get_locale,
+    get_transcript,
+    read_stt_result,
+)
+from shared.storage import storage_backend_registry
+from shared.utils import (
+    iter_blob_chunks,
+    iter_decompressed_chunks,
+    load_blob,
+    upload_string,
+)
+from tools.speech_emulator import SpeechEmulator
+
+STORAGE_DOMAIN_NAME = "benchmark"
+STORAGE_CONTAINER_NAME = "internal-analysis-speech"
+STORAGE_BLOB_NAME = "benchmark/speech0.json"
+
+
+def create_result_stt(hours: float, alternatives: int) -> Any:
+    """Creates a transcript with additional recognitions for every phrase, like transcriptions with `nBest` alternatives.
+
+    hours (float): Specifies the duration of the transcribed audio in hours.
+    alternatives (int): Specifies the number of alternative recognitions per phrase.
+    RETURNS (Any): The JSON content of an Azure AI Speech STT batch transcription.
+    """
+    result_stt = SpeechEmulator(audio_duration=hours * 3600).create_stt_result(
+        source=f"benchmark-{hours}", locale="en-US"
+    )
+    for recognized_phrase in result_stt["recognizedPhrases"]:
+        recognized_phrase["nBest"] *= alternatives + 1
+    return result_stt
+
+
+async def read_stt_result_legacy() -> Tuple[str, str, WordTable]:
+    """Previous implementation of the analysis input, which loads and parses the whole transcript.
+
+    RETURNS (Tuple[str, str, WordTable]): The transcript, the locale and the word table of the transcription.
+    """
+    result_load_blob = await load_blob(
+        storage_domain_name=STORAGE_DOMAIN_NAME,
+        storage_container_name=STORAGE_CONTAINER_NAME,
+        storage_blob_name=STORAGE_BLOB_NAME,
+    )
+    result_load_blob_json = json.loads(result_load_blob)
+    return (
+        get_transcript(result_stt=result_load_blob_json),
+        get_locale(result_stt=result_load_blob_json),
+        WordTable.from_stt_result(result_stt=result_load_blob_json),
+    )
+
+
+async def read_stt_result_streaming() -> Tuple[str, str, WordTable]:
+    """Current implementation of the analysis input, which parses the transcript while it is downloaded.
+
+    RETURNS (Tuple[str, str, WordTable]): The transcript, the locale and the word table of the transcription.
+    """
+    return await read_stt_result(
+        chunks=iter_decompressed_chunks(
+            chunks=iter_blob_chunks(
+                storage_domain_name=STORAGE_DOMAIN_NAME,
+                storage_container_name=STORAGE_CONTAINER_NAME,
+                storage_blob_name=STORAGE_BLOB_NAME,
+            )
+        )
+    )
+
+
+def run_benchmark(
+    function: Callable[[], Awaitable[Tuple[str, str, WordTable]]],
+) -> Tuple[float, int, int]:
+    # Tracing slows down allocations, so duration and peak memory are measured in separate runs
+    start_time = time.perf_counter()
+    _, _, word_table = asyncio.run(function())
+    duration = time.perf_counter() - start_time
+    tracemalloc.start()
+    asyncio.run(function())
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak_memory, len(word_table)
+
+
+def main() -> None:
+    """Benchmarks the peak memory of reading transcripts of increasing duration from blob storage.
+
+    RETURNS (None): No return values.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the transcript input of the speech analysis."
+    )
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--alternatives", type=int, default=0)
+    parser.add_argument("--content-encoding", choices=["gzip", "zstd"], default=None)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print("hours\tblob_mib\twords\tlegacy_s\tlegacy_mib\tstreaming_s\tstreaming_mib")
+    with tempfile.TemporaryDirectory() as local_root_directory:
+        storage_backend_registry.configure(
+            storage_backend="local", local_root_directory=local_root_directory
+        )
+        try:
+            for hours in args.hours:
+                data = json.dumps(
+                    create_result_stt(hours=hours, alternatives=args.alternatives)
+                )
+                asyncio.run(
+                    upload_string(
+                        data=data,
+                        storage_domain_name=STORAGE_DOMAIN_NAME,
+                        storage_container_name=STORAGE_CONTAINER_NAME,
+                        storage_blob_name=STORAGE_BLOB_NAME,
+                        content_encoding=args.content_encoding,
+                    )
+                )
+                data_size = len(data)
+                del data
+                duration_legacy, peak_memory_legacy, words = run_benchmark(
+                    read_stt_result_legacy
+                )
+                duration_streaming, peak_memory_streaming, _ = run_benchmark(
+                    read_stt_result_streaming
+                )
+                print(
+                    f"{hours}\t{data_size / 2**20:.1f}\t{words}\t{duration_legacy:.2f}\t{peak_memory_legacy / 2**20:.1f}\t{duration_streaming:.2f}\t{peak_memory_streaming / 2**20:.1f}"
+                )
+        finally:
+            storage_backend_registry.configure(storage_backend="azure")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import json
+import logging
+from typing import Any, List
+
+from aispeechanalysis.models import (
+    InvokeLlmResponse,
+    InvokeLlmSentenceResponse,
+    LlmResponseItem,
+    LlmSentenceResponseItem,
+)
+from aispeechanalysis.utils import (
+    WordTable,
+    get_timestamps_for_sections,
+    get_timestamps_for_sentence_sections,
+    get_transcript,
+)
+from tools.speech_emulator import SpeechEmulator
+
+SECTION_MODES = ["text", "sentence_id"]
+
+
+def create_sections(word_table: WordTable, sections: int) -> List[Any]:
+    """Creates ordered sections of equal numbers of sentences with the same metadata in both section modes.
+
+    word_table (WordTable): Specifies the word table of the transcript with the numbered sentences.
+    sections (int): Specifies the number of sections.
+    RETURNS (List[Any]): The llm responses in text and sentence id mode.
+    """
+    sentence_count = word_table.get_sentence_count()
+    section_length = max(sentence_count // sections, 1)
+    items_text, items_sentence_id = [], []
+    for index, start_sentence_id in enumerate(
+        range(1, sentence_count + 1, section_length), start=1
+    ):
+        end_sentence_id = (
+            min(start_sentence_id + section_length, sentence_count + 1) - 1
+        )
+        metadata = {
+            "id": index,
+            "title": f"Section {index}",
+            "category": "national",
+            "tags": ["national news", "politics"],
+            "score": 8,
+        }
+        items_text.append(
+            LlmResponseItem(
+                start=word_table.get_sentence_text(sentence_id=start_sentence_id),
+                end=word_table.get_sentence_text(sentence_id=end_sentence_id),
+                **metadata,
+            )
+        )
+        items_sentence_id.append(
+            LlmSentenceResponseItem(
+                start_sentence_id=start_sentence_id,
+                end_sentence_id=end_sentence_id,
+                **metadata,
+            )
+        )
+    return [
+        InvokeLlmResponse(sections=items_text),
+        InvokeLlmSentenceResponse(sections=items_sentence_id),
+    ]
+
+
+def compare_offline(result_stt: Any, word_table: WordTable, sections: int) -> None:
+    """Compares the size of the llm input and of equivalent llm responses of both section modes.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    word_table (WordTable): Specifies the word table of the transcript with the numbered sentences.
+    sections (int): Specifies the number of sections.
+    RETURNS (None): No return values.
+    """
+    news_contents = [
+        get_transcript(result_stt=result_stt),
+        word_table.get_numbered_transcript(),
+    ]
+    print("mode\tsentences\tsections\tinput_chars\tresponse_chars")
+    for section_mode, news_content, result_llm in zip(
+        SECTION_MODES,
+        news_contents,
+        create_sections(word_table=word_table, sections=sections),
+    ):
+        print(
+            f"{section_mode}\t{word_table.get_sentence_count()}\t{len(result_llm.sections)}\t{len(news_content)}\t{len(result_llm.model_dump_json())}"
+        )
+
+
+async def compare_live(result_stt: Any, word_table: WordTable, runs: int) -> None:
+    """Compares token usage, latency and aligned sections of both section modes with the configured Azure Open AI deployment.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    word_table (WordTable): Specifies the word table of the transcript with the numbered sentences.
+    runs (int): Specifies the number of invocations per section mode.
+    RETURNS (None): No return values.
+    """
+    # Settings require the configuration of the function app
+    from aispeechanalysis.llm import llm_client_registry
+    from shared.config import settings
+
+    print(
+        "mode\trun\tprompt_tokens\tcompletion_tokens\tduration_s\ttoken_s\tsections\taligned"
+    )
+    for section_mode in SECTION_MODES:
+        llm_client = llm_client_registry.get_llm_client(
+            azure_open_ai_base_url=settings.AZURE_OPEN_AI_BASE_URL,
+            azure_open_ai_api_version=settings.AZURE_OPEN_AI_API_VERSION,
+            azure_open_ai_deployment_name=settings.AZURE_OPEN_AI_DEPLOYMENT_NAME,
+            azure_open_ai_temperature=settings.AZURE_OPEN_AI_TEMPERATURE,
+            section_mode=section_mode,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
+        for run in range(runs):
+            result_llm = await llm_client.invoke_llm_chain(
+                news_content=(
+                    word_table.get_numbered_transcript()
+                    if section_mode == "sentence_id"
+                    else get_transcript(result_stt=result_stt)
+                ),
+                news_show_details="This is a news show covering different news content.",
+                language=result_stt["recognizedPhrases"][0].get("locale", "Unknown"),
+            )
+            if section_mode == "sentence_id":
+                result = get_timestamps_for_sentence_sections(
+                    word_table=word_table, result_llm=result_llm.model_dump()
+                )
+            else:
+                result = get_timestamps_for_sections(
+                    result_stt=None,
+                    result_llm=result_llm.model_dump(),
+                    word_table=word_table,
+                    alignment_mode=settings.SECTION_ALIGNMENT_MODE,
+                )
+            aligned = sum(
+                "start_time" in section and "end_time" in section
+                for section in result["sections"]
+            )
+            usage = llm_client.get_last_usage()
+            print(
+                f"{section_mode}\t{run}\t{usage.prompt_tokens}\t{usage.completion_tokens}\t{usage.duration_in_seconds:.2f}\t{usage.token_duration_in_seconds:.3f}\t{len(result['sections'])}\t{aligned}"
+            )
+
+
+def main() -> None:
+    """Compares the text and sentence id section modes of the speech analysis.
+
+    RETURNS (None): No return values.
+    """
+    parser = argparse.ArgumentParser(
+        description="Comparison of the section modes of the speech analysis."
+    )
+    parser.add_argument(
+        "--stt-file",
+        type=str,
+        default=None,
+        help="Azure AI Speech transcription file. Defaults to an emulated transcript.",
+    )
+    parser.add_argument("--hours", type=float, default=0.5)
+    parser.add_argument("--sections-per-hour", type=int, default=30)
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Invoke the configured Azure Open AI deployment.",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.stt_file:
+        with open(args.stt_file, "rb") as file:
+            result_stt = json.load(file)
+    else:
+        result_stt = SpeechEmulator(audio_duration=args.hours * 3600).create_stt_result(
+            source="comparison", locale="en-US"
+        )
+    word_table = WordTable.from_stt_result(result_stt=result_stt)
+    if args.live:
+        asyncio.run(
+            compare_live(result_stt=result_stt, word_table=word_table, runs=args.runs)
+        )
+    else:
+        compare_offline(
+            result_stt=result_stt,
+            word_table=word_table,
+            sections=max(round(args.hours * args.sections_per_hour), 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+import argparse
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from aiohttp import web
+from shared.duration import TICKS_PER_SECOND, format_duration
+
+WORDS = [
+    "the",
+    "government",
+    "announced",
+    "new",
+    "measures",
+    "today",
+    "after",
+    "weeks",
+    "of",
+    "debate",
+    "in",
+    "parliament",
+    "weather",
+    "will",
+    "stay",
+    "sunny",
+    "across",
+    "country",
+    "team",
+    "won",
+    "final",
+    "match",
+    "against",
+    "their",
+    "rivals",
+    "market",
+    "prices",
+    "rose",
+    "sharply",
+    "this",
+    "morning",
+]
+
+
+class SpeechEmulator:
+    def __init__(
+        self,
+        processing_delay: float = 10.0,
+        failure_rate: float = 0.0,
+        throttling_rate: float = 0.0,
+        retry_after: int = 1,
+        audio_duration: float = 120.0,
+        seed: int = 0,
+    ) -> None:
+        """Initializes a local stand-in for the batch transcription api of Azure AI Speech.
+
+        The emulator implements the submit, status and files endpoints used by `SpeechClient` and
+        serves synthetic transcriptions shaped like the output of the service. It does not access the
+        submitted audio files, so every transcription covers `audio_duration` seconds.
+
+        processing_delay (float): Specifies the seconds until a transcription job finishes.
+        failure_rate (float): Specifies the share of transcription jobs that fail.
+        throttling_rate (float): Specifies the share of requests that are rejected with status code 429.
+        retry_after (int): Specifies the seconds returned in the `Retry-After` header of rejected requests.
+        audio_duration (float): Specifies the duration in seconds of every transcribed audio file.
+        seed (int): Specifies the seed of the synthetic transcriptions and injected failures.
+        RETURNS (None): No return values.
+        """
+        self.processing_delay = processing_delay
+        self.failure_rate = failure_rate
+        self.throttling_rate = throttling_rate
+        self.retry_after = retry_after
+        self.audio_duration = audio_duration
+        self.seed = seed
+        self.__random = random.Random(seed)
+        self.__transcriptions: Dict[str, Dict[str, Any]] = {}
+        self.__metrics = {
+            "requests": 0,
+            "throttled": 0,
+            "submitted": 0,
+            "failed": 0,
+            "content_urls": 0,
+        }
+
+    def create_app(self) -> web.Application:
+        """Creates the web application of the emulator.
+
+        RETURNS (web.Application): Returns the web application.
+        """
+        app = web.Application(middlewares=[self.__throttle])
+        app.add_routes(
+            [
+                web.post(
+                    "/speechtotext/transcriptions:submit", self.__create_transcription
+                ),
+                web.get(
+                    "/speechtotext/transcriptions/{transcription_id}",
+                    self.__get_transcription,
+                ),
+                web.get(
+                    "/speechtotext/transcriptions/{transcription_id}/files",
+                    self.__get_transcription_files,
+                ),
+                web.get(
+                    "/emulator/files/{transcription_id}/{content_index}.json",
+                    self.__get_transcription_file,
+                ),
+                web.get("/emulator/metrics", self.__get_metrics),
+            ]
+        )
+        return app
+
+    @web.middleware
+    async def __throttle(self, request: web.Request, handler) -> web.StreamResponse:
+        self.__metrics["requests"] += 1
+        if (
+            request.path.startswith("/speechtotext/")
+            and self.__random.random() < self.throttling_rate
+        ):
+            self.__metrics["throttled"] += 1
+            return web.json_response(
+                {
+                    "code": "TooManyRequests",
+                    "message": "The number of requests exceeded the allowed rate.",
+                },
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        return await handler(request)
+
+    def __get_transcription_url(self, request: web.Request, transcription_id: str):
+        return f"{request.scheme}://{request.host}/speechtotext/transcriptions/{transcription_id}?{request.query_string}"
+
+    async def __create_transcription(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        content_urls = payload.get("contentUrls", [])
+        if not content_urls:
+            return web.json_response(
+                {"code": "InvalidPayload", "message": "No content urls provided."},
+                status=400,
+            )
+        transcription_id = str(uuid.uuid4())
+        failed = self.__random.random() < self.failure_rate
+        self.__transcriptions[transcription_id] = {
+            "display_name": payload.get("displayName", ""),
+            "locale": payload.get("locale", "en-US"),
+            "content_urls": content_urls,
+            "created_time": time.time(),
+            "failed": failed,
+        }
+        self.__metrics["submitted"] += 1
+        self.__metrics["failed"] += int(failed)
+        self.__metrics["content_urls"] += len(content_urls)
+        logging.info(
+            f"Created transcription '{transcription_id}' for {len(content_urls)} content url(s)."
+        )
+        return web.json_response(
+            self.__get_transcription_body(
+                request=request, transcription_id=transcription_id
+            ),
+            status=201,
+        )
+
+    def __get_status(self, transcription: Dict[str, Any]) -> str:
+        elapsed = time.time() - transcription["created_time"]
+        if elapsed < self.processing_delay * 0.1:
+            return "NotStarted"
+        elif elapsed < self.processing_delay:
+            return "Running"
+        return "Failed" if transcription["failed"] else "Succeeded"
+
+    def __get_transcription_body(
+        self, request: web.Request, transcription_id: str
+    ) -> Dict[str, Any]:
+        transcription = self.__transcriptions[transcription_id]
+        status = self.__get_status(transcription=transcription)
+        body = {
+            "self": self.__get_transcription_url(
+                request=request, transcription_id=transcription_id
+            ),
+            "displayName": transcription["display_name"],
+            "locale": transcription["locale"],
+            "createdDateTime": datetime.fromtimestamp(
+                transcription["created_time"], tz=timezone.utc
+            ).isoformat(),
+            "lastActionDateTime": datetime.now(tz=timezone.utc).isoformat(),
+            "status": status,
+            "links": {
+                "files": f"{request.scheme}://{request.host}/speechtotext/transcriptions/{transcription_id}/files"
+            },
+        }
+        if status == "Failed":
+            body["properties"] = {
+                "error": {
+                    "code": "InvalidData",
+                    "message": "Emulated failure of the transcription job.",
+                }
+            }
+        return body
+
+    async def __get_transcription(self, request: web.Request) -> web.Response:
+        transcription_id = request.match_info["transcription_id"]
+        if transcription_id not in self.__transcriptions:
+            raise web.HTTPNotFound()
+        return web.json_response(
+            self.__get_transcription_body(
+                request=request, transcription_id=transcription_id
+            )
+        )
+
+    async def __get_transcription_files(self, request: web.Request) -> web.Response:
+        transcription_id = request.match_info["transcription_id"]
+        transcription = self.__transcriptions.get(transcription_id)
+        if transcription is None:
+            raise web.HTTPNotFound()
+        values = []
+        if self.__get_status(transcription=transcription) == "Succeeded":
+            values = [
+                {
+                    "kind": "Transcription",
+                    "name": f"contenturl_{content_index}.json",
+                    "links": {
+                        "contentUrl": f"{request.scheme}://{request.host}/emulator/files/{transcription_id}/{content_index}.json"
+                    },
+                }
+                for content_index in range(len(transcription["content_urls"]))
+            ] + [
+                {
+                    "kind": "TranscriptionReport",
+                    "name": "report.json",
+                    "links": {
+                        "contentUrl": f"{request.scheme}://{request.host}/emulator/files/{transcription_id}/report.json"
+                    },
+                }
+            ]
+        return web.json_response({"values": values})
+
+    async def __get_transcription_file(self, request: web.Request) -> web.Response:
+        transcription = self.__transcriptions.get(
+            request.match_info["transcription_id"]
+        )
+        content_index = request.match_info["content_index"]
+        if transcription is None or not content_index.isdigit():
+            raise web.HTTPNotFound()
+        content_urls = transcription["content_urls"]
+        if int(content_index) >= len(content_urls):
+            raise web.HTTPNotFound()
+        return web.json_response(
+            self.create_stt_result(
+                source=content_urls[int(content_index)],
+                locale=transcription["locale"],
+            )
+        )
+
+    async def __get_metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(self.__metrics)
+
+    def create_stt_result(self, source: str, locale: str) -> Dict[str, Any]:
+        """Creates a synthetic transcription of an audio file in the output format of the batch transcription api.
+
+        source (str): Specifies the url of the transcribed audio file.
+        locale (str): Specifies the locale of the transcription.
+        RETURNS (Dict[str, Any]): Returns the transcription.
+        """
+        rng = random.Random(f"{self.seed}-{source}")
+        duration_in_ticks = round(self.audio_duration * TICKS_PER_SECOND)
+        recognized_phrases: List[Dict[str, Any]] = []
+        offset_in_ticks = round(rng.uniform(0.2, 1.0) * TICKS_PER_SECOND)
+        while True:
+            # Create words of a sentence with gaps between them
+            display_words = []
+            word_offset_in_ticks = offset_in_ticks
+            for index in range(rng.randint(5, 12)):
+                word = rng.choice(WORDS)
+                word_duration_in_ticks = round(rng.uniform(0.2, 0.5) * TICKS_PER_SECOND)
+                if word_offset_in_ticks + word_duration_in_ticks > duration_in_ticks:
+                    break
+                display_words.append(
+                    {
+                        "displayText": word.capitalize() if index == 0 else word,
+                        "offset": format_duration(ticks=word_offset_in_ticks),
+                        "duration": format_duration(ticks=word_duration_in_ticks),
+                        "offsetInTicks": float(word_offset_in_ticks),
+                        "durationInTicks": float(word_duration_in_ticks),
+                    }
+                )
+                word_offset_in_ticks += word_duration_in_ticks + round(
+                    rng.uniform(0.0, 0.1) * TICKS_PER_SECOND
+                )
+            if not display_words:
+                break
+            display_words[-1]["displayText"] += "."
+
+            phrase_duration_in_ticks = (
+                display_words[-1]["offsetInTicks"]
+                + display_words[-1]["durationInTicks"]
+                - offset_in_ticks
+            )
+            lexical = " ".join(
+                str.lower(word["displayText"]).rstrip(".") for word in display_words
+            )
+            display = " ".join(word["displayText"] for word in display_words)
+            recognized_phrases.append(
+                {
+                    "recognitionStatus": "Success",
+                    "channel": 0,
+                    "offset": format_duration(ticks=offset_in_ticks),
+                    "duration": format_duration(ticks=round(phrase_duration_in_ticks)),
+                    "offsetInTicks": float(offset_in_ticks),
+                    "durationInTicks": float(phrase_duration_in_ticks),
+                    "locale": locale,
+                    "nBest": [
+                        {
+                            "confidence": round(rng.uniform(0.7, 0.99), 4),
+                            "lexical": lexical,
+                            "itn": lexical,
+                            "maskedITN": lexical,
+                            "display": display,
+                            "displayWords": display_words,
+                        }
+                    ],
+                }
+            )
+            offset_in_ticks = round(
+                offset_in_ticks
+                + phrase_duration_in_ticks
+                + rng.uniform(0.2, 1.0) * TICKS_PER_SECOND
+            )
+
+        return {
+            "source": source,
+            "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+            "durationInTicks": duration_in_ticks,
+            "duration": format_duration(ticks=duration_in_ticks),
+            "combinedRecognizedPhrases": [
+                {
+                    "channel": 0,
+                    "lexical": " ".join(
+                        phrase["nBest"][0]["lexical"] for phrase in recognized_phrases
+                    ),
+                    "itn": " ".join(
+                        phrase["nBest"][0]["itn"] for phrase in recognized_phrases
+                    ),
+                    "maskedITN": " ".join(
+                        phrase["nBest"][0]["maskedITN"] for phrase in recognized_phrases
+                    ),
+                    "display": " ".join(
+                        phrase["nBest"][0]["display"] for phrase in recognized_phrases
+                    ),
+                }
+            ],
+            "recognizedPhrases": recognized_phrases,
+        }
+
+
+def main() -> None:
+    """Runs the speech emulator. Point `AZURE_AI_SPEECH_BASE_URL` to the emulator and set any
+    `AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY` to transcribe against it.
+
+    RETURNS (None): No return values.
+    """
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Azure AI Speech batch transcription api."
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--processing-delay", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttling-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--audio-duration", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    speech_emulator = SpeechEmulator(
+        processing_delay=args.processing_delay,
+        failure_rate=args.failure_rate,
+        throttling_rate=args.throttling_rate,
+        retry_after=args.retry_after,
+        audio_duration=args.audio_duration,
+        seed=args.seed,
+    )
+    web.run_app(speech_emulator.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from azure.core.exceptions import ResourceNotFoundError
+from shared.utils import load_blob, upload_string
+from videoupload.models import DedupIndexMetrics
+
+
+class DedupIndex:
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(
+        self,
+        storage_domain_name: str,
+        storage_container_name: str,
+        storage_prefix: str = "dedup",
+        managed_identity_client_id: str = None,
+    ) -> None:
+        """Initializes the content-addressed deduplication index for uploaded videos.
+
+        The index maps the md5 hash of the content of a video to the guid under which the video
+        was processed before. Entries are stored as blobs named `<storage_prefix>/<md5>.json`.
+        Hits and misses are counted across all instances within the worker.
+
+        storage_domain_name (str): The domain name of the storage account.
+        storage_container_name (str): The container name of the storage account.
+        storage_prefix (str): Specifies the prefix of the index entries.
+        managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+        RETURNS (None): No return values.
+        """
+        self.storage_domain_name = storage_domain_name
+        self.storage_container_name = storage_container_name
+        self.storage_prefix = storage_prefix
+        self.managed_identity_client_id = managed_identity_client_id
+
+    async def get_guid(self, content_md5: str) -> str:
+        """Returns the guid of a previously processed video with the same content.
+
+        content_md5 (str): Specifies the md5 hash of the content as hex string.
+        RETURNS (str): Returns the guid of the previous run or None if the content is unknown.
+        """
+        try:
+            result_load_blob = await load_blob(
+                storage_domain_name=self.storage_domain_name,
+                storage_container_name=self.storage_container_name,
+                storage_blob_name=f"{self.storage_prefix}/{content_md5}.json",
+                managed_identity_client_id=self.managed_identity_client_id,
+            )
+        except ResourceNotFoundError:
+            DedupIndex.misses += 1
+            logging.info(f"No previous run found for content '{content_md5}'.")
+            return None
+
+        DedupIndex.hits += 1
+        guid = json.loads(result_load_blob).get("guid")
+        logging.info(f"Found previous run '{guid}' for content '{content_md5}'.")
+        return guid
+
+    async def add_guid(self, content_md5: str, guid: str) -> None:
+        """Adds the guid of a processed video to the index.
+
+        content_md5 (str): Specifies the md5 hash of the content as hex string.
+        guid (str): Specifies the guid of the run that processed the video.
+        RETURNS (None): No return values.
+        """
+        logging.info(f"Adding run '{guid}' for content '{content_md5}' to index.")
+        await upload_string(
+            data=json.dumps(
+                {
+                    "guid": guid,
+                    "content_md5": content_md5,
+                    "created": datetime.now(tz=timezone.utc).isoformat(),
+                }
+            ),
+            storage_domain_name=self.storage_domain_name,
+            storage_container_name=self.storage_container_name,
+            storage_blob_name=f"{self.storage_prefix}/{content_md5}.json",
+            managed_identity_client_id=self.managed_identity_client_id,
+        )
+
+    async def add_alias(
+        self,
+        guid: str,
+        prior_guid: str,
+        content_md5: str,
+        storage_container_name: str,
+    ) -> str:
+        """Links a skipped run to the outputs of the previous run with the same content.
+
+        The alias is stored as blob named `<guid>/alias.json` next to the results of the skipped run,
+        so that consumers of the results of `guid` can resolve the `speech*.json`, `llm.json` and
+        `timestamps.json` outputs of `prior_guid`.
+
+        guid (str): Specifies the guid of the skipped run.
+        prior_guid (str): Specifies the guid of the previous run with the same content.
+        content_md5 (str): Specifies the md5 hash of the content as hex string.
+        storage_container_name (str): Specifies the container name of the alias record.
+        RETURNS (str): Returns the blob name of the alias record.
+        """
+        logging.info(f"Adding alias of run '{guid}' for previous run '{prior_guid}'.")
+        storage_blob_name = f"{guid}/alias.json"
+        await upload_string(
+            data=json.dumps(
+                {
+                    "guid": guid,
+                    "prior_guid": prior_guid,
+                    "content_md5": content_md5,
+                    "created": datetime.now(tz=timezone.utc).isoformat(),
+                }
+            ),
+            storage_domain_name=self.storage_domain_name,
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+            managed_identity_client_id=self.managed_identity_client_id,
+        )
+        return storage_blob_name
+
+    @staticmethod
+    def get_metrics() -> DedupIndexMetrics:
+        """Returns the hits and misses of the index within the worker.
+
+        RETURNS (DedupIndexMetrics): Returns the number of hits and misses.
+        """
+        return DedupIndexMetrics(hits=DedupIndex.hits, misses=DedupIndex.misses)
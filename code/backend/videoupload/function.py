@@ -1,21 +1,45 @@
 import asyncio
+import hashlib
+import json
 import logging
 import os
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+from urllib.parse import unquote
 
 import azure.functions as func
 import azurefunctions.extensions.bindings.blob as blob
+from models.error import ErrorModel
+from shared.auth import token_cache
 from shared.config import settings
+from shared.executor import media_execution_pool
 from shared.utils import (
     copy_blob,
-    copy_blob_from_url,
+    copy_blobs_from_url,
+    delete_blob,
     delete_directory,
     download_blob,
     get_blob_properties,
     get_guid,
+    iter_blob_chunks,
+    load_url,
     upload_blob,
+    upload_string,
 )
+from videoupload.dedup import DedupIndex
+from videoupload.jobs import TranscriptionJobFailedError, TranscriptionJobStore
+from videoupload.models import TranscriptionJob
+from videoupload.segmentation import create_audio_segments, merge_stt_results
 from videoupload.speech import SpeechClient
-from videoupload.utils import extract_audio_from_video
+from videoupload.utils import (
+    compact_stt_result,
+    extract_audio_from_video,
+    extract_audio_from_video_stream,
+    is_streamable_media,
+    upload_compacted_stt_result,
+)
+from videoupload.vad import remap_stt_result, remove_non_speech_audio
 
 bp = func.Blueprint()
 
@@ -42,108 +66,676 @@ async def upload_video(client: blob.BlobClient):
     videoupload_guid = get_guid(seed=seed_guid)
     blob_file_type = str.split(client.blob_name, ".")[-1]
 
-    # Download blob to local storage async
-    logging.info(f"Download video for preprocessing.")
-    download_directory_path = os.path.join(settings.HOME_DIRECTORY, videoupload_guid)
-    download_file_path = os.path.join(
-        download_directory_path, f"video.{blob_file_type}"
-    )
-    result_download_blob = await download_blob(
-        file_path=download_file_path,
+    # Check whether the same content was processed before
+    dedup_index = DedupIndex(
         storage_domain_name=f"{client.account_name}.blob.core.windows.net",
-        storage_container_name=client.container_name,
-        storage_blob_name=client.blob_name,
+        storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
-    logging.info(f"Downloaded blob to '{result_download_blob}'.")
+    content_md5 = (
+        bytes(blob_properties.content_settings.content_md5).hex()
+        if blob_properties.content_settings.content_md5
+        else None
+    )
+    if settings.VIDEO_DEDUPLICATION_ENABLED and content_md5:
+        prior_guid = await dedup_index.get_guid(content_md5=content_md5)
+        if prior_guid:
+            await dedup_index.add_alias(
+                guid=videoupload_guid,
+                prior_guid=prior_guid,
+                content_md5=content_md5,
+                storage_container_name=settings.STORAGE_CONTAINER_RESULTS_NAME,
+            )
+            await delete_blob(
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=client.container_name,
+                storage_blob_name=client.blob_name,
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+            logging.info(
+                f"Skipped processing of '{client.blob_name}', results are available for run '{prior_guid}' ({dedup_index.get_metrics()})."
+            )
+            return
 
-    # Copy blob from upload location
+    # Copy blob from upload location while the video is processed locally
     logging.info(f"Copy blob into destination container.")
-    _ = await copy_blob(
-        storage_domain_name=f"{client.account_name}.blob.core.windows.net",
-        source_storage_container_name=client.container_name,
-        source_storage_blob_name=client.blob_name,
-        sink_storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
-        sink_storage_blob_name=f"{videoupload_guid}/video.{blob_file_type}",
-        delete_source=True,
-        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+    ingest_start_time = time.perf_counter()
+    copy_blob_task = asyncio.create_task(
+        copy_blob(
+            storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+            source_storage_container_name=client.container_name,
+            source_storage_blob_name=client.blob_name,
+            sink_storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+            sink_storage_blob_name=f"{videoupload_guid}/video.{blob_file_type}",
+            delete_source=False,
+            sync_copy_size_threshold=settings.STORAGE_COPY_SYNC_SIZE_THRESHOLD,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
     )
 
-    # Extract audio from video
-    logging.info(f"Extract audio from video.")
-    audio_file_name = f"audio.wav"
-    result_extract_audio_from_video = extract_audio_from_video(
-        file_path=result_download_blob,
-        audio_file_name=audio_file_name,
-    )
+    async def skip_duplicate(prior_guid: str, content_md5: str) -> None:
+        copy_blob_task.cancel()
+        await asyncio.gather(copy_blob_task, return_exceptions=True)
+
+        # Remove the copied video if the copy finished before the duplicate was detected
+        if not copy_blob_task.cancelled() and copy_blob_task.exception() is None:
+            await delete_blob(
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+                storage_blob_name=f"{videoupload_guid}/video.{blob_file_type}",
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+        await dedup_index.add_alias(
+            guid=videoupload_guid,
+            prior_guid=prior_guid,
+            content_md5=content_md5,
+            storage_container_name=settings.STORAGE_CONTAINER_RESULTS_NAME,
+        )
+        await delete_blob(
+            storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+            storage_container_name=client.container_name,
+            storage_blob_name=client.blob_name,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
+        logging.info(
+            f"Skipped processing of '{client.blob_name}', results are available for run '{prior_guid}' ({dedup_index.get_metrics()})."
+        )
+
+    try:
+        audio_file_name = f"audio.wav"
+        download_directory_path = os.path.join(
+            settings.HOME_DIRECTORY, videoupload_guid
+        )
+        hash_object = hashlib.md5() if content_md5 is None else None
+        result_upload_blob = None
+
+        # Stream audio from video into storage without local files
+        if settings.VIDEO_INGEST_MODE == "stream":
+            video_chunks = iter_blob_chunks(
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=client.container_name,
+                storage_blob_name=unquote(client.blob_name),
+                chunk_size=settings.STORAGE_DOWNLOAD_CHUNK_SIZE,
+                max_concurrency=settings.STORAGE_DOWNLOAD_MAX_CONCURRENCY,
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+            first_video_chunk = await anext(video_chunks, b"")
+
+            async def iter_video_chunks() -> AsyncIterator[bytes]:
+                chunk = first_video_chunk
+                while chunk:
+                    if hash_object is not None:
+                        hash_object.update(chunk)
+                    yield chunk
+                    chunk = await anext(video_chunks, b"")
+
+            try:
+                if is_streamable_media(
+                    data=first_video_chunk, file_type=blob_file_type
+                ):
+                    logging.info(f"Stream audio from video into storage.")
+                    result_upload_blob = await extract_audio_from_video_stream(
+                        data=iter_video_chunks(),
+                        storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                        storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+                        storage_blob_name=f"{videoupload_guid}/{audio_file_name}",
+                        sample_rate=settings.VIDEO_AUDIO_SAMPLE_RATE,
+                        channels=settings.VIDEO_AUDIO_CHANNELS,
+                        codec=settings.VIDEO_AUDIO_CODEC,
+                        block_size=settings.STORAGE_UPLOAD_BLOCK_SIZE,
+                        max_concurrency=settings.STORAGE_UPLOAD_MAX_CONCURRENCY,
+                        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+                    )
+                else:
+                    logging.info(
+                        f"Video '{client.blob_name}' cannot be decoded from a stream, falling back to file ingest."
+                    )
+            except RuntimeError as e:
+                logging.warning(
+                    f"Streaming ingest of '{client.blob_name}' failed, falling back to file ingest: {e}"
+                )
+                hash_object = hashlib.md5() if content_md5 is None else None
+            finally:
+                await video_chunks.aclose()
+
+        # Download video and extract audio on local storage
+        if result_upload_blob is None:
+            # Download blob to local storage async
+            logging.info(f"Download video for preprocessing.")
+            download_file_path = os.path.join(
+                download_directory_path, f"video.{blob_file_type}"
+            )
+            result_download_blob = await download_blob(
+                file_path=download_file_path,
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=client.container_name,
+                storage_blob_name=client.blob_name,
+                chunk_size=settings.STORAGE_DOWNLOAD_CHUNK_SIZE,
+                max_concurrency=settings.STORAGE_DOWNLOAD_MAX_CONCURRENCY,
+                hash_object=hash_object,
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+            logging.info(f"Downloaded blob to '{result_download_blob}'.")
+
+            # Check whether the same content was processed before based on the downloaded bytes
+            if hash_object is not None:
+                content_md5 = hash_object.hexdigest()
+                prior_guid = (
+                    await dedup_index.get_guid(content_md5=content_md5)
+                    if settings.VIDEO_DEDUPLICATION_ENABLED
+                    else None
+                )
+                if prior_guid:
+                    delete_directory(directory_path=download_directory_path)
+                    await skip_duplicate(prior_guid=prior_guid, content_md5=content_md5)
+                    return
+
+            # Extract audio from video
+            logging.info(f"Extract audio from video.")
+            result_extract_audio_from_video = await media_execution_pool.run(
+                extract_audio_from_video,
+                file_path=result_download_blob,
+                audio_file_name=audio_file_name,
+                sample_rate=settings.VIDEO_AUDIO_SAMPLE_RATE,
+                channels=settings.VIDEO_AUDIO_CHANNELS,
+                codec=settings.VIDEO_AUDIO_CODEC,
+                timeout=settings.MEDIA_EXECUTION_TIMEOUT,
+            )
+            logging.info(
+                f"Extracted audio in media execution pool ({media_execution_pool.get_metrics()})."
+            )
+
+            # Upload audio blob
+            logging.info(f"Upload audio blob to storage.")
+            result_upload_blob = await upload_blob(
+                file_path=result_extract_audio_from_video,
+                storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+                storage_blob_name=f"{videoupload_guid}/{audio_file_name}",
+                block_size=settings.STORAGE_UPLOAD_BLOCK_SIZE,
+                max_concurrency=settings.STORAGE_UPLOAD_MAX_CONCURRENCY,
+                managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+            )
+
+            # Cleanup local files
+            logging.info(f"Cleanup local files.")
+            delete_directory(directory_path=download_directory_path)
 
-    # Upload audio blob
-    logging.info(f"Upload audio blob to storage.")
-    result_upload_blob = await upload_blob(
-        file_path=result_extract_audio_from_video,
+        # Check whether the same content was processed before based on the streamed bytes
+        elif hash_object is not None:
+            content_md5 = hash_object.hexdigest()
+            prior_guid = (
+                await dedup_index.get_guid(content_md5=content_md5)
+                if settings.VIDEO_DEDUPLICATION_ENABLED
+                else None
+            )
+            if prior_guid:
+                await delete_blob(
+                    storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+                    storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+                    storage_blob_name=f"{videoupload_guid}/{audio_file_name}",
+                    managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+                )
+                await skip_duplicate(prior_guid=prior_guid, content_md5=content_md5)
+                return
+    except BaseException:
+        copy_blob_task.cancel()
+        await asyncio.gather(copy_blob_task, return_exceptions=True)
+        raise
+
+    # Wait for copy activity and remove blob from upload location
+    logging.info(f"Wait for copy activity to finish.")
+    local_pipeline_duration = time.perf_counter() - ingest_start_time
+    result_copy_blob = await copy_blob_task
+    await delete_blob(
         storage_domain_name=f"{client.account_name}.blob.core.windows.net",
-        storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
-        storage_blob_name=f"{videoupload_guid}/{audio_file_name}",
+        storage_container_name=client.container_name,
+        storage_blob_name=client.blob_name,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
+    ingest_duration = time.perf_counter() - ingest_start_time
+    logging.info(
+        f"Finished ingest of '{videoupload_guid}' in {ingest_duration:.2f}s (local pipeline: {local_pipeline_duration:.2f}s, waiting for copy: {ingest_duration - local_pipeline_duration:.2f}s, copy requests: {result_copy_blob.request_count})."
+    )
+
+    # Remove non-speech audio
+    transcription_storage_blob_name = f"{videoupload_guid}/{audio_file_name}"
+    transcription_blob_url = result_upload_blob
+    result_remove_non_speech_audio = None
+    if settings.VOICE_ACTIVITY_DETECTION_ENABLED:
+        logging.info(f"Remove non-speech audio.")
+        result_remove_non_speech_audio = await remove_non_speech_audio(
+            storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+            storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+            storage_blob_name=transcription_storage_blob_name,
+            sink_storage_blob_name=f"{videoupload_guid}/audio.speech.wav",
+            min_removed_ratio=settings.VOICE_ACTIVITY_MIN_REMOVED_PERCENTAGE / 100,
+            block_size=settings.STORAGE_UPLOAD_BLOCK_SIZE,
+            max_concurrency=settings.STORAGE_UPLOAD_MAX_CONCURRENCY,
+            timeout=settings.MEDIA_EXECUTION_TIMEOUT,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
+        _ = await upload_string(
+            data=result_remove_non_speech_audio.model_dump_json(),
+            storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+            storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+            storage_blob_name=f"{videoupload_guid}/audio.speech.json",
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
+        if result_remove_non_speech_audio.url:
+            transcription_storage_blob_name = (
+                result_remove_non_speech_audio.storage_blob_name
+            )
+            transcription_blob_url = result_remove_non_speech_audio.url
+        else:
+            result_remove_non_speech_audio = None
 
-    # Cleanup local files
-    logging.info(f"Cleanup local files.")
-    delete_directory(directory_path=download_directory_path)
+    # Split audio into segments which are transcribed in parallel
+    audio_segments = []
+    if settings.TRANSCRIPTION_SEGMENT_DURATION:
+        logging.info(f"Split audio into segments.")
+        audio_segments = await create_audio_segments(
+            storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+            storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+            storage_blob_name=transcription_storage_blob_name,
+            segment_duration=settings.TRANSCRIPTION_SEGMENT_DURATION,
+            overlap_duration=settings.TRANSCRIPTION_SEGMENT_OVERLAP_DURATION,
+            silence_search_duration=settings.TRANSCRIPTION_SILENCE_SEARCH_DURATION,
+            block_size=settings.STORAGE_UPLOAD_BLOCK_SIZE,
+            max_concurrency=settings.STORAGE_UPLOAD_MAX_CONCURRENCY,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
 
-    # Create AI Speech STT batch job
+    # Create AI Speech STT batch jobs
     logging.info(f"Create AI Speech STT batch job.")
     speech_client = SpeechClient(
         azure_ai_speech_resource_id=settings.AZURE_AI_SPEECH_RESOURCE_ID,
         azure_ai_speech_base_url=settings.AZURE_AI_SPEECH_BASE_URL,
         azure_ai_speech_api_version=settings.AZURE_AI_SPEECH_API_VERSION,
         azure_ai_speech_primary_access_key=settings.AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY,
+        requests_per_second=settings.AZURE_AI_SPEECH_REQUESTS_PER_SECOND,
+        max_concurrency=settings.AZURE_AI_SPEECH_MAX_CONCURRENCY,
+        batch_window=settings.TRANSCRIPTION_BATCH_WINDOW,
+        batch_max_size=settings.TRANSCRIPTION_BATCH_MAX_SIZE,
         managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
     )
-    result_create_transcription_job = await speech_client.create_transcription_job(
+    result_submit_transcriptions = await asyncio.gather(
+        *[
+            speech_client.submit_transcription(
+                guid=f"{videoupload_guid}-{audio_segment.index}",
+                blob_url=audio_segment.url,
+                locale=settings.MAIN_CONTENT_LANGUAGE,
+            )
+            for audio_segment in audio_segments
+        ]
+        or [
+            speech_client.submit_transcription(
+                guid=videoupload_guid,
+                blob_url=transcription_blob_url,
+                locale=settings.MAIN_CONTENT_LANGUAGE,
+            )
+        ]
+    )
+    logging.info(
+        f"Submitted transcriptions {result_submit_transcriptions} ({speech_client.get_batch_metrics()})."
+    )
+
+    # Persist transcription job which is completed by the completion stage
+    logging.info(f"Persist AI Speech STT batch job for completion.")
+    intermediate_storage_blob_names = [
+        audio_segment.storage_blob_name for audio_segment in audio_segments
+    ]
+    if result_remove_non_speech_audio:
+        intermediate_storage_blob_names.append(
+            result_remove_non_speech_audio.storage_blob_name
+        )
+    transcription_job_store = TranscriptionJobStore(
+        storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+        storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+        initial_check_interval=settings.TRANSCRIPTION_COMPLETION_INITIAL_CHECK_INTERVAL,
+        max_check_interval=settings.TRANSCRIPTION_COMPLETION_MAX_CHECK_INTERVAL,
+        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+    )
+    transcription_job = transcription_job_store.create_job(
         guid=videoupload_guid,
-        blob_url=result_upload_blob,
-        locale=settings.MAIN_CONTENT_LANGUAGE,
+        storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+        source_url=result_upload_blob,
+        content_md5=content_md5,
+        transcriptions=result_submit_transcriptions,
+        audio_segments=audio_segments,
+        speech_regions=(
+            result_remove_non_speech_audio.speech_regions
+            if result_remove_non_speech_audio
+            else None
+        ),
+        intermediate_storage_blob_names=intermediate_storage_blob_names,
     )
+    await transcription_job_store.save_job(job=transcription_job)
+
+    logging.info(f"Submitted Function run '{videoupload_guid}' successfully.")
+
+
+async def fail_transcription_job(
+    job: TranscriptionJob,
+    transcription_job_store: TranscriptionJobStore,
+    error_message: str,
+    error_details: Any = None,
+) -> None:
+    """Stores an error record in place of the results of a transcription job and removes the job record.
+
+    The upload of the video has been removed at submission already, so the error record at
+    `<guid>/error.json` in the results container is the only trace of a failed run.
 
-    # Check AI Speech STT batch job
-    logging.info(f"Check AI Speech STT batch job.")
-    status = "Unknown"
-    while status not in ["Succeeded", "Failed", None]:
-        await asyncio.sleep(1)
-        status = await speech_client.get_transcription_job_status(
-            transcription_id=result_create_transcription_job,
+    job (TranscriptionJob): Specifies the transcription job.
+    transcription_job_store (TranscriptionJobStore): Specifies the store of the transcription job.
+    error_message (str): Specifies the reason of the failure.
+    error_details (Any): Specifies details of the failure.
+    RETURNS (None): No return values.
+    """
+    _ = await upload_string(
+        data=ErrorModel(
+            error_code=500,
+            error_message=error_message,
+            error_details=error_details,
+        ).model_dump_json(),
+        storage_domain_name=job.storage_domain_name,
+        storage_container_name=settings.STORAGE_CONTAINER_RESULTS_NAME,
+        storage_blob_name=f"{job.guid}/error.json",
+        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+    )
+    await transcription_job_store.delete_job(job=job)
+
+
+async def complete_transcription_job(
+    job: TranscriptionJob,
+    transcription_job_store: TranscriptionJobStore,
+    speech_client: SpeechClient,
+) -> bool:
+    """Checks the batch transcription jobs of a video and stores the transcriptions once they succeeded.
+
+    job (TranscriptionJob): Specifies the transcription job.
+    transcription_job_store (TranscriptionJobStore): Specifies the store of the transcription job.
+    speech_client (SpeechClient): Specifies the speech client used to check the transcription jobs.
+    RETURNS (bool): Returns whether the transcriptions were stored. Returns `False` if the job is still running and raises `TranscriptionJobFailedError` if it failed.
+    """
+    # Check AI Speech STT batch jobs, which may be shared with other runs
+    logging.info(f"Check AI Speech STT batch jobs of run '{job.guid}'.")
+    transcription_ids = list(
+        dict.fromkeys(
+            transcription.transcription_id for transcription in job.transcriptions
         )
+    )
+    result_get_transcription_job_statuses = await asyncio.gather(
+        *[
+            speech_client.get_transcription_job_status(
+                transcription_id=transcription_id,
+            )
+            for transcription_id in transcription_ids
+        ]
+    )
+    statuses = dict(zip(transcription_ids, result_get_transcription_job_statuses))
+    for transcription_id, status in statuses.items():
         logging.info(
-            f"Current status for transaction id '{result_create_transcription_job}' is '{status}'."
+            f"Current status for transaction id '{transcription_id}' is '{status}'."
+        )
+    if any(status not in ["Succeeded", "Failed", None] for status in statuses.values()):
+        await transcription_job_store.reschedule_job(job=job)
+        return False
+
+    # Remove intermediate audio files, which may have been removed by a previous attempt already
+    async def delete_intermediate_blobs() -> None:
+        _ = await asyncio.gather(
+            *[
+                delete_blob(
+                    storage_domain_name=job.storage_domain_name,
+                    storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+                    storage_blob_name=storage_blob_name,
+                    managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+                )
+                for storage_blob_name in job.intermediate_storage_blob_names
+            ],
+            return_exceptions=True,
         )
 
     # Check final status
-    logging.info(
-        f"Check final status of batch transcription job {result_create_transcription_job}"
-    )
-    if status != "Succeeded":
-        message = f"Batch transcription job '{result_create_transcription_job}' failed."
+    logging.info(f"Check final status of batch transcription jobs {statuses}")
+    failed_transcription_ids = [
+        transcription_id
+        for transcription_id, status in statuses.items()
+        if status != "Succeeded"
+    ]
+    if failed_transcription_ids:
+        await delete_intermediate_blobs()
+        message = f"Batch transcription jobs '{failed_transcription_ids}' of run '{job.guid}' failed."
+        await fail_transcription_job(
+            job=job,
+            transcription_job_store=transcription_job_store,
+            error_message=message,
+            error_details={
+                transcription_id: statuses[transcription_id]
+                for transcription_id in failed_transcription_ids
+            },
+        )
         logging.error(message)
-        raise Exception(message)
+        raise TranscriptionJobFailedError(message)
 
-    # Get batch transcription file list
+    # Get batch transcription files of the audio files of this run
     logging.info("Get batch transcription file list.")
-    result_get_transcription_job_file_list = (
-        await speech_client.get_transcription_job_file_list(
-            transcription_id=result_create_transcription_job
+    result_get_transcription_job_files = dict(
+        zip(
+            transcription_ids,
+            await asyncio.gather(
+                *[
+                    speech_client.get_transcription_job_files(
+                        transcription_id=transcription_id
+                    )
+                    for transcription_id in transcription_ids
+                ]
+            ),
         )
     )
+    missing_transcriptions = [
+        transcription
+        for transcription in job.transcriptions
+        if transcription.content_index
+        not in result_get_transcription_job_files[transcription.transcription_id]
+    ]
+    if missing_transcriptions:
+        message = f"Batch transcription files {missing_transcriptions} of run '{job.guid}' are missing."
+        logging.error(message)
+        raise Exception(message)
+    result_get_transcription_job_file_list = [
+        result_get_transcription_job_files[transcription.transcription_id][
+            transcription.content_index
+        ]
+        for transcription in job.transcriptions
+    ]
 
     # Upload files to storage
     logging.info("Upload files to storage")
-    for index, item in enumerate(result_get_transcription_job_file_list):
-        _ = await copy_blob_from_url(
-            source_url=item,
-            sink_storage_domain_name=f"{client.account_name}.blob.core.windows.net",
+    if job.audio_segments or job.speech_regions is not None:
+        # Load transcriptions
+        result_load_urls = await asyncio.gather(
+            *[load_url(url=item) for item in result_get_transcription_job_file_list]
+        )
+        result_stts = [json.loads(item) for item in result_load_urls]
+
+        # Merge transcriptions of segments
+        if job.audio_segments:
+            result_stts = [
+                merge_stt_results(
+                    result_stts=result_stts,
+                    audio_segments=job.audio_segments,
+                    source=job.source_url,
+                )
+            ]
+
+        # Map offsets of trimmed audio to original audio
+        if job.speech_regions is not None:
+            result_stts = [
+                remap_stt_result(
+                    result_stt=result_stt,
+                    speech_regions=job.speech_regions,
+                )
+                for result_stt in result_stts
+            ]
+
+        if settings.STORAGE_ARTIFACT_COMPRESSION:
+            result_stts = [
+                compact_stt_result(result_stt=result_stt) for result_stt in result_stts
+            ]
+        _ = await asyncio.gather(
+            *[
+                upload_string(
+                    data=json.dumps(result_stt),
+                    storage_domain_name=job.storage_domain_name,
+                    storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_ANALYSIS_SPEECH_NAME,
+                    storage_blob_name=f"{job.guid}/speech{index}.json",
+                    content_encoding=settings.STORAGE_ARTIFACT_COMPRESSION,
+                    managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+                )
+                for index, result_stt in enumerate(result_stts)
+            ]
+        )
+    elif settings.STORAGE_ARTIFACT_COMPRESSION:
+        _ = await asyncio.gather(
+            *[
+                upload_compacted_stt_result(
+                    source_url=item,
+                    sink_storage_domain_name=job.storage_domain_name,
+                    sink_storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_ANALYSIS_SPEECH_NAME,
+                    sink_storage_blob_name=f"{job.guid}/speech{index}.json",
+                    content_encoding=settings.STORAGE_ARTIFACT_COMPRESSION,
+                    managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+                )
+                for index, item in enumerate(result_get_transcription_job_file_list)
+            ]
+        )
+    else:
+        result_copy_blobs_from_url = await copy_blobs_from_url(
+            items=[
+                (item, f"{job.guid}/speech{index}.json")
+                for index, item in enumerate(result_get_transcription_job_file_list)
+            ],
+            sink_storage_domain_name=job.storage_domain_name,
             sink_storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_ANALYSIS_SPEECH_NAME,
-            sink_storage_blob_name=f"{videoupload_guid}/speech{index}.json",
+            max_concurrency=settings.STORAGE_COPY_MAX_CONCURRENCY,
             managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
         )
+        failed_copies = [
+            result.sink_storage_blob_name
+            for result in result_copy_blobs_from_url
+            if not result.succeeded
+        ]
+        if failed_copies:
+            message = f"Failed to copy transcription files {failed_copies} to storage."
+            logging.error(message)
+            raise Exception(message)
+    await delete_intermediate_blobs()
+
+    # Add content to deduplication index
+    if settings.VIDEO_DEDUPLICATION_ENABLED and job.content_md5:
+        dedup_index = DedupIndex(
+            storage_domain_name=job.storage_domain_name,
+            storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+            managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+        )
+        await dedup_index.add_guid(content_md5=job.content_md5, guid=job.guid)
+
+    # Remove job record
+    await transcription_job_store.delete_job(job=job)
+    duration = datetime.now(tz=timezone.utc) - job.created_time
+    logging.info(
+        f"Completed Function run '{job.guid}' successfully {duration.total_seconds():.0f}s after submission (checks: {job.check_count + 1})."
+    )
+    return True
 
-    logging.info(f"Completed Function run '{videoupload_guid}' successfully.")
+
+async def complete_transcription_jobs(
+    transcription_job_store: TranscriptionJobStore,
+    speech_client: SpeechClient,
+) -> None:
+    """Completes all due transcription jobs and retries failed completions with backoff.
+
+    transcription_job_store (TranscriptionJobStore): Specifies the store of the transcription jobs.
+    speech_client (SpeechClient): Specifies the speech client used to check the transcription jobs.
+    RETURNS (None): No return values.
+    """
+    jobs = await transcription_job_store.list_due_jobs()
+    semaphore = asyncio.Semaphore(settings.TRANSCRIPTION_COMPLETION_MAX_CONCURRENCY)
+
+    async def complete_job(job: TranscriptionJob) -> bool:
+        async with semaphore:
+            try:
+                return await complete_transcription_job(
+                    job=job,
+                    transcription_job_store=transcription_job_store,
+                    speech_client=speech_client,
+                )
+            except TranscriptionJobFailedError:
+                raise
+            except Exception as e:
+                # Retry failed completions with backoff until the transcriptions expire
+                duration = datetime.now(tz=timezone.utc) - job.created_time
+                if duration.total_seconds() > settings.TRANSCRIPTION_COMPLETION_TIMEOUT:
+                    message = f"Giving up completion of run '{job.guid}' after {duration.total_seconds():.0f}s: {e}"
+                    logging.error(message)
+                    await fail_transcription_job(
+                        job=job,
+                        transcription_job_store=transcription_job_store,
+                        error_message=message,
+                    )
+                else:
+                    logging.warning(f"Completion of run '{job.guid}' failed: {e}")
+                    await transcription_job_store.reschedule_job(job=job)
+                raise
+
+    result_complete_jobs = await asyncio.gather(
+        *[complete_job(job=job) for job in jobs], return_exceptions=True
+    )
+    failed_guids = [
+        job.guid
+        for job, result in zip(jobs, result_complete_jobs)
+        if isinstance(result, BaseException)
+    ]
+    logging.info(
+        f"Completed {sum(result is True for result in result_complete_jobs)} of {len(jobs)} due transcription job(s) with speech client metrics {speech_client.get_metrics()}, rate limits {speech_client.get_rate_governor_metrics()} and token cache metrics {token_cache.get_metrics()}."
+    )
+    if failed_guids:
+        message = f"Completion of runs {failed_guids} failed."
+        logging.error(message)
+        raise Exception(message)
+
+
+@bp.function_name("VideoUploadCompletion")
+@bp.timer_trigger(
+    arg_name="timer",
+    schedule=settings.TRANSCRIPTION_COMPLETION_SCHEDULE,
+    run_on_startup=False,
+)
+async def complete_video_uploads(timer: func.TimerRequest) -> None:
+    logging.info("Video upload completion triggered.")
+
+    # Initialize
+    transcription_job_store = TranscriptionJobStore(
+        storage_domain_name=settings.STORAGE_DOMAIN_NAME,
+        storage_container_name=settings.STORAGE_CONTAINER_INTERNAL_VIDEOS_NAME,
+        initial_check_interval=settings.TRANSCRIPTION_COMPLETION_INITIAL_CHECK_INTERVAL,
+        max_check_interval=settings.TRANSCRIPTION_COMPLETION_MAX_CHECK_INTERVAL,
+        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+    )
+    speech_client = SpeechClient(
+        azure_ai_speech_resource_id=settings.AZURE_AI_SPEECH_RESOURCE_ID,
+        azure_ai_speech_base_url=settings.AZURE_AI_SPEECH_BASE_URL,
+        azure_ai_speech_api_version=settings.AZURE_AI_SPEECH_API_VERSION,
+        azure_ai_speech_primary_access_key=settings.AZURE_AI_SPEECH_PRIMARY_ACCESS_KEY,
+        requests_per_second=settings.AZURE_AI_SPEECH_REQUESTS_PER_SECOND,
+        max_concurrency=settings.AZURE_AI_SPEECH_MAX_CONCURRENCY,
+        managed_identity_client_id=settings.MANAGED_IDENTITY_CLIENT_ID,
+    )
+
+    # Complete due transcription jobs
+    await complete_transcription_jobs(
+        transcription_job_store=transcription_job_store,
+        speech_client=speech_client,
+    )
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from azure.core.exceptions import ResourceNotFoundError
+from shared.utils import delete_blob, list_blobs, load_blob, upload_string
+from videoupload.models import TranscriptionJob
+
+
+class TranscriptionJobFailedError(Exception):
+    # Raised for transcription jobs that failed permanently and must not be retried
+    pass
+
+
+class TranscriptionJobStore:
+    def __init__(
+        self,
+        storage_domain_name: str,
+        storage_container_name: str,
+        storage_prefix: str = "jobs",
+        initial_check_interval: float = 15.0,
+        max_check_interval: float = 300.0,
+        managed_identity_client_id: str = None,
+    ) -> None:
+        """Initializes the store of submitted transcription jobs which are awaiting completion.
+
+        Every job is checkpointed as a blob named `<storage_prefix>/<guid>.json`. The completion stage
+        only checks jobs whose `next_check_time` has passed and doubles the check interval after every
+        check, starting with `initial_check_interval` and capped at `max_check_interval`.
+
+        storage_domain_name (str): The domain name of the storage account.
+        storage_container_name (str): The container name of the storage account.
+        storage_prefix (str): Specifies the prefix of the job records.
+        initial_check_interval (float): Specifies the seconds until the first status check of a job.
+        max_check_interval (float): Specifies the maximum seconds between two status checks of a job.
+        managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+        RETURNS (None): No return values.
+        """
+        self.storage_domain_name = storage_domain_name
+        self.storage_container_name = storage_container_name
+        self.storage_prefix = storage_prefix
+        self.initial_check_interval = initial_check_interval
+        self.max_check_interval = max_check_interval
+        self.managed_identity_client_id = managed_identity_client_id
+
+    def get_check_interval(self, check_count: int) -> float:
+        """Returns the seconds until the next status check of a job.
+
+        check_count (int): Specifies the number of status checks of the job so far.
+        RETURNS (float): Returns the seconds until the next status check.
+        """
+        return min(
+            self.initial_check_interval * 2 ** min(check_count, 32),
+            self.max_check_interval,
+        )
+
+    def create_job(self, **kwargs) -> TranscriptionJob:
+        """Creates the record of a submitted transcription job that is due for its first check.
+
+        kwargs (Any): Specifies the fields of the transcription job.
+        RETURNS (TranscriptionJob): Returns the transcription job.
+        """
+        created_time = datetime.now(tz=timezone.utc)
+        return TranscriptionJob(
+            created_time=created_time,
+            next_check_time=created_time
+            + timedelta(seconds=self.get_check_interval(check_count=0)),
+            check_count=0,
+            **kwargs,
+        )
+
+    async def save_job(self, job: TranscriptionJob) -> None:
+        """Persists the record of a transcription job.
+
+        job (TranscriptionJob): Specifies the transcription job.
+        RETURNS (None): No return values.
+        """
+        await upload_string(
+            data=job.model_dump_json(),
+            storage_domain_name=self.storage_domain_name,
+            storage_container_name=self.storage_container_name,
+            storage_blob_name=f"{self.storage_prefix}/{job.guid}.json",
+            managed_identity_client_id=self.managed_identity_client_id,
+        )
+
+    async def reschedule_job(self, job: TranscriptionJob) -> TranscriptionJob:
+        """Persists the record of a transcription job that is still running with an increased check interval.
+
+        job (TranscriptionJob): Specifies the transcription job.
+        RETURNS (TranscriptionJob): Returns the rescheduled transcription job.
+        """
+        check_count = job.check_count + 1
+        check_interval = self.get_check_interval(check_count=check_count)
+        job = job.model_copy(
+            update={
+                "check_count": check_count,
+                "next_check_time": datetime.now(tz=timezone.utc)
+                + timedelta(seconds=check_interval),
+            }
+        )
+        logging.info(
+            f"Rescheduled transcription job '{job.guid}' in {check_interval:.0f}s (checks: {check_count})."
+        )
+        await self.save_job(job=job)
+        return job
+
+    async def list_due_jobs(self, now: datetime = None) -> List[TranscriptionJob]:
+        """Returns the transcription jobs which are due for a status check.
+
+        now (datetime): Specifies the current time. Defaults to the current utc time.
+        RETURNS (List[TranscriptionJob]): Returns the due transcription jobs ordered by creation time.
+        """
+        now = now or datetime.now(tz=timezone.utc)
+        storage_blob_names = await list_blobs(
+            storage_domain_name=self.storage_domain_name,
+            storage_container_name=self.storage_container_name,
+            name_starts_with=f"{self.storage_prefix}/",
+            managed_identity_client_id=self.managed_identity_client_id,
+        )
+        result_load_blobs = await asyncio.gather(
+            *[
+                load_blob(
+                    storage_domain_name=self.storage_domain_name,
+                    storage_container_name=self.storage_container_name,
+                    storage_blob_name=storage_blob_name,
+                    managed_identity_client_id=self.managed_identity_client_id,
+                )
+                for storage_blob_name in storage_blob_names
+                if storage_blob_name.endswith(".json")
+            ],
+            return_exceptions=True,
+        )
+        jobs = []
+        for result_load_blob in result_load_blobs:
+            # Records may be completed by a concurrent run in between listing and loading
+            if isinstance(result_load_blob, ResourceNotFoundError):
+                continue
+            elif isinstance(result_load_blob, BaseException):
+                raise result_load_blob
+            job = TranscriptionJob.model_validate_json(result_load_blob)
+            if job.next_check_time <= now:
+                jobs.append(job)
+        logging.info(
+            f"Found {len(jobs)} due transcription job(s) out of {len(result_load_blobs)}."
+        )
+        return sorted(jobs, key=lambda job: job.created_time)
+
+    async def delete_job(self, job: TranscriptionJob) -> None:
+        """Deletes the record of a transcription job.
+
+        job (TranscriptionJob): Specifies the transcription job.
+        RETURNS (None): No return values.
+        """
+        await delete_blob(
+            storage_domain_name=self.storage_domain_name,
+            storage_container_name=self.storage_container_name,
+            storage_blob_name=f"{self.storage_prefix}/{job.guid}.json",
+            managed_identity_client_id=self.managed_identity_client_id,
+        )
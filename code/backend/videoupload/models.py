@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DedupIndexMetrics(BaseModel):
+    hits: int
+    misses: int
+
+
+class WavFormat(BaseModel):
+    data_offset: int
+    data_size: int
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+
+
+class AudioSegment(BaseModel):
+    index: int
+    url: str
+    storage_blob_name: str
+    start_in_ticks: int
+    keep_start_in_ticks: int
+    keep_end_in_ticks: int
+
+
+class SpeechRegion(BaseModel):
+    original_start_in_ticks: int
+    trimmed_start_in_ticks: int
+    duration_in_ticks: int
+
+
+class VoiceActivityResult(BaseModel):
+    url: Optional[str]
+    storage_blob_name: Optional[str]
+    speech_regions: List[SpeechRegion]
+    original_duration_in_seconds: float
+    trimmed_duration_in_seconds: float
+    removed_percentage: float
+
+
+class TranscriptionReference(BaseModel):
+    transcription_id: str
+    content_index: int
+
+
+class SpeechBatchMetrics(BaseModel):
+    batches: int
+    items: int
+    max_batch_size: int
+    mean_batch_size: float
+    mean_wait_time_in_seconds: float
+    max_wait_time_in_seconds: float
+
+
+class TranscriptionJob(BaseModel):
+    guid: str
+    storage_domain_name: str
+    source_url: str
+    content_md5: Optional[str]
+    transcriptions: List[TranscriptionReference]
+    audio_segments: List[AudioSegment]
+    speech_regions: Optional[List[SpeechRegion]]
+    intermediate_storage_blob_names: List[str]
+    created_time: datetime
+    next_check_time: datetime
+    check_count: int = 0
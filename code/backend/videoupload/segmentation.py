@@ -0,0 +1,380 @@
+import asyncio
+import copy
+import functools
+import logging
+import struct
+from typing import Any, Dict, List
+
+import numpy as np
+from shared.duration import TICKS_PER_SECOND, format_duration, get_ticks
+from shared.utils import get_blob_properties, iter_blob_chunks, upload_stream
+from videoupload.models import AudioSegment, WavFormat
+from videoupload.utils import get_wav_header
+
+# 24-bit samples are unpacked to 32-bit integers, since numpy has no 24-bit integer type
+WAV_SAMPLE_DTYPES = {
+    8: np.uint8,
+    16: np.dtype("<i2"),
+    24: np.dtype("<i4"),
+    32: np.dtype("<i4"),
+}
+
+
+def set_ticks(item: Dict[str, Any], key: str, ticks: int) -> None:
+    """Updates all notations of the offset or duration of a recognized phrase or word.
+
+    item (Dict[str, Any]): Specifies the recognized phrase or word.
+    key (str): Specifies the property ('offset' or 'duration').
+    ticks (int): Specifies the offset or duration in ticks.
+    RETURNS (None): No return values.
+    """
+    item[key] = format_duration(ticks=ticks)
+    if f"{key}InTicks" in item:
+        item[f"{key}InTicks"] = float(ticks)
+    if f"{key}Milliseconds" in item:
+        item[f"{key}Milliseconds"] = round(ticks / 10_000)
+
+
+def parse_wav_header(data: bytes, size: int = None) -> WavFormat:
+    """Parses the header of a PCM wav file.
+
+    data (bytes): Specifies the first bytes of the wav file including the header.
+    size (int): Specifies the size of the wav file in bytes to correct the size of streamed wav files.
+    RETURNS (WavFormat): The format and position of the PCM data.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        message = "Audio file is not a wav file."
+        logging.error(message)
+        raise ValueError(message)
+
+    # Iterate over chunks
+    offset = 12
+    format_chunk = None
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack("<4sI", data[offset : offset + 8])
+        if chunk_id == b"fmt ":
+            format_chunk = struct.unpack("<HHIIHH", data[offset + 8 : offset + 24])
+        elif chunk_id == b"data":
+            if format_chunk is None or format_chunk[0] not in [1, 0xFFFE]:
+                break
+            data_offset = offset + 8
+            data_size = (
+                chunk_size if size is None else min(chunk_size, size - data_offset)
+            )
+            return WavFormat(
+                data_offset=data_offset,
+                data_size=data_size,
+                sample_rate=format_chunk[2],
+                channels=format_chunk[1],
+                bits_per_sample=format_chunk[5],
+            )
+        offset += 8 + chunk_size + chunk_size % 2
+
+    message = "Unable to find PCM data in wav file."
+    logging.error(message)
+    raise ValueError(message)
+
+
+def get_wav_samples(data: bytes, wav_format: WavFormat, count: int) -> Any:
+    """Returns the samples of PCM data centered around zero.
+
+    data (bytes): Specifies the PCM data.
+    wav_format (WavFormat): Specifies the format of the PCM data.
+    count (int): Specifies the number of samples across all channels.
+    RETURNS (np.ndarray): The samples as float32 values in the range of the sample width.
+    """
+    if wav_format.bits_per_sample == 24:
+        # Shift the little endian bytes into the upper bytes of 32-bit integers to keep the sign
+        data_bytes = np.frombuffer(data, dtype=np.uint8, count=count * 3)
+        samples = np.zeros((count, 4), dtype=np.uint8)
+        samples[:, 1:] = data_bytes.reshape(count, 3)
+        return (samples.view(WAV_SAMPLE_DTYPES[24])[:, 0] >> 8).astype(np.float32)
+    samples = np.frombuffer(
+        data, dtype=WAV_SAMPLE_DTYPES[wav_format.bits_per_sample], count=count
+    ).astype(np.float32)
+    if wav_format.bits_per_sample == 8:
+        samples -= 128
+    return samples
+
+
+def find_quietest_frame(
+    data: bytes, wav_format: WavFormat, frame_duration: float = 0.02
+) -> int:
+    """Returns the start of the frame with the lowest energy in PCM data.
+
+    data (bytes): Specifies the PCM data.
+    wav_format (WavFormat): Specifies the format of the PCM data.
+    frame_duration (float): Specifies the duration of a frame in seconds.
+    RETURNS (int): The index of the first sample of the quietest frame relative to the start of the data.
+    """
+    frame_length = max(int(wav_format.sample_rate * frame_duration), 1)
+    block_align = wav_format.channels * wav_format.bits_per_sample // 8
+    frame_count = len(data) // (block_align * frame_length)
+    if wav_format.bits_per_sample not in WAV_SAMPLE_DTYPES or frame_count == 0:
+        return 0
+
+    # Calculate energy of frames
+    samples = get_wav_samples(
+        data=data,
+        wav_format=wav_format,
+        count=frame_count * frame_length * wav_format.channels,
+    )
+    frames = samples.reshape(frame_count, frame_length * wav_format.channels)
+    energy = np.mean(np.square(frames), axis=1)
+    return int(np.argmin(energy)) * frame_length
+
+
+async def create_audio_segments(
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    segment_duration: float,
+    overlap_duration: float = 4.0,
+    silence_search_duration: float = 20.0,
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    managed_identity_client_id: str = None,
+) -> List[AudioSegment]:
+    """Splits a PCM wav file in blob storage into overlapping segments which are cut in silent parts of the audio.
+
+    Cut points are searched around multiples of `segment_duration`. Each segment contains additional
+    `overlap_duration / 2` seconds of audio before and after its cut points, so that words at the cut
+    points are fully transcribed in both segments. Segments are copied by byte range and streamed
+    back to storage next to the source file without decoding the audio.
+
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the wav file.
+    segment_duration (float): Specifies the target duration of the segments in seconds.
+    overlap_duration (float): Specifies the duration in seconds by which consecutive segments overlap.
+    silence_search_duration (float): Specifies the duration in seconds around the target cut points in which the quietest frame is searched.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of concurrent requests per segment.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (List[AudioSegment]): The segments of the wav file. Empty if the audio fits into a single segment.
+    """
+    logging.info(f"Splitting audio file '{storage_blob_name}' into segments.")
+
+    async def load_range(offset: int, length: int) -> bytes:
+        return b"".join(
+            [
+                chunk
+                async for chunk in iter_blob_chunks(
+                    storage_domain_name=storage_domain_name,
+                    storage_container_name=storage_container_name,
+                    storage_blob_name=storage_blob_name,
+                    chunk_size=block_size,
+                    max_concurrency=max_concurrency,
+                    offset=offset,
+                    length=length,
+                    managed_identity_client_id=managed_identity_client_id,
+                )
+            ]
+        )
+
+    # Get format of wav file
+    blob_properties = await get_blob_properties(
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+    wav_format = parse_wav_header(
+        data=await load_range(offset=0, length=64 * 1024), size=blob_properties.size
+    )
+    block_align = wav_format.channels * wav_format.bits_per_sample // 8
+    sample_count = wav_format.data_size // block_align
+    segment_length = int(segment_duration * wav_format.sample_rate)
+    search_length = int(silence_search_duration * wav_format.sample_rate)
+    padding_length = int(overlap_duration * wav_format.sample_rate / 2)
+
+    # Find cut points in silent parts of the audio
+    cuts = [0]
+    while sample_count - cuts[-1] > segment_length + search_length:
+        search_start = cuts[-1] + segment_length - search_length // 2
+        search_data = await load_range(
+            offset=wav_format.data_offset + search_start * block_align,
+            length=search_length * block_align,
+        )
+        cuts.append(
+            search_start + find_quietest_frame(data=search_data, wav_format=wav_format)
+        )
+    cuts.append(sample_count)
+    if len(cuts) <= 2:
+        logging.info(
+            f"Audio file '{storage_blob_name}' is not split as it is shorter than {segment_duration}s."
+        )
+        return []
+    logging.info(
+        f"Cutting audio file at {[round(cut / wav_format.sample_rate, 2) for cut in cuts[1:-1]]}s."
+    )
+
+    def to_ticks(sample: int) -> int:
+        return round(sample * TICKS_PER_SECOND / wav_format.sample_rate)
+
+    async def create_audio_segment(index: int) -> AudioSegment:
+        start = max(cuts[index] - padding_length, 0)
+        end = min(cuts[index + 1] + padding_length, sample_count)
+        segment_storage_blob_name = (
+            f"{storage_blob_name.rsplit('.', 1)[0]}/segment{index}.wav"
+        )
+        url = await upload_stream(
+            data=iter_blob_chunks(
+                storage_domain_name=storage_domain_name,
+                storage_container_name=storage_container_name,
+                storage_blob_name=storage_blob_name,
+                chunk_size=block_size,
+                max_concurrency=max_concurrency,
+                offset=wav_format.data_offset + start * block_align,
+                length=(end - start) * block_align,
+                managed_identity_client_id=managed_identity_client_id,
+            ),
+            storage_domain_name=storage_domain_name,
+            storage_container_name=storage_container_name,
+            storage_blob_name=segment_storage_blob_name,
+            block_size=block_size,
+            max_concurrency=max_concurrency,
+            header=functools.partial(
+                get_wav_header,
+                sample_rate=wav_format.sample_rate,
+                channels=wav_format.channels,
+                bits_per_sample=wav_format.bits_per_sample,
+            ),
+            managed_identity_client_id=managed_identity_client_id,
+        )
+        return AudioSegment(
+            index=index,
+            url=url,
+            storage_blob_name=segment_storage_blob_name,
+            start_in_ticks=to_ticks(start),
+            keep_start_in_ticks=to_ticks(cuts[index]) if index > 0 else 0,
+            keep_end_in_ticks=(
+                to_ticks(cuts[index + 1]) if index < len(cuts) - 2 else 2**63 - 1
+            ),
+        )
+
+    # Upload segments
+    return await asyncio.gather(
+        *[create_audio_segment(index=index) for index in range(len(cuts) - 1)]
+    )
+
+
+def merge_stt_results(
+    result_stts: List[Any], audio_segments: List[AudioSegment], source: str = None
+) -> Any:
+    """Merges the Azure AI Speech STT batch transcriptions of audio segments into a single transcription.
+
+    Offsets are rebased onto the timeline of the original audio. Words that were recognized in the
+    overlap of two segments are only kept from the segment that contains the cut point on the same
+    side. Recognized phrases that span a cut point are reduced to the kept words and only the best
+    alternative of each recognized phrase is kept.
+
+    result_stts (List[Any]): Specifies the JSON content of the transcriptions of the segments.
+    audio_segments (List[AudioSegment]): Specifies the segments that were transcribed in the same order.
+    source (str): Specifies the url of the original audio file.
+    RETURNS (Any): The JSON content of the merged transcription.
+    """
+    recognized_phrases = []
+    for result_stt, audio_segment in zip(result_stts, audio_segments):
+        for recognized_phrase in result_stt.get("recognizedPhrases", []):
+            recognized_phrase_best = copy.deepcopy(
+                (recognized_phrase.get("nBest") or [{}])[0]
+            )
+            display_words = recognized_phrase_best.get("displayWords") or []
+            phrase_offset = (
+                get_ticks(item=recognized_phrase, key="offset")
+                + audio_segment.start_in_ticks
+            )
+            phrase_duration = get_ticks(item=recognized_phrase, key="duration")
+
+            # Rebase words and remove words outside of the segment
+            display_words_kept = []
+            for display_word in display_words:
+                word_offset = (
+                    get_ticks(item=display_word, key="offset")
+                    + audio_segment.start_in_ticks
+                )
+                if (
+                    audio_segment.keep_start_in_ticks
+                    <= word_offset
+                    < audio_segment.keep_end_in_ticks
+                ):
+                    set_ticks(item=display_word, key="offset", ticks=word_offset)
+                    display_words_kept.append(display_word)
+
+            if display_words:
+                if not display_words_kept:
+                    continue
+                elif len(display_words_kept) < len(display_words):
+                    first_word_offset = get_ticks(
+                        item=display_words_kept[0], key="offset"
+                    )
+                    phrase_duration = (
+                        get_ticks(item=display_words_kept[-1], key="offset")
+                        + get_ticks(item=display_words_kept[-1], key="duration")
+                        - first_word_offset
+                    )
+                    phrase_offset = first_word_offset
+                    recognized_phrase_best = {
+                        key: value
+                        for key, value in recognized_phrase_best.items()
+                        if key not in ["lexical", "itn", "maskedITN"]
+                    }
+                    recognized_phrase_best["display"] = " ".join(
+                        display_word.get("displayText", "")
+                        for display_word in display_words_kept
+                    )
+                recognized_phrase_best["displayWords"] = display_words_kept
+            elif not (
+                audio_segment.keep_start_in_ticks
+                <= phrase_offset + phrase_duration // 2
+                < audio_segment.keep_end_in_ticks
+            ):
+                continue
+
+            # Rebase recognized phrase
+            recognized_phrase_merged = {
+                key: value for key, value in recognized_phrase.items() if key != "nBest"
+            }
+            set_ticks(item=recognized_phrase_merged, key="offset", ticks=phrase_offset)
+            set_ticks(
+                item=recognized_phrase_merged, key="duration", ticks=phrase_duration
+            )
+            recognized_phrase_merged["nBest"] = [recognized_phrase_best]
+            recognized_phrases.append(recognized_phrase_merged)
+
+    # Sort recognized phrases
+    recognized_phrases.sort(
+        key=lambda item: (item.get("channel", 0), get_ticks(item=item, key="offset"))
+    )
+
+    # Combine recognized phrases per channel
+    channels = sorted({item.get("channel", 0) for item in recognized_phrases})
+    combined_recognized_phrases = [
+        {
+            "channel": channel,
+            "display": " ".join(
+                item["nBest"][0].get("display", "")
+                for item in recognized_phrases
+                if item.get("channel", 0) == channel
+            ),
+        }
+        for channel in channels
+    ]
+
+    # Calculate duration
+    duration = max(
+        [
+            get_ticks(item=item, key="offset") + get_ticks(item=item, key="duration")
+            for item in recognized_phrases
+        ],
+        default=0,
+    )
+    return {
+        "source": source or (result_stts[0].get("source") if result_stts else None),
+        "timestamp": result_stts[0].get("timestamp") if result_stts else None,
+        "durationInTicks": float(duration),
+        "duration": format_duration(ticks=duration),
+        "combinedRecognizedPhrases": combined_recognized_phrases,
+        "recognizedPhrases": recognized_phrases,
+    }
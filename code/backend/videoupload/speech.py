@@ -1,8 +1,156 @@
+import asyncio
 import logging
-from typing import Dict, List
+import re
+import time
+from typing import Dict, List, Tuple
 
 import httpx
-from shared.utils import get_azure_credential
+from shared.auth import token_cache
+from shared.http import http_client_registry
+from shared.models import HttpClientMetrics, RateGovernorMetrics
+from shared.ratelimit import rate_governor_registry
+from videoupload.models import SpeechBatchMetrics, TranscriptionReference
+
+CONTENT_FILE_NAME_PATTERN = re.compile(r"contenturl_(\d+)\.json$")
+
+
+class TranscriptionBatch:
+    def __init__(self) -> None:
+        """Initializes a batch of audio files which are submitted as a single transcription job.
+
+        RETURNS (None): No return values.
+        """
+        self.guids: List[str] = []
+        self.blob_urls: List[str] = []
+        self.submit_times: List[float] = []
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.flush_task: asyncio.Task = None
+
+
+class TranscriptionBatcher:
+    def __init__(self) -> None:
+        """Initializes the process-wide batcher of transcription job submissions.
+
+        Audio files which are submitted for the same speech service and locale within a time window
+        are collected and submitted as one batch transcription job with multiple content urls. A batch
+        is submitted once the window elapsed or the batch reached its maximum size.
+
+        RETURNS (None): No return values.
+        """
+        self.__batches: Dict[Tuple[str, str], TranscriptionBatch] = {}
+        self.__batch_sizes: List[int] = []
+        self.__wait_times_in_seconds: List[float] = []
+
+    async def submit(
+        self,
+        speech_client: "SpeechClient",
+        guid: str,
+        blob_url: str,
+        locale: str,
+        batch_window: float,
+        batch_max_size: int,
+    ) -> TranscriptionReference:
+        """Adds an audio file to the open batch and waits until the batch was submitted.
+
+        speech_client (SpeechClient): Specifies the speech client used to submit the batch.
+        guid (str): Specifies the guid of the audio file.
+        blob_url (str): Specifies the blob url pointing to an audio file that will be transcribed.
+        locale (str): Specifies the locale of the audio file (e.g. 'es-ES', 'de-DE').
+        batch_window (float): Specifies the seconds the batch waits for further audio files.
+        batch_max_size (int): Specifies the maximum number of audio files of a batch.
+        RETURNS (TranscriptionReference): Returns the transcription job and the index of the audio file within the job.
+        """
+        key = (speech_client.azure_ai_speech_base_url, locale)
+        batch = self.__batches.get(key)
+        if batch is None:
+            batch = TranscriptionBatch()
+            batch.flush_task = asyncio.create_task(
+                self.__flush(
+                    key=key,
+                    batch=batch,
+                    speech_client=speech_client,
+                    locale=locale,
+                    delay=batch_window,
+                )
+            )
+            self.__batches[key] = batch
+        content_index = len(batch.blob_urls)
+        batch.guids.append(guid)
+        batch.blob_urls.append(blob_url)
+        batch.submit_times.append(time.perf_counter())
+        if len(batch.blob_urls) >= batch_max_size:
+            self.__batches.pop(key, None)
+            batch.flush_task.cancel()
+            batch.flush_task = asyncio.create_task(
+                self.__flush(
+                    key=key,
+                    batch=batch,
+                    speech_client=speech_client,
+                    locale=locale,
+                    delay=0,
+                )
+            )
+
+        # Submission continues for the other audio files if this caller is cancelled
+        transcription_id = await asyncio.shield(batch.future)
+        return TranscriptionReference(
+            transcription_id=transcription_id, content_index=content_index
+        )
+
+    async def __flush(
+        self,
+        key: Tuple[str, str],
+        batch: TranscriptionBatch,
+        speech_client: "SpeechClient",
+        locale: str,
+        delay: float,
+    ) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.__batches.get(key) is batch:
+            self.__batches.pop(key)
+
+        flush_time = time.perf_counter()
+        self.__batch_sizes.append(len(batch.blob_urls))
+        self.__wait_times_in_seconds.extend(
+            [flush_time - submit_time for submit_time in batch.submit_times]
+        )
+        logging.info(
+            f"Submitting batch of {len(batch.blob_urls)} audio file(s) for guids {batch.guids}."
+        )
+        try:
+            transcription_id = await speech_client.create_batch_transcription_job(
+                guid=(
+                    batch.guids[0]
+                    if len(batch.guids) == 1
+                    else f"{batch.guids[0]}+{len(batch.guids) - 1}"
+                ),
+                blob_urls=batch.blob_urls,
+                locale=locale,
+            )
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            batch.future.set_result(transcription_id)
+
+    def get_metrics(self) -> SpeechBatchMetrics:
+        """Returns the batch size and wait time metrics of the batcher.
+
+        RETURNS (SpeechBatchMetrics): Returns the number of batches, their sizes and the wait times of the audio files.
+        """
+        items = sum(self.__batch_sizes)
+        return SpeechBatchMetrics(
+            batches=len(self.__batch_sizes),
+            items=items,
+            max_batch_size=max(self.__batch_sizes, default=0),
+            mean_batch_size=items / max(len(self.__batch_sizes), 1),
+            mean_wait_time_in_seconds=sum(self.__wait_times_in_seconds)
+            / max(len(self.__wait_times_in_seconds), 1),
+            max_wait_time_in_seconds=max(self.__wait_times_in_seconds, default=0.0),
+        )
+
+
+transcription_batcher = TranscriptionBatcher()
 
 
 class SpeechClient:
@@ -12,6 +160,10 @@ def __init__(
         azure_ai_speech_base_url: str,
         azure_ai_speech_api_version: str,
         azure_ai_speech_primary_access_key: str = None,
+        batch_window: float = 0.0,
+        batch_max_size: int = 1,
+        requests_per_second: float = 5.0,
+        max_concurrency: int = 16,
         managed_identity_client_id: str = None,
     ):
         """Initializes the speech client.
@@ -19,6 +171,10 @@ def __init__(
         azure_ai_speech_resource_id (str): Specifies the resource id of the azure ai search service.
         azure_ai_speech_base_url (str): Specifies the base url of the ai speech service.
         azure_ai_speech_api_version (str): Specifies the api version used for the speech service.
+        batch_window (float): Specifies the seconds submitted audio files wait for further files to be transcribed in the same job.
+        batch_max_size (int): Specifies the maximum number of audio files transcribed in the same job.
+        requests_per_second (float): Specifies the request rate of all clients of the speech service within the worker.
+        max_concurrency (int): Specifies the maximum number of concurrent requests of all clients of the speech service within the worker.
         managed_identity_client_id (str): Specifies the managed identity client id used for auth.
         RETURNS (None): No return values.
         """
@@ -26,7 +182,43 @@ def __init__(
         self.azure_ai_speech_primary_access_key = azure_ai_speech_primary_access_key
         self.azure_ai_speech_base_url = azure_ai_speech_base_url
         self.azure_ai_speech_api_version = azure_ai_speech_api_version
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
         self.managed_identity_client_id = managed_identity_client_id
+        self.__rate_governor = rate_governor_registry.get_rate_governor(
+            name=azure_ai_speech_base_url,
+            requests_per_second=requests_per_second,
+            max_concurrency=max_concurrency,
+        )
+        self.__http_client = http_client_registry.get_http_client(
+            base_url=azure_ai_speech_base_url, rate_governor=self.__rate_governor
+        )
+
+    async def submit_transcription(
+        self, guid: str, blob_url: str, locale: str
+    ) -> TranscriptionReference:
+        """Submits a blob file for transcription, batched with other files if batching is enabled.
+
+        guid (str): Specifies the guid used as a name for the processing job.
+        blob_url (str): Specifies the blob url pointing to an audio file that will be transcribed.
+        locale (str): Specifies the locale of the audio file (e.g. 'es-ES', 'de-DE').
+        RETURNS (TranscriptionReference): Returns the transcription job and the index of the blob file within the job.
+        """
+        if self.batch_window <= 0 or self.batch_max_size <= 1:
+            transcription_id = await self.create_transcription_job(
+                guid=guid, blob_url=blob_url, locale=locale
+            )
+            return TranscriptionReference(
+                transcription_id=transcription_id, content_index=0
+            )
+        return await transcription_batcher.submit(
+            speech_client=self,
+            guid=guid,
+            blob_url=blob_url,
+            locale=locale,
+            batch_window=self.batch_window,
+            batch_max_size=self.batch_max_size,
+        )
 
     async def create_transcription_job(
         self, guid: str, blob_url: str, locale: str
@@ -38,6 +230,20 @@ async def create_transcription_job(
         locale (str): Specifies the locale of the audio file (e.g. 'es-ES', 'de-DE').
         RETURNS (str): Returns the transaction url of the transcription job.
         """
+        return await self.create_batch_transcription_job(
+            guid=guid, blob_urls=[blob_url], locale=locale
+        )
+
+    async def create_batch_transcription_job(
+        self, guid: str, blob_urls: List[str], locale: str
+    ) -> str:
+        """Creates a batch transcription job for multiple blob files.
+
+        guid (str): Specifies the guid used as a name for the processing job.
+        blob_urls (List[str]): Specifies the blob urls pointing to audio files that will be transcribed.
+        locale (str): Specifies the locale of the audio files (e.g. 'es-ES', 'de-DE').
+        RETURNS (str): Returns the transaction url of the transcription job.
+        """
         # Define url
         url = f"{self.azure_ai_speech_base_url}/speechtotext/transcriptions:submit?api-version={self.azure_ai_speech_api_version}"
 
@@ -48,7 +254,7 @@ async def create_transcription_job(
         payload = {
             "displayName": f"{guid}",
             "description": "STT for video file",
-            "contentUrls": [blob_url],
+            "contentUrls": blob_urls,
             "locale": locale,
             "properties": {
                 "languageIdentification": {
@@ -65,12 +271,11 @@ async def create_transcription_job(
         }
 
         # Send request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url=url,
-                headers=headers,
-                json=payload,
-            )
+        response = await self.__http_client.post(
+            url=url,
+            headers=headers,
+            json=payload,
+        )
 
         # Check response
         if response.status_code >= 400:
@@ -104,11 +309,10 @@ async def get_transcription_job_status(self, transcription_id: str) -> str:
         headers = await self.__get_headers()
 
         # Send request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url=url,
-                headers=headers,
-            )
+        response = await self.__http_client.get(
+            url=url,
+            headers=headers,
+        )
 
         # Check response
         if response.status_code >= 400:
@@ -135,6 +339,38 @@ async def get_transcription_job_file_list(self, transcription_id: str) -> List[s
         transcription_id (str): Specifies the trancription job id.
         RETURNS (List[str]): Returns the list of file urls of the transcription job.
         """
+        return [
+            transcription_file_url
+            for _, transcription_file_url in await self.__get_transcription_job_files(
+                transcription_id=transcription_id
+            )
+        ]
+
+    async def get_transcription_job_files(
+        self, transcription_id: str
+    ) -> Dict[int, str]:
+        """Returns the transcription job files by the index of their blob file within the job.
+
+        transcription_id (str): Specifies the trancription job id.
+        RETURNS (Dict[int, str]): Returns the file urls of the transcription job by content index.
+        """
+        transcription_files = await self.__get_transcription_job_files(
+            transcription_id=transcription_id
+        )
+        result = {}
+        for index, (name, transcription_file_url) in enumerate(transcription_files):
+            match = CONTENT_FILE_NAME_PATTERN.search(name)
+            result[int(match.group(1)) if match else index] = transcription_file_url
+        return result
+
+    async def __get_transcription_job_files(
+        self, transcription_id: str
+    ) -> List[Tuple[str, str]]:
+        """Returns the names and urls of the transcription files of a transcription job.
+
+        transcription_id (str): Specifies the trancription job id.
+        RETURNS (List[Tuple[str, str]]): Returns the names and file urls of the transcription job.
+        """
         # Define url
         sas_validity_in_seconds = 600
         url = f"{self.azure_ai_speech_base_url}/speechtotext/transcriptions/{transcription_id}/files?sasValidityInSeconds={sas_validity_in_seconds}&api-version={self.azure_ai_speech_api_version}"
@@ -143,11 +379,10 @@ async def get_transcription_job_file_list(self, transcription_id: str) -> List[s
         headers = await self.__get_headers()
 
         # Send request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url=url,
-                headers=headers,
-            )
+        response = await self.__http_client.get(
+            url=url,
+            headers=headers,
+        )
 
         # Check response
         if response.status_code >= 400:
@@ -174,10 +409,34 @@ async def get_transcription_job_file_list(self, transcription_id: str) -> List[s
                     "contentUrl", None
                 )
                 if transcription_file_url:
-                    transcription_file_url_list.append(transcription_file_url)
+                    transcription_file_url_list.append(
+                        (value.get("name", ""), transcription_file_url)
+                    )
 
         return transcription_file_url_list
 
+    @staticmethod
+    def get_batch_metrics() -> SpeechBatchMetrics:
+        """Returns the batch size and wait time metrics of batched submissions within the worker.
+
+        RETURNS (SpeechBatchMetrics): Returns the number of batches, their sizes and the wait times of the audio files.
+        """
+        return transcription_batcher.get_metrics()
+
+    def get_rate_governor_metrics(self) -> RateGovernorMetrics:
+        """Returns the current limits and throttling counts of requests to the speech service.
+
+        RETURNS (RateGovernorMetrics): Returns the request rate, concurrency limit and throttle counts.
+        """
+        return self.__rate_governor.get_metrics()
+
+    def get_metrics(self) -> HttpClientMetrics:
+        """Returns the request metrics of the pooled http client of the speech service.
+
+        RETURNS (HttpClientMetrics): Returns the request counts, connection reuse and latency histogram.
+        """
+        return http_client_registry.get_metrics(base_url=self.azure_ai_speech_base_url)
+
     async def __get_headers(self) -> Dict:
         """Creates the headers required for the azure ai service.
 
@@ -191,13 +450,11 @@ async def __get_headers(self) -> Dict:
                 "Ocp-Apim-Subscription-Key": self.azure_ai_speech_primary_access_key,
             }
         else:
-            # Generate token
-            credential = get_azure_credential(
+            # Get cached token
+            token = await token_cache.get_token(
+                scope="https://cognitiveservices.azure.com/.default",
                 managed_identity_client_id=self.managed_identity_client_id,
             )
-            token = await credential.get_token(
-                "https://cognitiveservices.azure.com/.default"
-            )
 
             # Create headers
             headers = {
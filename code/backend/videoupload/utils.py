@@ -1,34 +1,413 @@
+import asyncio
+import functools
+import json
 import logging
 import os
+import re
+import struct
+import subprocess
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, List, Literal, Optional
 
-from moviepy.editor import VideoFileClip
+import imageio_ffmpeg
+from shared.utils import load_url, upload_stream, upload_string
 
+FFMPEG_DURATION_PATTERN = re.compile(r"Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+ISO_BASE_MEDIA_FILE_TYPES = ["mp4", "m4v", "m4a", "mov", "3gp", "3g2", "f4v"]
+WAV_STREAM_FORMATS = {
+    "pcm_u8": ("u8", 8),
+    "pcm_s16le": ("s16le", 16),
+    "pcm_s24le": ("s24le", 24),
+    "pcm_s32le": ("s32le", 32),
+}
+AUDIO_STREAM_FORMATS = {"flac": "flac", "ogg": "ogg", "opus": "ogg", "mp3": "mp3"}
 
-def extract_audio_from_video(file_path: str, audio_file_name: str = "audio.wav") -> str:
-    """Copy file from source blob storage container async to sink blob storage container.
+
+def get_ffmpeg_audio_arguments(
+    sample_rate: int = 16000, channels: int = 1, codec: str = "pcm_s16le"
+) -> List[str]:
+    """Creates the ffmpeg output arguments for an audio only stream.
+
+    sample_rate (int): Specifies the sample rate of the audio stream in Hz.
+    channels (int): Specifies the number of audio channels.
+    codec (str): Specifies the ffmpeg audio codec.
+    RETURNS (List[str]): The ffmpeg output arguments.
+    """
+    return [
+        "-vn",
+        "-sn",
+        "-dn",
+        "-acodec",
+        codec,
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+    ]
+
+
+def get_media_duration(ffmpeg_log: str) -> Optional[float]:
+    """Parses the duration of the input media from the ffmpeg log output.
+
+    ffmpeg_log (str): Specifies the stderr output of ffmpeg.
+    RETURNS (Optional[float]): The duration of the input media in seconds or None if the duration is unknown.
+    """
+    match = FFMPEG_DURATION_PATTERN.search(ffmpeg_log)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def extract_audio_from_video(
+    file_path: str,
+    audio_file_name: str = "audio.wav",
+    sample_rate: int = 16000,
+    channels: int = 1,
+    codec: str = "pcm_s16le",
+) -> str:
+    """Extracts the audio stream from a video file with ffmpeg without decoding the video stream.
+
+    The defaults produce 16 kHz mono 16-bit PCM, which is the format Azure AI Speech expects.
 
     file_path (str): The file path of the video from which the audio should be extracted.
-    audio_file_name (str): The file name of the audio file.
+    audio_file_name (str): The file name of the audio file. The extension defines the container format.
+    sample_rate (int): Specifies the sample rate of the audio file in Hz.
+    channels (int): Specifies the number of audio channels of the audio file.
+    codec (str): Specifies the ffmpeg audio codec of the audio file.
     RETURNS (str): Returns the file path of the audio file path.
     """
     logging.info(f"Extracting audio from the following video file '{file_path}'.")
 
-    # Load video file
-    logging.debug(f"Loading video file '{file_path}'")
-    video = VideoFileClip(
-        filename=file_path,
-        has_mask=False,
-        audio=True,
-    )
-
     # Define audio file path
     file_path_head_tail = os.path.split(file_path)
     audio_file_path = os.path.join(file_path_head_tail[0], audio_file_name)
     logging.debug(f"Audio file path '{audio_file_path}'")
 
     # Extract audio
-    audio = video.audio
-    audio.write_audiofile(
-        audio_file_path
-    )  # , nbytes=2, codec="pcm_s16le", bitrate="16k", ffmpeg_params=["-ac", "1"])
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-hide_banner",
+            "-nostdin",
+            "-y",
+            "-i",
+            file_path,
+            *get_ffmpeg_audio_arguments(
+                sample_rate=sample_rate, channels=channels, codec=codec
+            ),
+            audio_file_path,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    duration_in_seconds = time.perf_counter() - start_time
+    ffmpeg_log = result.stderr.decode("utf-8", errors="replace")
+    if result.returncode != 0:
+        message = f"Audio extraction from video file '{file_path}' failed with exit code '{result.returncode}': {ffmpeg_log[-2000:]}"
+        logging.error(message)
+        raise RuntimeError(message)
+
+    # Report extraction speed
+    media_duration_in_seconds = get_media_duration(ffmpeg_log=ffmpeg_log)
+    if media_duration_in_seconds:
+        logging.info(
+            f"Extracted {media_duration_in_seconds:.1f}s of audio ({sample_rate} Hz, {channels} channel(s), {codec}) in {duration_in_seconds:.2f}s ({media_duration_in_seconds / max(duration_in_seconds, 1e-6):.1f}x realtime)."
+        )
+    else:
+        logging.info(
+            f"Extracted audio ({sample_rate} Hz, {channels} channel(s), {codec}) in {duration_in_seconds:.2f}s."
+        )
     return audio_file_path
+
+
+def is_streamable_media(data: bytes, file_type: str) -> bool:
+    """Checks whether a video can be decoded from a non-seekable stream.
+
+    ISO base media files (mp4, mov, ...) can only be decoded sequentially if the `moov` box with the
+    index of the file is stored before the `mdat` box with the media data ("fast start").
+
+    data (bytes): Specifies the first bytes of the video file.
+    file_type (str): Specifies the file type of the video file.
+    RETURNS (bool): Returns True if the video can be decoded from a stream.
+    """
+    if file_type.lower() not in ISO_BASE_MEDIA_FILE_TYPES:
+        return True
+
+    # Iterate over top level boxes
+    offset = 0
+    while offset + 8 <= len(data):
+        box_size, box_type = struct.unpack(">I4s", data[offset : offset + 8])
+        if box_type == b"moov":
+            return True
+        elif box_type == b"mdat":
+            return False
+        elif box_size == 1 and offset + 16 <= len(data):
+            box_size = struct.unpack(">Q", data[offset + 8 : offset + 16])[0]
+        if box_size < 8:
+            break
+        offset += box_size
+    return False
+
+
+def get_wav_header(
+    data_size: int, sample_rate: int, channels: int, bits_per_sample: int
+) -> bytes:
+    """Creates the header of a PCM wav file.
+
+    data_size (int): Specifies the size of the PCM data in bytes.
+    sample_rate (int): Specifies the sample rate of the audio data in Hz.
+    channels (int): Specifies the number of audio channels.
+    bits_per_sample (int): Specifies the number of bits per sample.
+    RETURNS (bytes): The header of the wav file.
+    """
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bits_per_sample,
+        b"data",
+        data_size,
+    )
+
+
+async def extract_audio_from_video_stream(
+    data: AsyncIterable[bytes],
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    codec: str = "pcm_s16le",
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    managed_identity_client_id: str = None,
+) -> str:
+    """Extracts the audio stream from a video stream with ffmpeg and uploads it to blob storage without touching the local disk.
+
+    The video is piped into the stdin of ffmpeg and the audio is read from its stdout and staged as blocks.
+    wav files are streamed as raw PCM data and the header is added once the length of the audio is known.
+
+    data (AsyncIterable[bytes]): Specifies the chunks of the video file.
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the audio file. The extension defines the container format.
+    sample_rate (int): Specifies the sample rate of the audio file in Hz.
+    channels (int): Specifies the number of audio channels of the audio file.
+    codec (str): Specifies the ffmpeg audio codec of the audio file.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of blocks staged concurrently.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (str): The url of the uploaded audio file.
+    """
+    logging.info(f"Extracting audio from video stream to '{storage_blob_name}'.")
+
+    # Define output format
+    file_type = str.split(storage_blob_name, ".")[-1].lower()
+    header = None
+    if file_type == "wav":
+        if codec not in WAV_STREAM_FORMATS:
+            message = f"Codec '{codec}' is not supported for streaming wav files."
+            logging.error(message)
+            raise ValueError(message)
+        output_format, bits_per_sample = WAV_STREAM_FORMATS[codec]
+        header = functools.partial(
+            get_wav_header,
+            sample_rate=sample_rate,
+            channels=channels,
+            bits_per_sample=bits_per_sample,
+        )
+    elif file_type in AUDIO_STREAM_FORMATS:
+        output_format = AUDIO_STREAM_FORMATS[file_type]
+    else:
+        message = f"Audio file type '{file_type}' is not supported for streaming."
+        logging.error(message)
+        raise ValueError(message)
+
+    # Start ffmpeg
+    start_time = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        "pipe:0",
+        *get_ffmpeg_audio_arguments(
+            sample_rate=sample_rate, channels=channels, codec=codec
+        ),
+        "-f",
+        output_format,
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def write_stdin() -> None:
+        try:
+            async for chunk in data:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg stopped reading, the exit code is checked once stdout is closed
+            pass
+        finally:
+            process.stdin.close()
+
+    async def read_stderr() -> str:
+        # Keep the beginning of the log with the input details and the end with errors
+        head = bytearray()
+        tail: Deque[bytes] = deque(maxlen=64)
+        while line := await process.stderr.readline():
+            if len(head) < 16 * 1024:
+                head.extend(line)
+            else:
+                tail.append(line)
+        return (bytes(head) + b"".join(tail)).decode("utf-8", errors="replace")
+
+    write_stdin_task = asyncio.create_task(write_stdin())
+    read_stderr_task = asyncio.create_task(read_stderr())
+
+    async def read_stdout() -> AsyncIterator[bytes]:
+        while chunk := await process.stdout.read(1024 * 1024):
+            yield chunk
+
+        # Fail before the blob is committed if the input or ffmpeg failed
+        returncode = await process.wait()
+        await write_stdin_task
+        if returncode != 0:
+            ffmpeg_log = await read_stderr_task
+            message = f"Audio extraction from video stream failed with exit code '{returncode}': {ffmpeg_log[-2000:]}"
+            logging.error(message)
+            raise RuntimeError(message)
+
+    # Upload audio
+    try:
+        result = await upload_stream(
+            data=read_stdout(),
+            storage_domain_name=storage_domain_name,
+            storage_container_name=storage_container_name,
+            storage_blob_name=storage_blob_name,
+            block_size=block_size,
+            max_concurrency=max_concurrency,
+            header=header,
+            managed_identity_client_id=managed_identity_client_id,
+        )
+        ffmpeg_log = await read_stderr_task
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        write_stdin_task.cancel()
+        read_stderr_task.cancel()
+        await asyncio.gather(write_stdin_task, read_stderr_task, return_exceptions=True)
+    duration_in_seconds = time.perf_counter() - start_time
+
+    # Report extraction speed
+    media_duration_in_seconds = get_media_duration(ffmpeg_log=ffmpeg_log)
+    if media_duration_in_seconds:
+        logging.info(
+            f"Extracted and uploaded {media_duration_in_seconds:.1f}s of audio ({sample_rate} Hz, {channels} channel(s), {codec}) from video stream in {duration_in_seconds:.2f}s ({media_duration_in_seconds / max(duration_in_seconds, 1e-6):.1f}x realtime)."
+        )
+    return result
+
+
+def compact_stt_result(result_stt: Any) -> Any:
+    """Removes all content from an Azure AI Speech STT batch transcription that is not used for the analysis.
+
+    Only the best alternative of every recognized phrase is kept and the lexical, itn and masked itn
+    representations are removed, which shrinks the transcription of long videos significantly.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    RETURNS (Any): The compacted JSON content.
+    """
+    recognized_phrases = []
+    for recognized_phrase in result_stt.get("recognizedPhrases", []):
+        recognized_phrase_best = (recognized_phrase.get("nBest") or [{}])[0]
+        recognized_phrases.append(
+            {
+                **{
+                    key: value
+                    for key, value in recognized_phrase.items()
+                    if key != "nBest"
+                },
+                "nBest": [
+                    {
+                        key: value
+                        for key, value in recognized_phrase_best.items()
+                        if key in ["confidence", "display", "displayWords"]
+                    }
+                ],
+            }
+        )
+
+    return {
+        **{
+            key: value
+            for key, value in result_stt.items()
+            if key not in ["combinedRecognizedPhrases", "recognizedPhrases"]
+        },
+        "combinedRecognizedPhrases": [
+            {
+                key: value
+                for key, value in combined_recognized_phrase.items()
+                if key in ["channel", "display"]
+            }
+            for combined_recognized_phrase in result_stt.get(
+                "combinedRecognizedPhrases", []
+            )
+        ],
+        "recognizedPhrases": recognized_phrases,
+    }
+
+
+async def upload_compacted_stt_result(
+    source_url: str,
+    sink_storage_domain_name: str,
+    sink_storage_container_name: str,
+    sink_storage_blob_name: str,
+    content_encoding: Literal["gzip", "zstd"] = "gzip",
+    managed_identity_client_id: str = None,
+) -> str:
+    """Downloads an Azure AI Speech STT batch transcription, compacts and compresses it and uploads it to blob storage.
+
+    source_url (str): The url of the transcription file.
+    sink_storage_domain_name (str): The domain name of the storage account to which the file will be uploaded.
+    sink_storage_container_name (str): The container name of the storage account.
+    sink_storage_blob_name (str): The blob name of the storage account.
+    content_encoding (Literal["gzip", "zstd"]): Specifies the compression of the uploaded file.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (str): The url of the uploaded blob.
+    """
+    logging.info(f"Compacting transcription file to '{sink_storage_blob_name}'.")
+
+    # Load and compact transcription
+    result_load_url = await load_url(url=source_url)
+    result_stt = json.loads(result_load_url)
+    result_compact_stt_result = json.dumps(
+        compact_stt_result(result_stt=result_stt), separators=(",", ":")
+    )
+    logging.info(
+        f"Compacted transcription file from {len(result_load_url)} to {len(result_compact_stt_result)} bytes."
+    )
+
+    # Upload compressed transcription
+    return await upload_string(
+        data=result_compact_stt_result,
+        storage_domain_name=sink_storage_domain_name,
+        storage_container_name=sink_storage_container_name,
+        storage_blob_name=sink_storage_blob_name,
+        content_encoding=content_encoding,
+        managed_identity_client_id=managed_identity_client_id,
+    )
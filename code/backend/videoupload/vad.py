@@ -0,0 +1,327 @@
+import bisect
+import copy
+import functools
+import logging
+import time
+from typing import Any, AsyncIterator, List
+
+import numpy as np
+from shared.duration import TICKS_PER_SECOND, get_ticks
+from shared.executor import media_execution_pool
+from shared.utils import get_blob_properties, iter_blob_chunks, upload_stream
+from videoupload.models import SpeechRegion, VoiceActivityResult, WavFormat
+from videoupload.segmentation import (
+    WAV_SAMPLE_DTYPES,
+    get_wav_samples,
+    parse_wav_header,
+    set_ticks,
+)
+from videoupload.utils import get_wav_header
+
+
+def get_frame_energies(data: bytes, wav_format: WavFormat, frame_length: int) -> Any:
+    """Calculates the energy of consecutive frames of PCM data in dBFS.
+
+    data (bytes): Specifies the PCM data. Incomplete frames at the end are ignored.
+    wav_format (WavFormat): Specifies the format of the PCM data.
+    frame_length (int): Specifies the number of samples per frame.
+    RETURNS (np.ndarray): The energy of each frame in dBFS.
+    """
+    block_align = wav_format.channels * wav_format.bits_per_sample // 8
+    frame_count = len(data) // (block_align * frame_length)
+    samples = get_wav_samples(
+        data=data,
+        wav_format=wav_format,
+        count=frame_count * frame_length * wav_format.channels,
+    )
+    samples /= 2 ** (wav_format.bits_per_sample - 1)
+    frames = samples.reshape(frame_count, frame_length * wav_format.channels)
+    return 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+
+
+def detect_speech_regions(
+    energies: Any,
+    frame_duration: float,
+    threshold_offset_db: float = 12.0,
+    min_threshold_db: float = -55.0,
+    max_threshold_db: float = -35.0,
+    min_speech_duration: float = 0.3,
+    min_silence_duration: float = 1.5,
+    padding_duration: float = 0.3,
+) -> Any:
+    """Detects regions of speech based on the energy of audio frames.
+
+    The threshold adapts to the noise floor of the recording (10th percentile of the frame energies)
+    and is bounded, so that neither digital silence nor loud recordings skew the detection. Short
+    pauses are bridged and all regions are padded, so that only longer gaps are classified as non-speech.
+
+    energies (np.ndarray): Specifies the energy of each frame in dBFS.
+    frame_duration (float): Specifies the duration of a frame in seconds.
+    threshold_offset_db (float): Specifies the offset of the threshold above the noise floor in dB.
+    min_threshold_db (float): Specifies the lower bound of the threshold in dBFS.
+    max_threshold_db (float): Specifies the upper bound of the threshold in dBFS.
+    min_speech_duration (float): Specifies the minimum duration of a speech region in seconds.
+    min_silence_duration (float): Specifies the minimum duration of a non-speech gap in seconds.
+    padding_duration (float): Specifies the padding added before and after each speech region in seconds.
+    RETURNS (np.ndarray): The start and end frame of each speech region with shape (n, 2).
+    """
+    if len(energies) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Classify frames
+    threshold = np.clip(
+        np.percentile(energies, 10) + threshold_offset_db,
+        min_threshold_db,
+        max_threshold_db,
+    )
+    active = np.concatenate([[0], (energies > threshold).astype(np.int8), [0]])
+    edges = np.diff(active)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # Bridge short pauses
+    keep_gaps = starts[1:] - ends[:-1] >= round(min_silence_duration / frame_duration)
+    starts = starts[np.concatenate([[True], keep_gaps])]
+    ends = ends[np.concatenate([keep_gaps, [True]])]
+
+    # Remove short regions and add padding
+    keep_regions = ends - starts >= round(min_speech_duration / frame_duration)
+    padding = round(padding_duration / frame_duration)
+    starts = np.maximum(starts[keep_regions] - padding, 0)
+    ends = np.minimum(ends[keep_regions] + padding, len(energies))
+
+    # Merge overlapping regions
+    keep_gaps = starts[1:] > ends[:-1]
+    starts = starts[np.concatenate([[True], keep_gaps])]
+    ends = ends[np.concatenate([keep_gaps, [True]])]
+    return np.stack([starts, ends], axis=1)
+
+
+def map_offset(
+    ticks: int, speech_regions: List[SpeechRegion], is_end: bool = False
+) -> int:
+    """Maps an offset in the trimmed audio to the offset in the original audio.
+
+    ticks (int): Specifies the offset in the trimmed audio in ticks.
+    speech_regions (List[SpeechRegion]): Specifies the speech regions that were kept in the trimmed audio.
+    is_end (bool): Specifies whether the offset is the end of an item, which maps region boundaries to the end of the previous region.
+    RETURNS (int): The offset in the original audio in ticks.
+    """
+    if not speech_regions:
+        return ticks
+    trimmed_starts = [
+        speech_region.trimmed_start_in_ticks for speech_region in speech_regions
+    ]
+    if is_end:
+        index = bisect.bisect_left(trimmed_starts, ticks) - 1
+    else:
+        index = bisect.bisect_right(trimmed_starts, ticks) - 1
+    speech_region = speech_regions[max(index, 0)]
+    return speech_region.original_start_in_ticks + (
+        ticks - speech_region.trimmed_start_in_ticks
+    )
+
+
+def remap_stt_result(result_stt: Any, speech_regions: List[SpeechRegion]) -> Any:
+    """Maps all offsets of an Azure AI Speech STT batch transcription of trimmed audio to the original audio.
+
+    result_stt (Any): Specifies the JSON content from Azure AI Speech STT batch transcription.
+    speech_regions (List[SpeechRegion]): Specifies the speech regions that were kept in the trimmed audio.
+    RETURNS (Any): The JSON content with offsets and durations of the original audio.
+    """
+    result = copy.deepcopy(result_stt)
+
+    def remap_item(item: Any) -> None:
+        offset = get_ticks(item=item, key="offset")
+        duration = get_ticks(item=item, key="duration")
+        offset_original = map_offset(ticks=offset, speech_regions=speech_regions)
+        end_original = map_offset(
+            ticks=offset + duration, speech_regions=speech_regions, is_end=True
+        )
+        set_ticks(item=item, key="offset", ticks=offset_original)
+        set_ticks(item=item, key="duration", ticks=end_original - offset_original)
+
+    for recognized_phrase in result.get("recognizedPhrases", []):
+        remap_item(item=recognized_phrase)
+        for recognized_phrase_alternative in recognized_phrase.get("nBest", []):
+            for key in ["displayWords", "words"]:
+                for word in recognized_phrase_alternative.get(key) or []:
+                    remap_item(item=word)
+    if result.get("duration") or result.get("durationInTicks") is not None:
+        set_ticks(
+            item=result,
+            key="duration",
+            ticks=map_offset(
+                ticks=get_ticks(item=result, key="duration"),
+                speech_regions=speech_regions,
+                is_end=True,
+            ),
+        )
+    return result
+
+
+async def remove_non_speech_audio(
+    storage_domain_name: str,
+    storage_container_name: str,
+    storage_blob_name: str,
+    sink_storage_blob_name: str,
+    frame_duration: float = 0.03,
+    min_removed_ratio: float = 0.05,
+    block_size: int = 4 * 1024 * 1024,
+    max_concurrency: int = 4,
+    timeout: float = None,
+    managed_identity_client_id: str = None,
+) -> VoiceActivityResult:
+    """Detects speech in a PCM wav file in blob storage and writes a copy without the non-speech gaps.
+
+    The audio is analysed in a single streaming pass and the frame energies of each block are calculated
+    in the media execution pool, so the event loop is not blocked. The trimmed copy is assembled from byte ranges of
+    the original file, so the audio is not re-encoded. The returned speech regions map offsets of the
+    trimmed audio back to the original audio.
+
+    storage_domain_name (str): The domain name of the storage account.
+    storage_container_name (str): The container name of the storage account.
+    storage_blob_name (str): The blob name of the wav file.
+    sink_storage_blob_name (str): The blob name of the trimmed wav file.
+    frame_duration (float): Specifies the duration of the analysed frames in seconds.
+    min_removed_ratio (float): Specifies the minimum ratio of non-speech audio for which the trimmed copy is created.
+    block_size (int): Specifies the size of the blocks in bytes.
+    max_concurrency (int): Specifies the maximum number of concurrent requests.
+    timeout (float): Specifies the maximum time in seconds the analysis of a block may take in the media execution pool.
+    managed_identity_client_id (str): Specifies the managed identity client id used for auth.
+    RETURNS (VoiceActivityResult): The speech regions and the url of the trimmed file or None if no copy was created.
+    """
+    logging.info(f"Detecting speech in audio file '{storage_blob_name}'.")
+    start_time = time.perf_counter()
+
+    # Calculate frame energies
+    blob_properties = await get_blob_properties(
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+        managed_identity_client_id=managed_identity_client_id,
+    )
+    wav_format = None
+    frame_length = None
+    frame_size = None
+    buffer = bytearray()
+    energies = []
+    async for chunk in iter_blob_chunks(
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=storage_blob_name,
+        chunk_size=block_size,
+        max_concurrency=max_concurrency,
+        managed_identity_client_id=managed_identity_client_id,
+    ):
+        buffer.extend(chunk)
+        if wav_format is None:
+            wav_format = parse_wav_header(data=bytes(buffer), size=blob_properties.size)
+            if wav_format.bits_per_sample not in WAV_SAMPLE_DTYPES:
+                message = f"Wav files with {wav_format.bits_per_sample} bits per sample are not supported."
+                logging.error(message)
+                raise ValueError(message)
+            frame_length = max(round(wav_format.sample_rate * frame_duration), 1)
+            frame_size = (
+                frame_length * wav_format.channels * wav_format.bits_per_sample // 8
+            )
+            del buffer[: wav_format.data_offset]
+        usable_size = len(buffer) - len(buffer) % frame_size
+        energies.append(
+            await media_execution_pool.run(
+                get_frame_energies,
+                data=bytes(buffer[:usable_size]),
+                wav_format=wav_format,
+                frame_length=frame_length,
+                timeout=timeout,
+            )
+        )
+        del buffer[:usable_size]
+    if wav_format is None:
+        message = f"Audio file '{storage_blob_name}' is empty."
+        logging.error(message)
+        raise ValueError(message)
+    energies = np.concatenate(energies)
+    block_align = wav_format.channels * wav_format.bits_per_sample // 8
+    sample_count = wav_format.data_size // block_align
+
+    # Detect speech regions
+    regions = (
+        detect_speech_regions(
+            energies=energies, frame_duration=frame_length / wav_format.sample_rate
+        )
+        * frame_length
+    )
+    regions[:, 1] = np.minimum(regions[:, 1], sample_count)
+    if regions.size and regions[-1, 1] >= len(energies) * frame_length:
+        regions[-1, 1] = sample_count
+    speech_regions = []
+    trimmed_start = 0
+    for start, end in regions.tolist():
+        speech_regions.append(
+            SpeechRegion(
+                original_start_in_ticks=round(
+                    start * TICKS_PER_SECOND / wav_format.sample_rate
+                ),
+                trimmed_start_in_ticks=round(
+                    trimmed_start * TICKS_PER_SECOND / wav_format.sample_rate
+                ),
+                duration_in_ticks=round(
+                    (end - start) * TICKS_PER_SECOND / wav_format.sample_rate
+                ),
+            )
+        )
+        trimmed_start += end - start
+    original_duration = sample_count / wav_format.sample_rate
+    trimmed_duration = trimmed_start / wav_format.sample_rate
+    removed_ratio = 1 - trimmed_duration / original_duration if sample_count else 0
+
+    result = VoiceActivityResult(
+        url=None,
+        storage_blob_name=None,
+        speech_regions=speech_regions,
+        original_duration_in_seconds=original_duration,
+        trimmed_duration_in_seconds=trimmed_duration,
+        removed_percentage=100 * removed_ratio,
+    )
+    if removed_ratio < min_removed_ratio or not speech_regions:
+        logging.info(
+            f"Keeping audio file '{storage_blob_name}' as only {result.removed_percentage:.1f}% of {original_duration:.1f}s are non-speech ({time.perf_counter() - start_time:.2f}s)."
+        )
+        return result
+
+    # Write speech regions to trimmed file
+    async def iter_speech_chunks() -> AsyncIterator[bytes]:
+        for start, end in regions.tolist():
+            async for chunk in iter_blob_chunks(
+                storage_domain_name=storage_domain_name,
+                storage_container_name=storage_container_name,
+                storage_blob_name=storage_blob_name,
+                chunk_size=block_size,
+                max_concurrency=max_concurrency,
+                offset=wav_format.data_offset + start * block_align,
+                length=(end - start) * block_align,
+                managed_identity_client_id=managed_identity_client_id,
+            ):
+                yield chunk
+
+    result.url = await upload_stream(
+        data=iter_speech_chunks(),
+        storage_domain_name=storage_domain_name,
+        storage_container_name=storage_container_name,
+        storage_blob_name=sink_storage_blob_name,
+        block_size=block_size,
+        max_concurrency=max_concurrency,
+        header=functools.partial(
+            get_wav_header,
+            sample_rate=wav_format.sample_rate,
+            channels=wav_format.channels,
+            bits_per_sample=wav_format.bits_per_sample,
+        ),
+        managed_identity_client_id=managed_identity_client_id,
+    )
+    result.storage_blob_name = sink_storage_blob_name
+    logging.info(
+        f"Removed {result.removed_percentage:.1f}% non-speech audio from '{storage_blob_name}' in {time.perf_counter() - start_time:.2f}s, which saves {original_duration - trimmed_duration:.1f}s of {original_duration:.1f}s billed audio for the transcription job."
+    )
+    return result